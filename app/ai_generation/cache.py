@@ -0,0 +1,214 @@
+"""
+Generation response cache.
+
+Keys hash the normalized request together with the text of every profile
+item its prompt uses, and the provider and prompt version. Editing
+or deleting a referenced experience, education or achievement therefore
+yields a new key, so stale responses are never served; old entries simply
+age out under the LRU and TTL limits.
+
+Entries live in a per-process LRU and, when GENERATION_CACHE_DIR is set,
+in gzip files there, which survive restarts and are shared by every API
+and worker process on the host.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# ?cache= values: "bypass" skips the lookup but still stores the fresh result
+CACHE_MODE_PATTERN = "^(use|bypass)$"
+
+def _normalize_text(value: Optional[str], fold_case: bool = False) -> Optional[str]:
+    if value is None:
+        return None
+    value = re.sub(r"\s+", " ", value).strip()
+    return value.casefold() if fold_case else value
+
+def request_fingerprint(request: dict) -> dict:
+    """The request fields that affect the output, in canonical form"""
+    use_all = request.get("use_all_experiences", True)
+    return {
+        "document_type": request["document_type"],
+        "employer_name": _normalize_text(request.get("employer_name"), fold_case=True),
+        "job_title": _normalize_text(request.get("job_title"), fold_case=True),
+        "job_description": _normalize_text(request.get("job_description")),
+        "use_all_experiences": use_all,
+        # With use_all_experiences the profile fingerprint already covers every row
+        "experience_ids": None if use_all else sorted(set(request.get("experience_ids") or [])),
+        "education_ids": None if use_all else sorted(set(request.get("education_ids") or [])),
+        "achievement_ids": None if use_all else sorted(set(request.get("achievement_ids") or [])),
+    }
+
+def generation_cache_key(request: dict, items: List[dict], *identity: str) -> str:
+    payload = {
+        "identity": identity,
+        "request": request_fingerprint(request),
+        "profile": [(item["kind"], item["id"], item["text"]) for item in items],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class DiskCacheTier:
+    """gzip files under a directory, fanned out by key prefix, expiring by mtime"""
+    PRUNE_EVERY = 100
+
+    def __init__(self, directory: str, ttl_seconds: int, max_entries: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.gz")
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(content, expiry time) or None"""
+        path = self._path(key)
+        try:
+            expires_at = os.path.getmtime(path) + self.ttl_seconds
+            if expires_at <= time.time():
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return gzip.decompress(f.read()).decode("utf-8"), expires_at
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning("Unreadable generation cache file %s: %s", path, e)
+            return None
+
+    def put(self, key: str, content: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(content.encode("utf-8")))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired files, then the oldest beyond max_entries"""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except FileNotFoundError:
+                        pass
+        files.sort(reverse=True)
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for i, (mtime, path) in enumerate(files):
+            if i >= self.max_entries or mtime <= cutoff:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+class GenerationCache:
+    """Bounded LRU of generated content with a TTL, backed by an optional disk tier"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, disk: Optional[DiskCacheTier] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+
+        found = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, *found)
+        return found[0]
+
+    def put(self, key: str, content: str) -> None:
+        with self._lock:
+            self._remember(key, content, time.time() + self.ttl_seconds)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, content)
+            except OSError as e:
+                logger.warning("Could not write generation cache file: %s", e)
+
+    def _remember(self, key: str, content: str, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (content, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk": self.disk is not None,
+            }
+
+def create_generation_cache(settings) -> GenerationCache:
+    disk = None
+    if settings.GENERATION_CACHE_DIR:
+        disk = DiskCacheTier(
+            settings.GENERATION_CACHE_DIR,
+            ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS,
+            max_entries=settings.GENERATION_CACHE_DISK_MAX_ENTRIES,
+        )
+    return GenerationCache(
+        max_entries=settings.GENERATION_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS,
+        disk=disk,
+    )
+
+generation_cache = create_generation_cache(settings)
@@ -0,0 +1,24 @@
+"""
+Celery entry point for GENERATION_BACKEND=celery.
+
+Run workers with: celery -A app.ai_generation.celery_app worker --concurrency 4
+"""
+from celery import Celery
+
+from app.ai_generation.worker import run_job
+from app.config import get_settings
+
+settings = get_settings()
+
+celery_app = Celery("cv_tailor", broker=settings.CELERY_BROKER_URL)
+celery_app.conf.update(
+    # Acknowledge after the job ran, so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+)
+
+@celery_app.task(name="ai_generation.run_job")
+def run_job_task(job_id: str) -> None:
+    run_job(job_id)
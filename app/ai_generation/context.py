@@ -0,0 +1,131 @@
+"""
+Context selection for generation prompts.
+
+With use_all_experiences a long profile would otherwise go into the prompt
+whole. Instead every profile item is scored against the job title and
+description and the employer's keywords and values with BM25, and the
+best-scoring items are packed into GENERATION_CONTEXT_TOKEN_BUDGET. The
+selection is reported alongside the generation.
+
+Items come from the profile snapshot with their term counts precomputed.
+Scoring is vectorized with NumPy: every item term is mapped to a query
+term id in one searchsorted call and the term-frequency matrix is built
+with a single weighted bincount.
+"""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Employer
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Employer keywords and values are short and deliberate; count them double
+EMPLOYER_TERM_WEIGHT = 2.0
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this "
+    "to was we were will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count: about four characters per token for English"""
+    return max(1, (len(text) + 3) // 4)
+
+def term_vector(text: str) -> Tuple[Dict[str, int], int]:
+    """Term counts and length in terms, as BM25 needs them"""
+    tokens = tokenize(text)
+    return dict(Counter(tokens)), len(tokens)
+
+def load_employer_terms(db: Session, employer_name: Optional[str]) -> Optional[dict]:
+    """The named employer's values and keywords, matched exactly on the indexed name"""
+    if not employer_name:
+        return None
+    return load_employers_terms(db, [employer_name]).get(employer_name.strip())
+
+def load_employers_terms(db: Session, employer_names: Iterable[Optional[str]]) -> Dict[str, dict]:
+    """load_employer_terms for many employers in one query, keyed by the stripped name"""
+    names = {name.strip() for name in employer_names if name and name.strip()}
+    if not names:
+        return {}
+    rows = db.execute(
+        select(Employer.name, Employer.values, Employer.keywords).where(Employer.name.in_(names))
+    ).mappings()
+    return {row["name"]: {"values": row["values"], "keywords": row["keywords"]} for row in rows}
+
+def query_weights(request: dict, employer: Optional[dict]) -> Dict[str, float]:
+    weights = Counter()
+    for field in ("job_title", "job_description"):
+        weights.update(tokenize(request.get(field) or ""))
+    if employer:
+        for phrase in (employer.get("values") or []) + (employer.get("keywords") or []):
+            for term in tokenize(str(phrase)):
+                weights[term] += EMPLOYER_TERM_WEIGHT
+    return dict(weights)
+
+def bm25_scores(vectors: List[Dict[str, int]], lengths: List[int], weights: Dict[str, float]) -> np.ndarray:
+    """BM25 score of each document, given as term counts and length, for a weighted query"""
+    count = len(vectors)
+    sizes = [len(vector) for vector in vectors]
+    if not weights or not any(sizes):
+        return np.zeros(count)
+    vocabulary = np.array(sorted(weights))
+    query = np.array([weights[term] for term in vocabulary])
+    lengths = np.asarray(lengths, dtype=np.float64)
+
+    terms = np.array([term for vector in vectors for term in vector])
+    counts = np.array([n for vector in vectors for n in vector.values()], dtype=np.float64)
+    owners = np.repeat(np.arange(count), sizes)
+    positions = np.minimum(np.searchsorted(vocabulary, terms), len(vocabulary) - 1)
+    matched = vocabulary[positions] == terms
+    tf = np.bincount(
+        owners[matched] * len(vocabulary) + positions[matched],
+        weights=counts[matched],
+        minlength=count * len(vocabulary),
+    ).reshape(count, len(vocabulary))
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((count - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ (idf * query)
+
+def select_context(items: List[dict], weights: Dict[str, float], budget: Optional[int]) -> Tuple[List[dict], dict]:
+    """
+    The highest-scoring snapshot items that fit in `budget` tokens (all of
+    them when budget is None), kept in their original order, and a report
+    of the choice.
+    """
+    scores = bm25_scores([item["terms"] for item in items], [item["length"] for item in items], weights)
+
+    chosen = []
+    used = 0
+    # Stable, so equal scores keep the newest-first profile order
+    for i in np.argsort(-scores, kind="stable"):
+        if budget is None or used + items[i]["tokens"] <= budget:
+            chosen.append(int(i))
+            used += items[i]["tokens"]
+
+    selected = set(chosen)
+    report = {
+        "budget": budget,
+        "tokens": used,
+        "candidates": len(items),
+        "items": [
+            {
+                "kind": items[i]["kind"],
+                "id": items[i]["id"],
+                "score": round(float(scores[i]), 4),
+                "tokens": items[i]["tokens"],
+            }
+            for i in chosen
+        ],
+    }
+    return [item for i, item in enumerate(items) if i in selected], report
@@ -0,0 +1,189 @@
+"""
+Document generation: prompt assembly, the provider call and saving the
+result. Jobs use generate_document; the streaming endpoint drives
+stream_content itself and saves with save_generated_document; batches
+use prepare_batch, generate_many and save_generated_documents.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.ai_generation.cache import generation_cache, generation_cache_key
+from app.ai_generation.context import load_employer_terms, load_employers_terms, query_weights, select_context
+from app.ai_generation.profile import format_items
+from app.ai_generation.llm import background_loop, get_llm_client
+from app.ai_generation.providers import ProviderError
+from app.auth import generate_uuid
+from app.config import get_settings
+from app.crud import insert_returning
+from app.documents.content import store_content
+from app.documents.revisions import record_first_revisions, record_revision
+from app.experiences.snapshot import load_profile_items
+from app.models import Document
+
+settings = get_settings()
+
+DOCUMENT_TYPE_NAMES = {"cv": "CV", "cover_letter": "cover letter"}
+
+# Bump when build_prompt changes, so cached responses to old prompts are not reused
+PROMPT_VERSION = "1"
+
+@dataclass(frozen=True)
+class PreparedGeneration:
+    title: str
+    prompt: str
+    cache_key: str
+    context: dict  # the profile items chosen for the prompt, see select_context
+
+@dataclass(frozen=True)
+class GeneratedContent:
+    """One finished generation of a batch; content is None when it failed"""
+    index: int
+    content: Optional[str]
+    cached: bool = False
+    error: Optional[ProviderError] = None
+
+def document_title(request: dict) -> str:
+    return f"Generated {request['document_type'].capitalize()}"
+
+def build_prompt(request: dict, items: List[dict]) -> str:
+    sections = [f"Write a {DOCUMENT_TYPE_NAMES[request['document_type']]} tailored to the position below."]
+    if request.get("job_title"):
+        sections.append(f"Position: {request['job_title']}")
+    if request.get("employer_name"):
+        sections.append(f"Employer: {request['employer_name']}")
+    if request.get("job_description"):
+        sections.append(f"Job description:\n{request['job_description']}")
+    candidate = format_items(items)
+    if candidate:
+        sections.append(f"The candidate's background:\n\n{candidate}")
+    # The DOCX renderer understands exactly this markup
+    sections.append("Answer in plain text, using '# ' and '## ' for headings and '- ' for bullet points.")
+    return "\n\n".join(sections)
+
+def pack_generation(request: dict, items: List[dict], employer: Optional[dict]) -> PreparedGeneration:
+    """Pick the profile items worth prompting with and build the prompt and cache key"""
+    # Explicitly selected items are always used; only "everything" is packed
+    budget = settings.GENERATION_CONTEXT_TOKEN_BUDGET
+    if not request.get("use_all_experiences", True) or budget <= 0:
+        budget = None
+    items, context = select_context(items, query_weights(request, employer), budget)
+    identity = (PROMPT_VERSION, get_llm_client().provider.identity, str(settings.AI_MAX_OUTPUT_TOKENS))
+    return PreparedGeneration(
+        title=document_title(request),
+        prompt=build_prompt(request, items),
+        cache_key=generation_cache_key(request, items, *identity),
+        context=context,
+    )
+
+def prepare_generation(db: Session, user_id: str, request: dict) -> PreparedGeneration:
+    """
+    Load the referenced profile items from the user's snapshot and the
+    employer's terms, then pack_generation. Ends the read transaction, so no
+    connection is held during the provider call.
+    """
+    items = load_profile_items(db, user_id, request)
+    employer = load_employer_terms(db, request.get("employer_name"))
+    db.rollback()
+    return pack_generation(request, items, employer)
+
+def prepare_batch(db: Session, user_id: str, requests: List[dict]) -> List[PreparedGeneration]:
+    """
+    prepare_generation for requests that share their profile selection
+    (they differ only in employer and job): the snapshot is read once and
+    every employer in one query. Ends the read transaction.
+    """
+    items = load_profile_items(db, user_id, requests[0]) if requests else []
+    employers = load_employers_terms(db, [request.get("employer_name") for request in requests])
+    db.rollback()
+    return [
+        pack_generation(request, items, employers.get((request.get("employer_name") or "").strip()))
+        for request in requests
+    ]
+
+async def stream_content(prepared: PreparedGeneration, user_id: str) -> AsyncIterator[str]:
+    """Document text as the provider produces it"""
+    async for text in get_llm_client().stream(prepared.prompt, settings.AI_MAX_OUTPUT_TOKENS, user_id):
+        yield text
+
+def generate_content(prepared: PreparedGeneration, user_id: str, use_cache: bool = True) -> str:
+    """Document text, from the cache when possible. Blocks; for worker threads."""
+    if use_cache:
+        cached = generation_cache.get(prepared.cache_key)
+        if cached is not None:
+            return cached
+    content = background_loop.run(
+        get_llm_client().complete(prepared.prompt, settings.AI_MAX_OUTPUT_TOKENS, user_id)
+    )
+    generation_cache.put(prepared.cache_key, content)
+    return content
+
+async def generate_many(
+    prepared: List[PreparedGeneration], user_id: str, use_cache: bool = True, concurrency: int = 1
+) -> AsyncIterator[GeneratedContent]:
+    """
+    Run several generations, at most `concurrency` provider calls at a
+    time, yielding each as it finishes. Cached outputs are yielded without
+    taking a slot. Closing the iterator cancels the calls still running.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, generation: PreparedGeneration) -> GeneratedContent:
+        if use_cache:
+            cached = await asyncio.to_thread(generation_cache.get, generation.cache_key)
+            if cached is not None:
+                return GeneratedContent(index, cached, cached=True)
+        try:
+            async with slots:
+                content = await get_llm_client().complete(generation.prompt, settings.AI_MAX_OUTPUT_TOKENS, user_id)
+        except ProviderError as e:
+            return GeneratedContent(index, None, error=e)
+        await asyncio.to_thread(generation_cache.put, generation.cache_key, content)
+        return GeneratedContent(index, content)
+
+    tasks = [asyncio.ensure_future(run(index, generation)) for index, generation in enumerate(prepared)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def _document_values(user_id: str, request: dict, title: str, content: str) -> dict:
+    return store_content({
+        "id": generate_uuid(),
+        "user_id": user_id,
+        "title": title,
+        "content": content,
+        "document_type": request["document_type"],
+        "employer_name": request.get("employer_name"),
+        "job_title": request.get("job_title"),
+    })
+
+def save_generated_document(db: Session, user_id: str, request: dict, title: str, content: str) -> dict:
+    """Insert a generated document and its first revision. Does not commit."""
+    document = insert_returning(db, Document, _document_values(user_id, request, title, content), commit=False)
+    record_revision(db, document["id"], content)
+    return {**document, "content": content}
+
+def save_generated_documents(db: Session, user_id: str, documents: List[Tuple[dict, str, str]]) -> List[str]:
+    """
+    Insert generated documents, given as (request, title, content), and
+    their first revisions with one executemany INSERT each. Returns the new
+    document ids in order. Does not commit.
+    """
+    rows = [_document_values(user_id, request, title, content) for request, title, content in documents]
+    if rows:
+        db.execute(insert(Document), rows)
+        record_first_revisions(db, [(row["id"], content) for row, (_, _, content) in zip(rows, documents)])
+    return [row["id"] for row in rows]
+
+def generate_document(db: Session, user_id: str, request: dict, use_cache: bool = True) -> Tuple[dict, dict]:
+    """Generate and insert a document; returns it with the context report. Does not commit."""
+    prepared = prepare_generation(db, user_id, request)
+    content = generate_content(prepared, user_id, use_cache)
+    return save_generated_document(db, user_id, request, prepared.title, content), prepared.context
@@ -0,0 +1,132 @@
+"""
+Persisted generation job state.
+
+Every transition is a single conditional statement, so duplicate deliveries
+(a Celery redelivery, a recovery resubmit) cannot run a job twice. Job
+creation also locks the user's row, so a burst of submissions cannot
+exceed the per-user cap.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import JSON, String, Integer, func, insert, literal, or_, select, type_coerce, update
+from sqlalchemy.orm import Session
+
+from app.auth import generate_uuid
+from app.config import get_settings
+from app.models import GenerationJob, User
+
+settings = get_settings()
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+class JobLimitReached(Exception):
+    """The user already has the maximum number of active generation jobs"""
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _as_response(row) -> dict:
+    job = dict(row)
+    job["document_type"] = (job.get("request") or {}).get("document_type", "")
+    return job
+
+def create_job(db: Session, user_id: str, request: dict) -> dict:
+    """
+    Queue a job unless the user is at their active-job cap, counting and
+    inserting in one INSERT ... SELECT. At READ COMMITTED that statement
+    cannot see another transaction's uncommitted job, so the user's row is
+    locked first and concurrent submits for one user count one at a time.
+    (SQLite has no row locks, but it runs one write transaction at a time.)
+    """
+    jobs = GenerationJob.__table__
+    job_id = generate_uuid()
+    db.execute(select(User.id).where(User.id == user_id).with_for_update())
+    active = (
+        select(func.count())
+        .select_from(jobs)
+        .where(jobs.c.user_id == user_id, jobs.c.status.in_(ACTIVE_STATUSES))
+        .scalar_subquery()
+    )
+    source = select(
+        literal(job_id, String),
+        literal(user_id, String),
+        literal("queued", String),
+        type_coerce(literal(request, JSON), JSON),
+        literal(0, Integer),
+    ).where(active < settings.GENERATION_MAX_ACTIVE_JOBS_PER_USER)
+    inserted = db.execute(
+        insert(jobs).from_select(["id", "user_id", "status", "request", "attempts"], source)
+    ).rowcount
+    if not inserted:
+        db.rollback()
+        raise JobLimitReached()
+    row = db.execute(select(jobs).where(jobs.c.id == job_id)).mappings().one()
+    db.commit()
+    return _as_response(row)
+
+def get_job(db: Session, job_id: str, user_id: str) -> Optional[dict]:
+    jobs = GenerationJob.__table__
+    row = db.execute(
+        select(jobs).where(jobs.c.id == job_id, jobs.c.user_id == user_id)
+    ).mappings().first()
+    return _as_response(row) if row else None
+
+def poll_job(db: Session, job_id: str, user_id: str) -> Optional[dict]:
+    """get_job for long-polling: ends the read transaction so no connection is held while waiting"""
+    job = get_job(db, job_id, user_id)
+    db.rollback()
+    return job
+
+def _claimable():
+    """Queued jobs, and running jobs whose worker has outlived the lease"""
+    jobs = GenerationJob.__table__
+    expired = _utcnow() - timedelta(seconds=settings.GENERATION_JOB_LEASE_SECONDS)
+    return or_(
+        jobs.c.status == "queued",
+        (jobs.c.status == "running") & (jobs.c.started_at < expired),
+    )
+
+def claim_job(db: Session, job_id: str) -> Optional[dict]:
+    """Mark a job running for this worker; None if another worker has it or it is finished"""
+    jobs = GenerationJob.__table__
+    claimed = db.execute(
+        update(jobs)
+        .where(jobs.c.id == job_id, _claimable())
+        .values(status="running", started_at=_utcnow(), attempts=jobs.c.attempts + 1)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return None
+    row = db.execute(select(jobs).where(jobs.c.id == job_id)).mappings().one()
+    db.commit()
+    return dict(row)
+
+def finish_job(
+    db: Session,
+    job_id: str,
+    document_id: Optional[str] = None,
+    error: Optional[str] = None,
+    context: Optional[dict] = None,
+) -> None:
+    jobs = GenerationJob.__table__
+    db.execute(
+        update(jobs)
+        .where(jobs.c.id == job_id, jobs.c.status == "running")
+        .values(
+            status="failed" if error else "succeeded",
+            document_id=document_id,
+            error=error,
+            context=context,
+            finished_at=_utcnow(),
+        )
+    )
+    db.commit()
+
+def recoverable_job_ids(db: Session) -> List[str]:
+    """Jobs a restarted worker should (re)submit, oldest first"""
+    jobs = GenerationJob.__table__
+    return list(db.execute(
+        select(jobs.c.id).where(_claimable()).order_by(jobs.c.created_at)
+    ).scalars())
@@ -0,0 +1,213 @@
+"""
+The client all generation goes through.
+
+LLMClient wraps the configured provider with:
+- concurrency limits: AI_MAX_CONCURRENCY calls at once overall and
+  AI_MAX_CONCURRENCY_PER_USER per user, each waiting FIFO for a slot;
+- retries of retryable failures with full-jitter exponential backoff, as
+  long as no text has been streamed yet;
+- a circuit breaker that fails calls fast while the provider is down;
+- a timeout budget: AI_TIMEOUT_BUDGET_SECONDS covers waiting for a slot,
+  every attempt and the backoff between them, and the HTTP read timeout
+  bounds each wait for the next chunk.
+
+HTTP providers share one keep-alive client per event loop. Synchronous
+callers (job workers) run calls on a single background loop, so they
+share its connections too.
+"""
+import asyncio
+import threading
+from contextlib import aclosing, asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.ai_generation.providers import GenerationProvider, HttpClients, ProviderError, create_provider
+from app.ai_generation.resilience import CircuitBreaker, KeyedSemaphore, LoopSafeSemaphore, backoff_delay
+from app.config import get_settings
+
+class ProviderBusy(ProviderError):
+    """No provider slot freed up within the timeout budget"""
+
+class ProviderUnavailable(ProviderError):
+    """The circuit breaker is open"""
+
+class ProviderTimeout(ProviderError):
+    """Generation ran past its timeout budget"""
+
+class LLMClient:
+    def __init__(
+        self,
+        provider: GenerationProvider,
+        http: HttpClients,
+        max_concurrency: int,
+        per_user_concurrency: int,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_max: float,
+        budget_seconds: float,
+        breaker: CircuitBreaker,
+    ):
+        self.provider = provider
+        self.http = http
+        self.slots = LoopSafeSemaphore(max_concurrency)
+        self.user_slots = KeyedSemaphore(per_user_concurrency)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budget_seconds = budget_seconds
+        self.breaker = breaker
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0, "busy": 0, "timeouts": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    async def _acquire(self, acquire, deadline: float) -> None:
+        try:
+            await asyncio.wait_for(acquire, max(deadline - asyncio.get_running_loop().time(), 0.001))
+        except asyncio.TimeoutError:
+            self._count("busy")
+            raise ProviderBusy("AI provider is at capacity, try again shortly", retry_after=5) from None
+
+    @asynccontextmanager
+    async def _slot(self, user_id: Optional[str], deadline: float):
+        # The user's own slot first, so one user's backlog queues behind itself
+        if user_id is not None:
+            await self._acquire(self.user_slots.acquire(user_id), deadline)
+        try:
+            await self._acquire(self.slots.acquire(), deadline)
+            try:
+                yield
+            finally:
+                self.slots.release()
+        finally:
+            if user_id is not None:
+                self.user_slots.release(user_id)
+
+    async def stream(self, prompt: str, max_tokens: int, user_id: Optional[str] = None) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.budget_seconds
+        self._count("calls")
+        async with self._slot(user_id, deadline):
+            attempt = 0
+            while True:
+                attempt += 1
+                if not self.breaker.allow():
+                    self._count("rejected")
+                    raise ProviderUnavailable(
+                        "AI provider is unavailable, try again shortly", retry_after=self.breaker.reset_seconds
+                    )
+                emitted = False
+                try:
+                    async with aclosing(self.provider.stream(prompt, max_tokens)) as texts:
+                        async for text in texts:
+                            if loop.time() > deadline:
+                                raise ProviderTimeout("AI generation took too long")
+                            emitted = True
+                            yield text
+                except ProviderTimeout:
+                    self._count("timeouts")
+                    self.breaker.record_failure()
+                    raise
+                except ProviderError as e:
+                    if not e.retryable:
+                        raise
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, e.retry_after)
+                    # Text already sent to the caller cannot be taken back
+                    if emitted or attempt >= self.max_attempts or loop.time() + delay >= deadline:
+                        raise
+                    self._count("retries")
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return
+
+    async def complete(self, prompt: str, max_tokens: int, user_id: Optional[str] = None) -> str:
+        return "".join([text async for text in self.stream(prompt, max_tokens, user_id)])
+
+    async def aclose(self) -> None:
+        """Close the current event loop's HTTP connections"""
+        await self.http.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "provider": self.provider.identity,
+            **counters,
+            "slots": self.slots.stats(),
+            "user_slots": self.user_slots.stats(),
+            "circuit": self.breaker.stats(),
+        }
+
+class BackgroundLoop:
+    """An event loop on a daemon thread, for running coroutines from synchronous code"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def run(self, coro):
+        """Run a coroutine on the loop and block until it finishes"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def stop(self, cleanup=None) -> None:
+        """Stop the loop, first running the `cleanup` coroutine function on it"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if cleanup is not None:
+            asyncio.run_coroutine_threadsafe(cleanup(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+background_loop = BackgroundLoop("generation-loop")
+
+def create_llm_client(settings) -> LLMClient:
+    http = HttpClients(
+        timeout=httpx.Timeout(settings.AI_READ_TIMEOUT_SECONDS, connect=settings.AI_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=settings.AI_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.AI_MAX_CONCURRENCY,
+        ),
+    )
+    return LLMClient(
+        provider=create_provider(settings, http),
+        http=http,
+        max_concurrency=settings.AI_MAX_CONCURRENCY,
+        per_user_concurrency=settings.AI_MAX_CONCURRENCY_PER_USER,
+        max_attempts=settings.AI_MAX_ATTEMPTS,
+        backoff_base=settings.AI_RETRY_BACKOFF_SECONDS,
+        backoff_max=settings.AI_RETRY_BACKOFF_MAX_SECONDS,
+        budget_seconds=settings.AI_TIMEOUT_BUDGET_SECONDS,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.AI_CIRCUIT_RESET_SECONDS,
+        ),
+    )
+
+@lru_cache()
+def get_llm_client() -> LLMClient:
+    return create_llm_client(get_settings())
+
+async def shutdown_llm_client() -> None:
+    """Close the caller's loop's connections and stop the background loop"""
+    client = get_llm_client()
+    await client.aclose()
+    await asyncio.get_running_loop().run_in_executor(None, background_loop.stop, client.aclose)
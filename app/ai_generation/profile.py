@@ -0,0 +1,72 @@
+"""
+Profile items for generation prompts.
+
+Prompts are built from the user's profile snapshot (app.experiences.snapshot),
+whose items carry the text format_item produces. load_profile_rows reads
+the source tables and is only needed to build a snapshot.
+"""
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Achievement, Education, Experience
+
+# (profile key, model, request key for selected ids, columns used in prompts)
+PROFILE_SECTIONS = (
+    ("experiences", Experience, "experience_ids",
+     ("company_name", "job_title", "start_date", "end_date", "is_current", "location", "description")),
+    ("educations", Education, "education_ids",
+     ("institution", "degree", "field_of_study", "start_date", "end_date", "is_current", "location", "description")),
+    ("achievements", Achievement, "achievement_ids",
+     ("title", "description", "date")),
+)
+
+ITEM_KINDS = {"experiences": "experience", "educations": "education", "achievements": "achievement"}
+SECTION_HEADINGS = {"experiences": "Experience", "educations": "Education", "achievements": "Achievements"}
+
+def load_profile_rows(db: Session, user_id: str) -> Dict[str, List[dict]]:
+    """Every profile row of a user by section, newest first, with the columns prompts use"""
+    profile = {}
+    for key, model, _, columns in PROFILE_SECTIONS:
+        table = model.__table__
+        stmt = (
+            select(table.c.id, table.c.created_at, *(table.c[name] for name in columns))
+            .where(table.c.user_id == user_id)
+            .order_by(table.c.created_at.desc(), table.c.id.desc())
+        )
+        profile[key] = [dict(row) for row in db.execute(stmt).mappings()]
+    return profile
+
+def _period(row: dict) -> str:
+    start = row.get("start_date")
+    end = "present" if row.get("is_current") else row.get("end_date")
+    if start is None:
+        return ""
+    end = end.strftime("%b %Y") if hasattr(end, "strftime") else (end or "")
+    return f" ({start.strftime('%b %Y')} - {end})" if end else f" ({start.strftime('%b %Y')})"
+
+def _entry(heading: str, row: dict) -> str:
+    lines = [f"- {heading}"]
+    if row.get("description"):
+        lines.extend(f"  {line}" for line in row["description"].strip().splitlines())
+    return "\n".join(lines)
+
+def format_item(key: str, row: dict) -> str:
+    """One profile row as it appears in prompts"""
+    if key == "experiences":
+        location = f", {row['location']}" if row.get("location") else ""
+        return _entry(f"{row['job_title']} at {row['company_name']}{_period(row)}{location}", row)
+    if key == "educations":
+        return _entry(f"{row['degree']} in {row['field_of_study']}, {row['institution']}{_period(row)}", row)
+    date = f" ({row['date'].strftime('%b %Y')})" if row.get("date") else ""
+    return _entry(f"{row['title']}{date}", row)
+
+def format_items(items: List[dict]) -> str:
+    """Plain-text profile for prompts from snapshot items, grouped by section"""
+    sections = []
+    for key, _, _, _ in PROFILE_SECTIONS:
+        texts = [item["text"] for item in items if item["kind"] == ITEM_KINDS[key]]
+        if texts:
+            sections.append(f"{SECTION_HEADINGS[key]}:\n" + "\n".join(texts))
+    return "\n\n".join(sections)
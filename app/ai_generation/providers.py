@@ -0,0 +1,197 @@
+"""
+Text generation providers.
+
+A provider streams the text of one completion as the model produces it;
+limits, retries and the circuit breaker are applied around it by
+app.ai_generation.llm. AI_PROVIDER selects "anthropic" (the Messages API)
+or "fake", which emits deterministic text with configurable latency and
+failures so generation can be developed and load-tested offline.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import weakref
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+class ProviderError(Exception):
+    """The provider failed to produce a completion"""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+class HttpClients:
+    """
+    One keep-alive httpx.AsyncClient per event loop. An AsyncClient's
+    connections belong to the loop that opened them, and provider calls
+    run both on the server's loop and on the background generation loop.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._clients[loop] = httpx.AsyncClient(**self.options)
+            return client
+
+    async def aclose(self) -> None:
+        """Close the current loop's client"""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+class GenerationProvider:
+    name = ""
+
+    @property
+    def identity(self) -> str:
+        """Everything besides the prompt that determines the output, for cache keys"""
+        return self.name
+
+    def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+def fake_tokens(prompt: str, words: int) -> List[str]:
+    """Deterministic words drawn from the prompt, in short paragraphs"""
+    vocabulary = re.findall(r"[A-Za-z]{3,}", prompt) or ["placeholder"]
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    tokens = []
+    for i in range(words):
+        separator = "\n\n" if i % 40 == 39 else " "
+        tokens.append(rng.choice(vocabulary).lower() + separator)
+    return tokens
+
+class FakeProvider(GenerationProvider):
+    """
+    Local stand-in for a model. Output depends only on the prompt; calls
+    fail with a retryable error at `failure_rate`, drawn from a generator
+    seeded with `seed` so a load test's failures are reproducible.
+    """
+    name = "fake"
+
+    def __init__(
+        self,
+        token_delay: float = 0.0,
+        response_words: int = 200,
+        first_token_delay: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.token_delay = token_delay
+        self.response_words = response_words
+        self.first_token_delay = first_token_delay
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def identity(self) -> str:
+        return f"{self.name}:{self.response_words}"
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        with self._lock:
+            fail = self._rng.random() < self.failure_rate
+        if self.first_token_delay:
+            await asyncio.sleep(self.first_token_delay)
+        if fail:
+            raise ProviderError("Fake provider failure", retryable=True)
+        for token in fake_tokens(prompt, min(self.response_words, max_tokens)):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+# Statuses worth retrying: rate limiting, overload and transient server errors
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERROR_TYPES = {"overloaded_error", "api_error", "rate_limit_error"}
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+class AnthropicProvider(GenerationProvider):
+    name = "anthropic"
+    API_VERSION = "2023-06-01"
+
+    def __init__(self, api_key: str, model: str, http: HttpClients, base_url: str = "https://api.anthropic.com"):
+        self.api_key = api_key
+        self.model = model
+        self.http = http
+        self.url = base_url.rstrip("/") + "/v1/messages"
+
+    @property
+    def identity(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        return self.stream_with(self.http.get(), prompt, max_tokens)
+
+    async def stream_with(self, client: httpx.AsyncClient, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        if not self.api_key:
+            raise ProviderError("ANTHROPIC_API_KEY is not set")
+        headers = {"x-api-key": self.api_key, "anthropic-version": self.API_VERSION}
+        payload = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        try:
+            async with client.stream("POST", self.url, headers=headers, json=payload) as response:
+                if response.status_code != 200:
+                    body = (await response.aread())[:500].decode("utf-8", "replace")
+                    raise ProviderError(
+                        f"Anthropic API returned {response.status_code}: {body}",
+                        retryable=response.status_code in RETRYABLE_STATUSES,
+                        retry_after=_retry_after(response),
+                    )
+                # Read to the end of the body even after message_stop, or the
+                # connection cannot go back to the pool
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data = json.loads(line[len("data:"):])
+                        if event == "content_block_delta" and data["delta"].get("type") == "text_delta":
+                            yield data["delta"]["text"]
+                        elif event == "error":
+                            error = data.get("error", {})
+                            raise ProviderError(
+                                error.get("message", "Anthropic API error"),
+                                retryable=error.get("type") in RETRYABLE_ERROR_TYPES,
+                            )
+        except httpx.HTTPError as e:
+            raise ProviderError(f"Anthropic API request failed: {e!r}", retryable=True) from e
+
+def create_provider(settings, http: HttpClients) -> GenerationProvider:
+    if settings.AI_PROVIDER == "anthropic":
+        return AnthropicProvider(
+            api_key=settings.ANTHROPIC_API_KEY,
+            model=settings.AI_MODEL,
+            http=http,
+            base_url=settings.ANTHROPIC_BASE_URL,
+        )
+    if settings.AI_PROVIDER == "fake":
+        return FakeProvider(
+            token_delay=settings.AI_FAKE_TOKEN_DELAY_SECONDS,
+            response_words=settings.AI_FAKE_RESPONSE_WORDS,
+            first_token_delay=settings.AI_FAKE_FIRST_TOKEN_SECONDS,
+            failure_rate=settings.AI_FAKE_FAILURE_RATE,
+            seed=settings.AI_FAKE_SEED,
+        )
+    raise ValueError(f"Unknown AI_PROVIDER '{settings.AI_PROVIDER}'")
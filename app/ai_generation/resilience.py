@@ -0,0 +1,154 @@
+"""
+Concurrency limits, backoff and a circuit breaker for provider calls.
+
+Provider calls run on more than one event loop (request handlers on the
+server's loop, jobs on the background generation loop), so these are
+shared across loops and threads rather than built on asyncio.Semaphore,
+which binds to a single loop. Waiters are woken with
+call_soon_threadsafe, as in JobNotifier.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+class LoopSafeSemaphore:
+    """A FIFO semaphore usable from coroutines on any event loop"""
+
+    def __init__(self, value: int):
+        self.limit = value
+        self._value = value
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            # The slot was handed over just as we gave up; pass it on
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if not loop.is_closed():
+                    # The slot goes straight to the waiter, so it cannot be barged
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+            self._value += 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            # Cancelled while the grant was in flight
+            self.release()
+        else:
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"limit": self.limit, "in_use": self.limit - self._value, "waiting": len(self._waiters)}
+
+class KeyedSemaphore:
+    """A LoopSafeSemaphore per key (e.g. per user), kept only while in use"""
+
+    def __init__(self, value: int):
+        self.value = value
+        self._semaphores: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str) -> None:
+        with self._lock:
+            entry = self._semaphores.setdefault(key, [LoopSafeSemaphore(self.value), 0])
+            entry[1] += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._forget(key)
+            raise
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._semaphores[key]
+        entry[0].release()
+        self._forget(key)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            entry = self._semaphores[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._semaphores[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"limit": self.value, "keys": len(self._semaphores)}
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing provider. After `failure_threshold` consecutive
+    failures the circuit opens and calls are refused for `reset_seconds`;
+    then a single trial call is let through, and its outcome closes or
+    reopens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._changed_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # Open: wait out the reset period. Half-open: one trial at a time,
+            # unless the trial never reported back (e.g. it was cancelled)
+            if time.monotonic() - self._changed_at < self.reset_seconds:
+                return False
+            self.state = "half_open"
+            self._changed_at = time.monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._changed_at = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "opened": self.opened}
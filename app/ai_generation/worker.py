@@ -0,0 +1,159 @@
+"""
+Job execution.
+
+run_job is the unit of work for every backend: it claims the job, runs
+generation and records the outcome, and is safe to call more than once for
+the same job. Jobs left behind by a restart are resubmitted by
+recover_jobs at startup.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.ai_generation.generator import generate_document
+from app.ai_generation.jobs import claim_job, finish_job, recoverable_job_ids
+from app.ai_generation.providers import ProviderError
+from app.config import get_settings
+from app.database import SessionLocal
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+class JobNotifier:
+    """
+    Wakes long-polling requests in this process as soon as a job finishes
+    here. Jobs finished by other processes are picked up by the pollers'
+    periodic re-read instead.
+    """
+
+    def __init__(self):
+        self._waiters = defaultdict(set)
+        self._lock = threading.Lock()
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters[job_id].add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(job_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[job_id]
+
+    def notify(self, job_id: str) -> None:
+        """Callable from any thread"""
+        with self._lock:
+            waiters = list(self._waiters.get(job_id, ()))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+job_notifier = JobNotifier()
+
+def run_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        job = claim_job(db, job_id)
+        if job is None:
+            return
+        try:
+            request = job["request"]
+            document, context = generate_document(db, job["user_id"], request, use_cache=request.get("cache") != "bypass")
+        except Exception as e:
+            db.rollback()
+            if isinstance(e, ProviderError):
+                logger.warning("Generation job %s failed: %s", job_id, e)
+            else:
+                logger.exception("Generation job %s failed", job_id)
+            finish_job(db, job_id, error=str(e) or e.__class__.__name__)
+        else:
+            # Commits the document together with the job outcome
+            finish_job(db, job_id, document_id=document["id"], context=context)
+    finally:
+        db.close()
+        job_notifier.notify(job_id)
+
+class InProcessBackend:
+    """
+    Runs jobs on a thread pool inside the API process. Stands in for a
+    broker in development and tests; queued jobs survive a restart in the
+    database and are resubmitted by recover_jobs.
+    """
+    name = "inprocess"
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: str) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="generation")
+            self._pending += 1
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        with self._lock:
+            self._pending -= 1
+        run_job(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {"backend": self.name, "workers": self.workers, "pending": pending}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                # Unstarted jobs stay queued in the database for the next start
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._pending = 0
+
+class CeleryBackend:
+    """Publishes jobs to Celery workers (see app.ai_generation.celery_app)"""
+    name = "celery"
+
+    def submit(self, job_id: str) -> None:
+        # Imported lazily so celery is only loaded when it is the backend
+        from app.ai_generation.celery_app import run_job_task
+        run_job_task.delay(job_id)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    def shutdown(self) -> None:
+        pass
+
+def create_generation_backend(settings):
+    if settings.GENERATION_BACKEND == "inprocess":
+        return InProcessBackend(workers=settings.GENERATION_WORKERS)
+    if settings.GENERATION_BACKEND == "celery":
+        return CeleryBackend()
+    raise ValueError(f"Unknown GENERATION_BACKEND '{settings.GENERATION_BACKEND}'")
+
+generation_backend = create_generation_backend(settings)
+
+def recover_jobs() -> int:
+    """Resubmit queued jobs and jobs whose worker was lost; claims make duplicates harmless"""
+    db = SessionLocal()
+    try:
+        job_ids = recoverable_job_ids(db)
+    finally:
+        db.close()
+    for job_id in job_ids:
+        generation_backend.submit(job_id)
+    if job_ids:
+        logger.info("Resubmitted %d generation jobs", len(job_ids))
+    return len(job_ids)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, experiences, documents, employers
+from app.api.v1.endpoints import auth, users, experiences, documents, generation, employers
 
 api_router = APIRouter()
 
@@ -8,5 +8,6 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(experiences.router, prefix="/profile", tags=["profile"])
+api_router.include_router(generation.router, prefix="/documents", tags=["generation"])
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
 api_router.include_router(employers.router, prefix="/employers", tags=["employers"])
\ No newline at end of file
@@ -3,10 +3,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_session, run_db
 from app.schemas import UserCreate, UserResponse, Token
-from app.models import User
-from app.auth import verify_password, get_password_hash, create_access_token, generate_uuid
+from app.users.crud import get_user_by_email, create_user
+from app.auth import create_access_token, generate_uuid
+from app.auth.hashing import password_hasher
 from app.config import get_settings
 
 settings = get_settings()
@@ -14,12 +15,12 @@ settings = get_settings()
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse)
-def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_in: UserCreate, db: Session = Depends(get_session)):
     """
     Register a new user.
     """
     # Check if user with given email already exists
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = await run_db(db, get_user_by_email, user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,27 +30,22 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     user_data = user_in.dict(exclude={"password"})
     user_data["id"] = generate_uuid()
-    user_data["hashed_password"] = get_password_hash(user_in.password)
+    user_data["hashed_password"] = await password_hasher.hash(user_in.password)
     user_data["is_verified"] = True  # For simplicity, auto-verify users in testing
     
-    db_user = User(**user_data)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    return db_user
+    return await run_db(db, create_user, user_data)
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
-    db: Session = Depends(get_db),
+async def login_for_access_token(
+    db: Session = Depends(get_session),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
     # Check if user exists
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, get_user_by_email, form_data.username)
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
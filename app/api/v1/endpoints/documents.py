@@ -1,12 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
-from app.models import User, Document
-from app.schemas import DocumentCreate, DocumentResponse, DocumentUpdate, DocumentGenerateRequest
+from app.database import get_db, get_session, run_db
+from app.models import Document, DocumentRevision
+from app.schemas import (
+    DocumentCreate, DocumentResponse, DocumentSummary, DocumentUpdate,
+    DocumentRevisionSummary, DocumentRevisionResponse
+)
 from app.auth.deps import get_current_active_user
+from app.auth.cache import Principal
+from app.api.v1.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, keyset_page, page_response, parse_fields, schema_fields
 from app.auth import generate_uuid
+from app.crud import insert_returning, update_returning, delete_where, owned_by
+from app.config import get_settings
+from app.documents.content import load_content, open_file, parse_file_reference, store_content, store_file
+from app.documents.revisions import get_revision, list_revisions, record_revision
+from app.documents.render import docx_filename, document_renderer, get_cached_render, render_key, save_render
+from app.documents.templates import TEMPLATE_NAME_PATTERN, template_cache
+from app.storage.base import CHUNK_SIZE
+
+settings = get_settings()
 
 router = APIRouter()
 
@@ -14,7 +34,7 @@ router = APIRouter()
 def create_document(
     document_in: DocumentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Create a new document for current user.
@@ -23,37 +43,53 @@ def create_document(
     document_data["id"] = generate_uuid()
     document_data["user_id"] = current_user.id
     
-    db_document = Document(**document_data)
-    db.add(db_document)
+    document = insert_returning(db, Document, store_content(document_data), commit=False)
+    record_revision(db, document["id"], document_data["content"])
     db.commit()
-    db.refresh(db_document)
-    
-    return db_document
+    return {**document, "content": document_data["content"]}
 
-@router.get("/", response_model=List[DocumentResponse])
+@router.get("/", response_model=List[DocumentSummary])
 def read_documents(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
-    Get all documents for current user.
+    Get documents for current user, newest first.
+
+    Results are paginated with `limit` and the cursor returned in the
+    X-Next-Cursor header; `fields` limits the columns returned. Content is
+    not included, fetch a single document to get it.
+    """
+    fields = parse_fields(page.fields, schema_fields(DocumentSummary))
+    documents, next_cursor = keyset_page(
+        db, Document, Document.user_id == current_user.id, page=page, fields=fields
+    )
+    return page_response(documents, next_cursor)
+
+@router.get("/templates", response_model=List[str])
+def read_document_templates(current_user: Principal = Depends(get_current_active_user)):
+    """
+    Names of the templates available for DOCX downloads.
     """
-    documents = db.query(Document).filter(Document.user_id == current_user.id).all()
-    return documents
+    return template_cache.names()
+
+def _read_owned_document(db: Session, document_id: str, user_id: str) -> Optional[dict]:
+    document = db.execute(
+        select(Document.__table__).where(*owned_by(Document, document_id, user_id))
+    ).mappings().first()
+    return load_content(document) if document else None
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 def read_document(
     document_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get a specific document by ID.
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    document = _read_owned_document(db, document_id, current_user.id)
     
     if not document:
         raise HTTPException(
@@ -68,15 +104,24 @@ def update_document(
     document_id: str,
     document_in: DocumentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Update a specific document.
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    # Update document with provided fields, scoped to its owner
+    criteria = owned_by(Document, document_id, current_user.id)
+    update_data = document_in.dict(exclude_unset=True)
+    content = update_data.get("content")
+    previous = None
+    if content is not None:
+        # Only used for documents without revisions yet; the others are diffed
+        # against their latest revision once the UPDATE holds the row
+        current = db.execute(select(Document.content, Document.content_ref).where(*criteria)).mappings().first()
+        if current:
+            previous = load_content(current)["content"] or ""
+
+    document = update_returning(db, Document, store_content(update_data), *criteria, commit=False)
     
     if not document:
         raise HTTPException(
@@ -84,70 +129,191 @@ def update_document(
             detail="Document not found"
         )
     
-    # Update document with provided fields
-    for field, value in document_in.dict(exclude_unset=True).items():
-        setattr(document, field, value)
-    
-    db.add(document)
+    if previous is not None:
+        try:
+            record_revision(db, document_id, content, previous)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Document was updated concurrently, retry the update"
+            )
+        return {**document, "content": content}
     db.commit()
-    db.refresh(document)
-    
-    return document
+    return load_content(document)
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_document(
     document_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Delete a specific document.
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    if not delete_where(db, Document, *owned_by(Document, document_id, current_user.id), commit=False):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
     
-    if not document:
+    # SQLite does not enforce the ON DELETE CASCADE without PRAGMA foreign_keys
+    delete_where(db, DocumentRevision, DocumentRevision.document_id == document_id)
+    return None
+
+@router.get("/{document_id}/revisions", response_model=List[DocumentRevisionSummary])
+def read_document_revisions(
+    document_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[int] = Query(None, ge=1, description="Only revisions numbered below this"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    List the saved revisions of a document, newest first.
+    """
+    _owned_document_exists(db, document_id, current_user.id)
+    return list_revisions(db, document_id, limit=limit, before=before)
+
+@router.get("/{document_id}/revisions/{number}", response_model=DocumentRevisionResponse)
+def read_document_revision(
+    document_id: str,
+    number: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Get the content of a document as it was at one revision.
+    """
+    _owned_document_exists(db, document_id, current_user.id)
+    revision = get_revision(db, document_id, number)
+    
+    if not revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+    
+    return revision
+
+def _owned_document_exists(db: Session, document_id: str, user_id: str) -> None:
+    if db.execute(select(Document.id).where(*owned_by(Document, document_id, user_id))).first() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
+
+def _upload_chunks(file: UploadFile):
+    """Read an upload in chunks, stopping once it exceeds the size limit"""
+    size = 0
+    while True:
+        chunk = file.file.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        size += len(chunk)
+        if size > settings.STORAGE_MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File too large"
+            )
+        yield chunk
+
+@router.put("/{document_id}/file", response_model=DocumentResponse)
+def upload_document_file(
+    document_id: str,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Attach a file (e.g. an exported PDF or DOCX) to a document.
+
+    The upload is streamed into blob storage in chunks; identical files are
+    stored once.
+    """
+    _owned_document_exists(db, document_id, current_user.id)
+    file_path = store_file(_upload_chunks(file), file.filename or "file")
+    document = update_returning(
+        db, Document,
+        {"file_path": file_path, "file_url": f"{settings.API_V1_STR}/documents/{document_id}/file"},
+        *owned_by(Document, document_id, current_user.id)
+    )
     
-    db.delete(document)
-    db.commit()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
     
-    return None
+    return load_content(document)
 
-@router.post("/generate", response_model=DocumentResponse)
-def generate_document(
-    request: DocumentGenerateRequest,
+@router.get("/{document_id}/file")
+def download_document_file(
+    document_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Stream the file attached to a document.
+    """
+    file_path = db.execute(
+        select(Document.file_path).where(*owned_by(Document, document_id, current_user.id))
+    ).scalar()
+    
+    if not parse_file_reference(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    chunks, filename, media_type = open_file(file_path)
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+
+@router.get("/{document_id}/docx")
+async def download_document_docx(
+    document_id: str,
+    template: str = Query("classic", pattern=TEMPLATE_NAME_PATTERN.pattern),
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
-    Generate a new document using AI based on user profile and preferences.
+    Render a document to DOCX and stream it.
+
+    Rendering runs on a worker pool off the request path. Renders are cached
+    by a hash of (template, title, content), so repeat downloads skip it;
+    the latest render also becomes the document's file.
+    """
+    document = await run_db(db, _read_owned_document, document_id, current_user.id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
     
-    This is a placeholder for the actual AI document generation functionality.
-    In a real implementation, this would:
-    1. Gather user experiences, education, and achievements
-    2. Call the AI generation service
-    3. Create and store the generated document
-    """
-    # For now, create a simple document with placeholder content
-    document_data = {
-        "id": generate_uuid(),
-        "user_id": current_user.id,
-        "title": f"Generated {request.document_type.capitalize()}",
-        "content": f"This is a placeholder for a generated {request.document_type}",
-        "document_type": request.document_type,
-        "employer_name": request.employer_name,
-        "job_title": request.job_title
-    }
+    try:
+        compiled = await run_in_threadpool(template_cache.get, template)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template not found"
+        )
     
-    db_document = Document(**document_data)
-    db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    title, content = document["title"] or "", document["content"] or ""
+    key = render_key(compiled, title, content)
+    file_path = await run_db(db, get_cached_render, key)
+    if file_path is None:
+        data = await document_renderer.render(template, title, content)
+        file_path = await run_in_threadpool(store_file, [data], docx_filename(title))
+        await run_db(db, save_render, key, file_path, document_id, current_user.id)
     
-    return db_document
\ No newline at end of file
+    chunks, filename, media_type = await run_in_threadpool(open_file, file_path)
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
@@ -1,31 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
-from app.models import User, Employer
-from app.schemas import EmployerCreate, EmployerResponse, EmployerUpdate, ScrapeRequest
+from app.models import Employer
+from app.schemas import EmployerCreate, EmployerResponse, EmployerUpdate, EmployerSearchResult, EmployerTagMatchPage, TagCount, ScrapeRequest
 from app.auth.deps import get_current_active_user
+from app.auth.cache import Principal
+from app.api.v1.pagination import NEXT_CURSOR_HEADER, MAX_PAGE_SIZE, PageParams, keyset_page, parse_fields, schema_fields
+from app.api.v1.etag import etag_matches, etag_response
+from app.employers.catalogue import employer_catalogue, catalogue_etag, get_catalogue_version
+from app.employers.search import search_employers
+from app.employers.tags import TAG_KINDS, list_tags, match_employers
+from app.scraper.store import save_scraped_employer
 from app.auth import generate_uuid
 
 router = APIRouter()
 
 @router.get("/", response_model=List[EmployerResponse])
 def read_employers(
+    request: Request,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Get employers from the database, newest first.
+
+    Results are paginated with `limit` and the cursor returned in the
+    X-Next-Cursor header; `fields` limits the columns returned.
+
+    Pages are served from a per-worker cache of serialized responses that is
+    dropped whenever the catalogue version changes. Clients sending a matching
+    If-None-Match get a 304.
+    """
+    fields = parse_fields(page.fields, schema_fields(EmployerResponse))
+    version = get_catalogue_version(db)
+    key = (page.limit, page.cursor, tuple(fields))
+    etag = catalogue_etag(version, key)
+    if etag_matches(request, etag):
+        # The ETag is derived from the version alone, so no body is needed
+        return etag_response(request, b"", etag=etag)
+
+    cached = employer_catalogue.get(version, key)
+    if cached is None:
+        employers, next_cursor = keyset_page(db, Employer, page=page, fields=fields)
+        body = json.dumps(jsonable_encoder(employers), separators=(",", ":")).encode()
+        employer_catalogue.set(version, key, body, next_cursor)
+    else:
+        body, next_cursor = cached
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return etag_response(request, body, etag=etag, headers=headers)
+
+@router.get("/search", response_model=List[EmployerSearchResult])
+def search_employer_catalogue(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Full-text search over employer name, industry, description, values and
+    keywords, best match first.
+    """
+    return search_employers(db, q, limit=limit, offset=offset)
+
+TAG_KIND_PATTERN = f"^({'|'.join(TAG_KINDS)})$"
+
+@router.get("/tags", response_model=List[TagCount])
+def read_employer_tags(
+    kind: Optional[str] = Query(None, pattern=TAG_KIND_PATTERN),
+    prefix: Optional[str] = Query(None, max_length=100),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
-    Get all employers from the database.
+    Value and keyword tags with the number of employers carrying each,
+    most common first.
     """
-    employers = db.query(Employer).all()
-    return employers
+    return list_tags(db, kind=kind, prefix=prefix, limit=limit)
+
+@router.get("/by-tags", response_model=EmployerTagMatchPage)
+def read_employers_by_tags(
+    tag: List[str] = Query(..., description="Repeat to match several tags"),
+    match: str = Query("all", pattern="^(all|any)$"),
+    kind: Optional[str] = Query(None, pattern=TAG_KIND_PATTERN),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Employers carrying all (`match=all`) or any (`match=any`) of the given
+    tags, most matched first, with the total number of matches.
+    """
+    total, items = match_employers(db, tag, match=match, kind=kind, limit=limit, offset=offset)
+    return {"total": total, "items": items}
 
 @router.get("/{employer_id}", response_model=EmployerResponse)
 def read_employer(
     employer_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get a specific employer by ID.
@@ -44,7 +126,7 @@ def read_employer(
 def scrape_employer(
     request: ScrapeRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Scrape employer information from a URL.
@@ -76,9 +158,4 @@ def scrape_employer(
         "keywords": ["technology", "software", "development"]  # Placeholder keywords
     }
     
-    db_employer = Employer(**employer_data)
-    db.add(db_employer)
-    db.commit()
-    db.refresh(db_employer)
-    
-    return db_employer
\ No newline at end of file
+    return save_scraped_employer(db, employer_data)
\ No newline at end of file
@@ -1,25 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
 from app.database import get_db
 from app.models import User, Experience, Education, Achievement
 from app.schemas import (
+    ProfileResponse, BatchResponse,
+    ExperienceBatchRequest, EducationBatchRequest, AchievementBatchRequest,
     ExperienceCreate, ExperienceResponse, ExperienceUpdate,
     EducationCreate, EducationResponse, EducationUpdate,
     AchievementCreate, AchievementResponse, AchievementUpdate
 )
 from app.auth.deps import get_current_active_user
+from app.auth.cache import Principal
+from app.api.v1.pagination import PageParams, keyset_page, page_response, parse_fields, schema_fields
+from app.api.v1.etag import etag_response
 from app.auth import generate_uuid
+from app.experiences.batch import apply_batch
+from app.experiences.snapshot import apply_profile_changes
+from app.crud import insert_returning, update_returning, delete_where, owned_by
+from app.config import get_settings
+
+settings = get_settings()
 
 router = APIRouter()
 
+def check_batch_size(batch_in) -> None:
+    size = len(batch_in.upserts) + len(batch_in.deletes)
+    if size > settings.PROFILE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large: {size} items, maximum is {settings.PROFILE_BATCH_MAX_ITEMS}"
+        )
+
+# Aggregated profile endpoint
+@router.get("", response_model=ProfileResponse)
+def read_profile(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Get the user's basics, experiences, educations and achievements in one call.
+
+    Loads the user and then each collection with a single selectin query.
+    Supports If-None-Match: an unchanged profile returns 304 with no body.
+    """
+    user = (
+        db.query(User)
+        .options(
+            selectinload(User.experiences),
+            selectinload(User.educations),
+            selectinload(User.achievements),
+        )
+        .filter(User.id == current_user.id)
+        .first()
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    profile = ProfileResponse.model_validate(
+        {
+            "user": user,
+            "experiences": user.experiences,
+            "educations": user.educations,
+            "achievements": user.achievements,
+        },
+        from_attributes=True,
+    )
+    body = json.dumps(jsonable_encoder(profile), separators=(",", ":")).encode()
+    return etag_response(request, body)
+
 # Experience endpoints
 @router.post("/experiences", response_model=ExperienceResponse)
 def create_experience(
     experience_in: ExperienceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Create a new work experience for current user.
@@ -28,29 +91,52 @@ def create_experience(
     experience_data["id"] = generate_uuid()
     experience_data["user_id"] = current_user.id
     
-    db_experience = Experience(**experience_data)
-    db.add(db_experience)
+    experience = insert_returning(db, Experience, experience_data, commit=False)
+    apply_profile_changes(db, current_user.id, Experience, rows=[experience])
     db.commit()
-    db.refresh(db_experience)
-    
-    return db_experience
+    return experience
+
+@router.post("/experiences/batch", response_model=BatchResponse)
+def batch_experiences(
+    batch_in: ExperienceBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete experiences in one transaction.
+
+    Upserts without an id are created, upserts with an id update that entry.
+    Returns one result per item in request order (upserts, then deletes).
+    """
+    check_batch_size(batch_in)
+    results = apply_batch(
+        db, Experience, ExperienceCreate, current_user.id, batch_in.upserts, batch_in.deletes
+    )
+    return {"results": results}
 
 @router.get("/experiences", response_model=List[ExperienceResponse])
 def read_experiences(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
-    Get all experiences for current user.
+    Get experiences for current user, newest first.
+
+    Results are paginated with `limit` and the cursor returned in the
+    X-Next-Cursor header; `fields` limits the columns returned.
     """
-    experiences = db.query(Experience).filter(Experience.user_id == current_user.id).all()
-    return experiences
+    fields = parse_fields(page.fields, schema_fields(ExperienceResponse))
+    experiences, next_cursor = keyset_page(
+        db, Experience, Experience.user_id == current_user.id, page=page, fields=fields
+    )
+    return page_response(experiences, next_cursor)
 
 @router.get("/experiences/{experience_id}", response_model=ExperienceResponse)
 def read_experience(
     experience_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get a specific experience by ID.
@@ -73,15 +159,15 @@ def update_experience(
     experience_id: str,
     experience_in: ExperienceUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Update a specific experience.
     """
-    experience = db.query(Experience).filter(
-        Experience.id == experience_id,
-        Experience.user_id == current_user.id
-    ).first()
+    # Update experience with provided fields, scoped to its owner
+    experience = update_returning(
+        db, Experience, experience_in.dict(exclude_unset=True), *owned_by(Experience, experience_id, current_user.id), commit=False
+    )
     
     if not experience:
         raise HTTPException(
@@ -89,39 +175,27 @@ def update_experience(
             detail="Experience not found"
         )
     
-    # Update experience with provided fields
-    for field, value in experience_in.dict(exclude_unset=True).items():
-        setattr(experience, field, value)
-    
-    db.add(experience)
+    apply_profile_changes(db, current_user.id, Experience, rows=[experience])
     db.commit()
-    db.refresh(experience)
-    
     return experience
 
 @router.delete("/experiences/{experience_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_experience(
     experience_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Delete a specific experience.
     """
-    experience = db.query(Experience).filter(
-        Experience.id == experience_id,
-        Experience.user_id == current_user.id
-    ).first()
-    
-    if not experience:
+    if not delete_where(db, Experience, *owned_by(Experience, experience_id, current_user.id), commit=False):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Experience not found"
         )
     
-    db.delete(experience)
+    apply_profile_changes(db, current_user.id, Experience, deleted_ids=[experience_id])
     db.commit()
-    
     return None
 
 # Education endpoints
@@ -129,7 +203,7 @@ def delete_experience(
 def create_education(
     education_in: EducationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Create a new education entry for current user.
@@ -138,29 +212,52 @@ def create_education(
     education_data["id"] = generate_uuid()
     education_data["user_id"] = current_user.id
     
-    db_education = Education(**education_data)
-    db.add(db_education)
+    education = insert_returning(db, Education, education_data, commit=False)
+    apply_profile_changes(db, current_user.id, Education, rows=[education])
     db.commit()
-    db.refresh(db_education)
-    
-    return db_education
+    return education
+
+@router.post("/educations/batch", response_model=BatchResponse)
+def batch_educations(
+    batch_in: EducationBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete education entries in one transaction.
+
+    Upserts without an id are created, upserts with an id update that entry.
+    Returns one result per item in request order (upserts, then deletes).
+    """
+    check_batch_size(batch_in)
+    results = apply_batch(
+        db, Education, EducationCreate, current_user.id, batch_in.upserts, batch_in.deletes
+    )
+    return {"results": results}
 
 @router.get("/educations", response_model=List[EducationResponse])
 def read_educations(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
-    Get all education entries for current user.
+    Get education entries for current user, newest first.
+
+    Results are paginated with `limit` and the cursor returned in the
+    X-Next-Cursor header; `fields` limits the columns returned.
     """
-    educations = db.query(Education).filter(Education.user_id == current_user.id).all()
-    return educations
+    fields = parse_fields(page.fields, schema_fields(EducationResponse))
+    educations, next_cursor = keyset_page(
+        db, Education, Education.user_id == current_user.id, page=page, fields=fields
+    )
+    return page_response(educations, next_cursor)
 
 @router.get("/educations/{education_id}", response_model=EducationResponse)
 def read_education(
     education_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get a specific education entry by ID.
@@ -183,15 +280,15 @@ def update_education(
     education_id: str,
     education_in: EducationUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Update a specific education entry.
     """
-    education = db.query(Education).filter(
-        Education.id == education_id,
-        Education.user_id == current_user.id
-    ).first()
+    # Update education with provided fields, scoped to its owner
+    education = update_returning(
+        db, Education, education_in.dict(exclude_unset=True), *owned_by(Education, education_id, current_user.id), commit=False
+    )
     
     if not education:
         raise HTTPException(
@@ -199,39 +296,27 @@ def update_education(
             detail="Education not found"
         )
     
-    # Update education with provided fields
-    for field, value in education_in.dict(exclude_unset=True).items():
-        setattr(education, field, value)
-    
-    db.add(education)
+    apply_profile_changes(db, current_user.id, Education, rows=[education])
     db.commit()
-    db.refresh(education)
-    
     return education
 
 @router.delete("/educations/{education_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_education(
     education_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Delete a specific education entry.
     """
-    education = db.query(Education).filter(
-        Education.id == education_id,
-        Education.user_id == current_user.id
-    ).first()
-    
-    if not education:
+    if not delete_where(db, Education, *owned_by(Education, education_id, current_user.id), commit=False):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Education not found"
         )
     
-    db.delete(education)
+    apply_profile_changes(db, current_user.id, Education, deleted_ids=[education_id])
     db.commit()
-    
     return None
 
 # Achievement endpoints
@@ -239,7 +324,7 @@ def delete_education(
 def create_achievement(
     achievement_in: AchievementCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Create a new achievement for current user.
@@ -248,29 +333,52 @@ def create_achievement(
     achievement_data["id"] = generate_uuid()
     achievement_data["user_id"] = current_user.id
     
-    db_achievement = Achievement(**achievement_data)
-    db.add(db_achievement)
+    achievement = insert_returning(db, Achievement, achievement_data, commit=False)
+    apply_profile_changes(db, current_user.id, Achievement, rows=[achievement])
     db.commit()
-    db.refresh(db_achievement)
-    
-    return db_achievement
+    return achievement
+
+@router.post("/achievements/batch", response_model=BatchResponse)
+def batch_achievements(
+    batch_in: AchievementBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete achievements in one transaction.
+
+    Upserts without an id are created, upserts with an id update that entry.
+    Returns one result per item in request order (upserts, then deletes).
+    """
+    check_batch_size(batch_in)
+    results = apply_batch(
+        db, Achievement, AchievementCreate, current_user.id, batch_in.upserts, batch_in.deletes
+    )
+    return {"results": results}
 
 @router.get("/achievements", response_model=List[AchievementResponse])
 def read_achievements(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
-    Get all achievements for current user.
+    Get achievements for current user, newest first.
+
+    Results are paginated with `limit` and the cursor returned in the
+    X-Next-Cursor header; `fields` limits the columns returned.
     """
-    achievements = db.query(Achievement).filter(Achievement.user_id == current_user.id).all()
-    return achievements
+    fields = parse_fields(page.fields, schema_fields(AchievementResponse))
+    achievements, next_cursor = keyset_page(
+        db, Achievement, Achievement.user_id == current_user.id, page=page, fields=fields
+    )
+    return page_response(achievements, next_cursor)
 
 @router.get("/achievements/{achievement_id}", response_model=AchievementResponse)
 def read_achievement(
     achievement_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get a specific achievement by ID.
@@ -293,15 +401,15 @@ def update_achievement(
     achievement_id: str,
     achievement_in: AchievementUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Update a specific achievement.
     """
-    achievement = db.query(Achievement).filter(
-        Achievement.id == achievement_id,
-        Achievement.user_id == current_user.id
-    ).first()
+    # Update achievement with provided fields, scoped to its owner
+    achievement = update_returning(
+        db, Achievement, achievement_in.dict(exclude_unset=True), *owned_by(Achievement, achievement_id, current_user.id), commit=False
+    )
     
     if not achievement:
         raise HTTPException(
@@ -309,37 +417,25 @@ def update_achievement(
             detail="Achievement not found"
         )
     
-    # Update achievement with provided fields
-    for field, value in achievement_in.dict(exclude_unset=True).items():
-        setattr(achievement, field, value)
-    
-    db.add(achievement)
+    apply_profile_changes(db, current_user.id, Achievement, rows=[achievement])
     db.commit()
-    db.refresh(achievement)
-    
     return achievement
 
 @router.delete("/achievements/{achievement_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_achievement(
     achievement_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Delete a specific achievement.
     """
-    achievement = db.query(Achievement).filter(
-        Achievement.id == achievement_id,
-        Achievement.user_id == current_user.id
-    ).first()
-    
-    if not achievement:
+    if not delete_where(db, Achievement, *owned_by(Achievement, achievement_id, current_user.id), commit=False):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Achievement not found"
         )
     
-    db.delete(achievement)
+    apply_profile_changes(db, current_user.id, Achievement, deleted_ids=[achievement_id])
     db.commit()
-    
-    return None
\ No newline at end of file
+    return None
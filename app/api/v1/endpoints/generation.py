@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_session, run_db
+from app.schemas import DocumentGenerateBatchRequest, DocumentGenerateRequest, GenerationJobResponse
+from app.auth.deps import get_current_active_user
+from app.auth.cache import Principal
+from app.api.v1.sse import SSE_HEADERS, cancel_on_disconnect, sse_event
+from app.ai_generation.cache import CACHE_MODE_PATTERN, generation_cache
+from app.ai_generation.generator import (
+    PreparedGeneration, generate_many, prepare_batch, prepare_generation, save_generated_document,
+    save_generated_documents, stream_content
+)
+from app.ai_generation.jobs import TERMINAL_STATUSES, JobLimitReached, create_job, poll_job
+from app.ai_generation.providers import ProviderError
+from app.ai_generation.worker import generation_backend, job_notifier
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Long-polls re-read the job this often, to see jobs finished by other processes
+POLL_INTERVAL_SECONDS = 1.0
+
+@router.post("/generate", response_model=GenerationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def generate_document(
+    request: DocumentGenerateRequest,
+    response: Response,
+    cache: str = Query("use", pattern=CACHE_MODE_PATTERN),
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Queue AI generation of a new document.
+
+    Returns a job straight away; poll GET /documents/jobs/{job_id} (with
+    `wait` to long-poll) until it has succeeded, then read document_id.
+    Each user may have GENERATION_MAX_ACTIVE_JOBS_PER_USER jobs queued or
+    running at once.
+
+    Identical requests over an unchanged profile reuse the earlier output;
+    `cache=bypass` forces a fresh generation.
+    """
+    body = request.dict()
+    body["cache"] = cache
+    try:
+        job = await run_db(db, create_job, current_user.id, body)
+    except JobLimitReached:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many generation jobs in progress",
+            headers={"Retry-After": "5"},
+        )
+    await run_in_threadpool(generation_backend.submit, job["id"])
+    response.headers["Location"] = f"{settings.API_V1_STR}/documents/jobs/{job['id']}"
+    return job
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def read_generation_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=settings.GENERATION_MAX_WAIT_SECONDS),
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Get a generation job. With `wait`, hold the request for up to that many
+    seconds until the job has succeeded or failed. A finished job's
+    `context` lists the profile items its prompt used.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        job = await run_db(db, poll_job, job_id, current_user.id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Generation job not found"
+            )
+        remaining = deadline - time.monotonic()
+        if job["status"] in TERMINAL_STATUSES or remaining <= 0:
+            return job
+        await job_notifier.wait(job_id, min(POLL_INTERVAL_SECONDS, remaining))
+
+def _save_streamed_document(user_id: str, request: dict, title: str, content: str) -> dict:
+    # The stream outlives the request's dependencies, so it uses its own session
+    db = SessionLocal()
+    try:
+        document = save_generated_document(db, user_id, request, title, content)
+        db.commit()
+        return document
+    finally:
+        db.close()
+
+async def _generation_events(user_id: str, request: dict, prepared: PreparedGeneration, cached: Optional[str]):
+    yield sse_event("context", prepared.context)
+    if cached is not None:
+        content = cached
+        yield sse_event("token", {"text": content})
+    else:
+        parts = []
+        try:
+            async for text in stream_content(prepared, user_id):
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except ProviderError as e:
+            logger.warning("Streaming generation failed: %s", e)
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+            return
+        except asyncio.CancelledError:
+            logger.info("Streaming generation cancelled after %d chunks", len(parts))
+            raise
+        content = "".join(parts)
+        await run_in_threadpool(generation_cache.put, prepared.cache_key, content)
+    document = await run_in_threadpool(_save_streamed_document, user_id, request, prepared.title, content)
+    yield sse_event("done", {"document_id": document["id"], "title": document["title"], "cached": cached is not None})
+
+@router.post("/generate/stream")
+async def generate_document_stream(
+    request_in: DocumentGenerateRequest,
+    request: Request,
+    cache: str = Query("use", pattern=CACHE_MODE_PATTERN),
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Generate a document, streaming its text as server-sent events.
+
+    Emits a `context` event listing the profile items chosen for the
+    prompt, a `token` event ({"text": ...}) for each chunk as the model
+    produces it, then `done` with the saved document's id, or `error`. The
+    document is saved only once generation completes; disconnecting
+    cancels the upstream call. A cached response is sent as one `token`
+    event and `done` reports `cached`; `cache=bypass` forces a fresh
+    generation.
+    """
+    body = request_in.dict()
+    prepared = await run_db(db, prepare_generation, current_user.id, body)
+    cached = None
+    if cache == "use":
+        cached = await run_in_threadpool(generation_cache.get, prepared.cache_key)
+    events = _generation_events(current_user.id, body, prepared, cached)
+    return StreamingResponse(
+        cancel_on_disconnect(request, events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+def _save_batch_documents(user_id: str, documents: list) -> list:
+    db = SessionLocal()
+    try:
+        document_ids = save_generated_documents(db, user_id, documents)
+        db.commit()
+        return document_ids
+    finally:
+        db.close()
+
+async def _batch_events(user_id: str, requests: list, prepared: list, use_cache: bool):
+    finished = []
+    # A batch gets the user's whole provider allowance, and no more
+    outputs = generate_many(prepared, user_id, use_cache, concurrency=settings.AI_MAX_CONCURRENCY_PER_USER)
+    try:
+        async for result in outputs:
+            generation = prepared[result.index]
+            if result.error is not None:
+                logger.warning("Batch generation target %d failed: %s", result.index, result.error)
+                yield sse_event("result", {
+                    "index": result.index,
+                    "status": "failed",
+                    "error": str(result.error),
+                    "retry_after": result.error.retry_after,
+                })
+                continue
+            finished.append(result)
+            yield sse_event("result", {
+                "index": result.index,
+                "status": "succeeded",
+                "title": generation.title,
+                "content": result.content,
+                "cached": result.cached,
+                "context": generation.context,
+            })
+    finally:
+        await outputs.aclose()
+
+    finished.sort(key=lambda result: result.index)
+    document_ids = await run_in_threadpool(
+        _save_batch_documents,
+        user_id,
+        [(requests[result.index], prepared[result.index].title, result.content) for result in finished],
+    )
+    yield sse_event("done", {
+        "documents": [
+            {"index": result.index, "document_id": document_id}
+            for result, document_id in zip(finished, document_ids)
+        ],
+        "failed": len(prepared) - len(finished),
+    })
+
+@router.post("/generate/batch")
+async def generate_documents_batch(
+    batch_in: DocumentGenerateBatchRequest,
+    request: Request,
+    cache: str = Query("use", pattern=CACHE_MODE_PATTERN),
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Generate one document per target (employer, job title, job description)
+    from the same profile selection, streaming results as server-sent events.
+
+    The profile is read once and every target gets its own context
+    selection. Up to AI_MAX_CONCURRENCY_PER_USER targets are generated at a
+    time. Each emits a `result` event as it finishes, in completion order:
+    its `index` in `targets` with the title, content, `cached` and
+    `context`, or `status` "failed" with the error. Once all have finished,
+    the successful documents are saved together and `done` lists their ids
+    by index. Disconnecting cancels the remaining targets and saves
+    nothing; finished outputs stay cached, so resubmitting the batch only
+    generates the rest.
+    """
+    size = len(batch_in.targets)
+    if not 1 <= size <= settings.GENERATION_BATCH_MAX_TARGETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch must have 1 to {settings.GENERATION_BATCH_MAX_TARGETS} targets, got {size}"
+        )
+    body = batch_in.dict(exclude={"targets"})
+    requests = [{**body, **target.dict()} for target in batch_in.targets]
+    prepared = await run_db(db, prepare_batch, current_user.id, requests)
+    events = _batch_events(current_user.id, requests, prepared, cache == "use")
+    return StreamingResponse(
+        cancel_on_disconnect(request, events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
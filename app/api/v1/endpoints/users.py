@@ -2,44 +2,44 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
-from app.models import User
+from app.database import get_session, run_db
+from app.users.crud import get_user_by_id, get_user_by_email, update_user
 from app.schemas import UserResponse, UserUpdate
 from app.auth.deps import get_current_active_user
+from app.auth.cache import Principal, principal_cache
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-def read_user_me(current_user: User = Depends(get_current_active_user)):
+async def read_user_me(
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
     """
     Get current user information.
     """
-    return current_user
+    return await run_db(db, get_user_by_id, current_user.id)
 
 @router.put("/me", response_model=UserResponse)
-def update_user_me(
+async def update_user_me(
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Update current user information.
     """
-    # Check if email is being updated and already exists
-    if user_in.email and user_in.email != current_user.email:
-        user = db.query(User).filter(User.email == user_in.email).first()
-        if user:
+    # Check if email is being updated and already belongs to someone else
+    if user_in.email:
+        existing = await run_db(db, get_user_by_email, user_in.email)
+        if existing and existing.id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
     
     # Update user with provided fields
-    for field, value in user_in.dict(exclude_unset=True).items():
-        setattr(current_user, field, value)
-    
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    user = await run_db(db, update_user, current_user.id, user_in.dict(exclude_unset=True))
+    principal_cache.invalidate(current_user.id)
     
-    return current_user
\ No newline at end of file
+    return user
\ No newline at end of file
@@ -0,0 +1,34 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+def etag_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    media_type: str = "application/json",
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    Return the pre-serialized body with an ETag, or an empty 304 when the
+    client already holds the same version.
+    """
+    etag = etag or make_etag(body)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,99 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import String, select, tuple_, type_coerce
+from sqlalchemy.orm import Session
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    """Query parameters shared by every list endpoint"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+def schema_fields(schema) -> List[str]:
+    return list(getattr(schema, "model_fields", None) or schema.__fields__)
+
+def parse_fields(fields: Optional[str], allowed: List[str], default: Optional[List[str]] = None) -> List[str]:
+    """Validate a fields= projection against the response schema"""
+    if not fields:
+        return list(default or allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+def encode_cursor(created_at, id: str) -> str:
+    if not isinstance(created_at, str):
+        created_at = created_at.isoformat()
+    payload = json.dumps([created_at, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(created_at, str) or not isinstance(id, str):
+            raise ValueError(cursor)
+        return created_at, id
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_page(
+    db: Session,
+    model,
+    *criteria,
+    page: PageParams,
+    fields: List[str],
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Fetch one newest-first page over (created_at, id), selecting only the
+    requested columns.
+
+    created_at is compared as its raw stored value: SQLite keeps server
+    defaults without microseconds, so comparing against a re-serialised
+    datetime would skip or repeat rows at page boundaries.
+    """
+    table = model.__table__
+    raw_created_at = type_coerce(table.c.created_at, String)
+    stmt = (
+        select(*[table.c[field] for field in fields], raw_created_at.label("_cursor_created_at"), table.c.id.label("_cursor_id"))
+        .where(*criteria)
+        .order_by(table.c.created_at.desc(), table.c.id.desc())
+        .limit(page.limit + 1)
+    )
+    if page.cursor:
+        created_at, id = decode_cursor(page.cursor)
+        stmt = stmt.where(tuple_(raw_created_at, table.c.id) < tuple_(created_at, id))
+
+    rows = db.execute(stmt).mappings().all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1]["_cursor_created_at"], rows[-1]["_cursor_id"])
+    return [{field: row[field] for field in fields} for row in rows], next_cursor
+
+def page_response(items: List[dict], next_cursor: Optional[str]) -> JSONResponse:
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(content=jsonable_encoder(items), headers=headers)
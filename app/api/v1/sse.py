@@ -0,0 +1,47 @@
+"""
+Server-sent events.
+
+Starlette only notices a vanished client when a write fails, so a stream
+waiting on a slow upstream would keep running until its next event.
+cancel_on_disconnect watches the connection itself and cancels the stream,
+and whatever it is awaiting, as soon as the client goes away.
+"""
+import asyncio
+import json
+from contextlib import suppress
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def cancel_on_disconnect(request: Request, events: AsyncIterator[str]) -> AsyncIterator[str]:
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(request))
+    next_event: Optional[asyncio.Future] = None
+    try:
+        while True:
+            next_event = asyncio.ensure_future(events.__anext__())
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                return
+            try:
+                event = next_event.result()
+            except StopAsyncIteration:
+                return
+            yield event
+    finally:
+        disconnected.cancel()
+        if next_event is not None and not next_event.done():
+            next_event.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await next_event
+        await events.aclose()
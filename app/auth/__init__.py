@@ -1,3 +1,4 @@
 # Import auth utilities
 from app.auth.utils import verify_password, get_password_hash, create_access_token, generate_uuid
+from app.auth.cache import Principal, principal_cache
 from app.auth.deps import get_current_user, get_current_active_user, get_current_verified_user
\ No newline at end of file
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.models import User
+from app.config import get_settings
+
+settings = get_settings()
+
+@dataclass(frozen=True)
+class Principal:
+    """Slim snapshot of the authenticated user, safe to share between requests"""
+    id: str
+    is_active: bool
+    is_verified: bool
+    subscription_status: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            is_active=bool(user.is_active),
+            is_verified=bool(user.is_verified),
+            subscription_status=user.subscription_status,
+        )
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of principals keyed by token subject.
+
+    Entries expire after the configured TTL or at the token expiry,
+    whichever comes first. The cache is per process: a user write drops the
+    entry in the process that made it, but other workers keep serving their
+    copy (say, of a user who was just deactivated) until it expires, so the
+    TTL is the longest a change can take to reach every worker.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sub: str) -> Optional[Principal]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(sub)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[sub]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sub)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, sub: str, principal: Principal, exp: Optional[int] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._entries[sub] = (principal, expires_at)
+            self._entries.move_to_end(sub)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Any ORM write to a user (profile edits, deactivation, deletion) drops its entry.
+# Core statements bypass these events and must call principal_cache.invalidate.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
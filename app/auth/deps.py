@@ -4,8 +4,9 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.database import get_db
-from app.models import User
+from app.database import get_session, run_db
+from app.users.crud import get_user_by_id
+from app.auth.cache import Principal, principal_cache
 from app.schemas import TokenPayload
 from app.config import get_settings
 
@@ -15,11 +16,14 @@ settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     """
     Get the current authenticated user based on the JWT token.
+
+    Returns a cached principal snapshot when one is available, so most
+    requests never touch the users table.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,21 +43,25 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    if user is None:
-        raise credentials_exception
-    if not user.is_active:
+    principal = principal_cache.get(token_data.sub)
+    if principal is None:
+        # Get user from database without blocking the event loop
+        user = await run_db(db, get_user_by_id, token_data.sub)
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.set(token_data.sub, principal, exp=token_data.exp)
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
     
-    return user
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     Get the current active authenticated user.
     """
@@ -65,8 +73,8 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_verified_user(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
     """
     Get the current verified authenticated user.
     """
@@ -0,0 +1,28 @@
+from app.auth.utils import verify_password, get_password_hash
+from app.config import get_settings
+from app.executors import BoundedExecutor, ExecutorBusy
+
+settings = get_settings()
+
+class HasherBusy(ExecutorBusy):
+    """Raised when the password hashing queue is full"""
+
+class PasswordHasher(BoundedExecutor):
+    """
+    Runs bcrypt on its own bounded executor, so login bursts fail fast with
+    HasherBusy rather than starving the sync endpoints.
+    """
+    busy_error = HasherBusy
+    thread_name_prefix = "password-hash"
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+password_hasher = PasswordHasher(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -7,21 +7,112 @@ class Settings(BaseSettings):
     APP_NAME: str = "CV Tailor"
     API_V1_STR: str = "/api/v1"
     DEBUG: bool = os.getenv("DEBUG", "False") == "True"
+    # Bearer token for /internal/stats; the endpoint is disabled while unset
+    INTERNAL_STATS_TOKEN: str = os.getenv("INTERNAL_STATS_TOKEN", "")
 
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+    # Use the async engine (aiosqlite / asyncpg) for the auth and user endpoints
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "False") == "True"
+
+    # Connection pool settings (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True") == "True"
+    DB_POOL_SLOW_CHECKOUT_MS: float = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+
+    # SQLite engine profile ("tuned" applies WAL pragmas and a single writer connection)
+    SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "tuned")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
 
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-jwt")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    # Bounds how long other workers keep serving a deactivated user's cached principal
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "15"))
+
+    # Password hashing executor ("thread" or "process")
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+    # Maximum upserts plus deletes accepted by one /profile/*/batch request
+    PROFILE_BATCH_MAX_ITEMS: int = int(os.getenv("PROFILE_BATCH_MAX_ITEMS", "100"))
+
+    # Every Nth document revision is a full snapshot, bounding delta replay
+    DOCUMENT_REVISION_SNAPSHOT_INTERVAL: int = int(os.getenv("DOCUMENT_REVISION_SNAPSHOT_INTERVAL", "10"))
+
+    # DOCX rendering ("process" keeps CPU-heavy rendering off the event loop's process)
+    DOCUMENT_RENDER_EXECUTOR: str = os.getenv("DOCUMENT_RENDER_EXECUTOR", "process")
+    DOCUMENT_RENDER_WORKERS: int = int(os.getenv("DOCUMENT_RENDER_WORKERS", "2"))
+    DOCUMENT_RENDER_MAX_QUEUE: int = int(os.getenv("DOCUMENT_RENDER_MAX_QUEUE", "16"))
+    # Extra or overriding <name>.docx templates; defaults to app/documents/templates
+    DOCUMENT_TEMPLATE_DIR: str = os.getenv("DOCUMENT_TEMPLATE_DIR", "")
+
+    # AI generation jobs ("inprocess" runs them on a thread pool, "celery" on Celery workers)
+    GENERATION_BACKEND: str = os.getenv("GENERATION_BACKEND", "inprocess")
+    GENERATION_WORKERS: int = int(os.getenv("GENERATION_WORKERS", "4"))
+    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    # Queued plus running jobs allowed per user
+    GENERATION_MAX_ACTIVE_JOBS_PER_USER: int = int(os.getenv("GENERATION_MAX_ACTIVE_JOBS_PER_USER", "2"))
+    # A running job not finished within this is assumed lost and may be claimed again
+    GENERATION_JOB_LEASE_SECONDS: int = int(os.getenv("GENERATION_JOB_LEASE_SECONDS", "300"))
+    GENERATION_MAX_WAIT_SECONDS: float = float(os.getenv("GENERATION_MAX_WAIT_SECONDS", "30"))
+    # Targets accepted by one /documents/generate/batch request
+    GENERATION_BATCH_MAX_TARGETS: int = int(os.getenv("GENERATION_BATCH_MAX_TARGETS", "50"))
+    # Prompt space for profile items when use_all_experiences is set; 0 sends everything
+    GENERATION_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("GENERATION_CONTEXT_TOKEN_BUDGET", "1500"))
+    # Generated content cache; GENERATION_CACHE_DIR adds a persistent disk tier
+    GENERATION_CACHE_MAX_ENTRIES: int = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "256"))
+    GENERATION_CACHE_TTL_SECONDS: int = int(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    GENERATION_CACHE_DIR: str = os.getenv("GENERATION_CACHE_DIR", "")
+    GENERATION_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("GENERATION_CACHE_DISK_MAX_ENTRIES", "10000"))
 
     # AI Provider settings
+    # "anthropic" or "fake" (deterministic local output, for development and load tests)
     AI_PROVIDER: str = os.getenv("AI_PROVIDER", "anthropic")
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
+    AI_MODEL: str = os.getenv("AI_MODEL", "claude-3-5-sonnet-latest")
+    AI_MAX_OUTPUT_TOKENS: int = int(os.getenv("AI_MAX_OUTPUT_TOKENS", "2048"))
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+    # Provider calls in flight per process, and per user
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "16"))
+    AI_MAX_CONCURRENCY_PER_USER: int = int(os.getenv("AI_MAX_CONCURRENCY_PER_USER", "2"))
+    AI_MAX_ATTEMPTS: int = int(os.getenv("AI_MAX_ATTEMPTS", "3"))
+    AI_RETRY_BACKOFF_SECONDS: float = float(os.getenv("AI_RETRY_BACKOFF_SECONDS", "0.5"))
+    AI_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("AI_RETRY_BACKOFF_MAX_SECONDS", "8"))
+    # Whole-call budget: waiting for a slot, every attempt and the backoff between them
+    AI_TIMEOUT_BUDGET_SECONDS: float = float(os.getenv("AI_TIMEOUT_BUDGET_SECONDS", "180"))
+    AI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AI_CONNECT_TIMEOUT_SECONDS", "5"))
+    # Longest wait for the next streamed chunk
+    AI_READ_TIMEOUT_SECONDS: float = float(os.getenv("AI_READ_TIMEOUT_SECONDS", "60"))
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    AI_CIRCUIT_RESET_SECONDS: float = float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30"))
+    # Fake provider behaviour, for development and load tests
+    AI_FAKE_TOKEN_DELAY_SECONDS: float = float(os.getenv("AI_FAKE_TOKEN_DELAY_SECONDS", "0.02"))
+    AI_FAKE_FIRST_TOKEN_SECONDS: float = float(os.getenv("AI_FAKE_FIRST_TOKEN_SECONDS", "0"))
+    AI_FAKE_RESPONSE_WORDS: int = int(os.getenv("AI_FAKE_RESPONSE_WORDS", "200"))
+    AI_FAKE_FAILURE_RATE: float = float(os.getenv("AI_FAKE_FAILURE_RATE", "0"))
+    AI_FAKE_SEED: int = int(os.getenv("AI_FAKE_SEED", "0"))
 
-    # Storage settings
+    # Storage settings ("local" or "s3")
     STORAGE_TYPE: str = os.getenv("STORAGE_TYPE", "local")
+    STORAGE_LOCAL_ROOT: str = os.getenv("STORAGE_LOCAL_ROOT", "./storage")
+    STORAGE_S3_BUCKET: str = os.getenv("STORAGE_S3_BUCKET", "")
+    STORAGE_S3_PREFIX: str = os.getenv("STORAGE_S3_PREFIX", "blobs")
+    STORAGE_S3_ENDPOINT_URL: str = os.getenv("STORAGE_S3_ENDPOINT_URL", "")
+    STORAGE_S3_REGION: str = os.getenv("STORAGE_S3_REGION", "")
+    # "gzip" or "zstd" (zstd needs the zstandard package)
+    STORAGE_COMPRESSION: str = os.getenv("STORAGE_COMPRESSION", "gzip")
+    # Document content larger than this is kept in blob storage, not in the row
+    STORAGE_INLINE_MAX_BYTES: int = int(os.getenv("STORAGE_INLINE_MAX_BYTES", "8192"))
+    STORAGE_MAX_UPLOAD_BYTES: int = int(os.getenv("STORAGE_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
 
     # Payment settings
     STRIPE_API_KEY: str = os.getenv("STRIPE_API_KEY", "")
@@ -0,0 +1,73 @@
+"""
+Shared single-statement write helpers.
+
+Each write is one INSERT/UPDATE ... RETURNING or one DELETE, so handlers
+no longer pay for a refresh SELECT after commit or a lookup before delete.
+Rows come back as plain dicts, which stay valid after commit. Databases
+without RETURNING (SQLite before 3.35) fall back to a follow-up SELECT.
+"""
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+def _dialect(db: Session):
+    return db.get_bind().dialect
+
+def insert_returning(db: Session, model, data: dict, commit: bool = True) -> dict:
+    """Insert one row and return it, including server-side defaults"""
+    table = model.__table__
+    stmt = insert(table).values(**data)
+    if _dialect(db).insert_returning:
+        row = db.execute(stmt.returning(*table.c)).mappings().one()
+    else:
+        db.execute(stmt)
+        row = db.execute(select(table).where(table.c.id == data["id"])).mappings().one()
+    row = dict(row)
+    if commit:
+        db.commit()
+    return row
+
+def insert_ignore(db: Session, model, rows: list) -> None:
+    """
+    Insert rows, skipping any that collide with an existing unique key (for
+    rows a concurrent writer may have created first). Does not commit.
+    """
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(_dialect(db).name)
+    if dialect_insert is not None:
+        db.execute(dialect_insert(model).on_conflict_do_nothing(), rows)
+    else:
+        db.execute(insert(model), rows)
+
+def update_returning(db: Session, model, data: dict, *criteria, commit: bool = True) -> Optional[dict]:
+    """
+    Update the row matching `criteria` and return it, or None when no row
+    matches (missing or owned by someone else).
+    """
+    table = model.__table__
+    if not data:
+        row = db.execute(select(table).where(*criteria)).mappings().first()
+        return dict(row) if row else None
+
+    stmt = update(table).where(*criteria).values(**data)
+    if _dialect(db).update_returning:
+        row = db.execute(stmt.returning(*table.c)).mappings().first()
+    elif db.execute(stmt).rowcount:
+        row = db.execute(select(table).where(*criteria)).mappings().first()
+    else:
+        row = None
+    if commit:
+        db.commit()
+    return dict(row) if row else None
+
+def delete_where(db: Session, model, *criteria, commit: bool = True) -> bool:
+    """Delete rows matching `criteria` in one statement; True if any were removed"""
+    deleted = db.execute(delete(model.__table__).where(*criteria)).rowcount
+    if commit:
+        db.commit()
+    return deleted > 0
+
+def owned_by(model, id: str, user_id: str) -> tuple:
+    """Criteria scoping a row to its owner"""
+    return (model.id == id, model.user_id == user_id)
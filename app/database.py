@@ -1,16 +1,282 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+# Async drivers used when DATABASE_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver"""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{dialect}' databases")
+    return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+class PoolMetrics:
+    """Checkout wait and usage counters for one connection pool"""
+
+    def __init__(self, name: str, slow_checkout_ms: float):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, pool, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            slow = wait_ms >= self.slow_checkout_ms
+            if slow:
+                self.slow_checkouts += 1
+        if slow:
+            logger.warning(
+                "Slow database pool checkout",
+                extra={
+                    "event": "db_pool_slow_checkout",
+                    "pool": self.name,
+                    "wait_ms": round(wait_ms, 2),
+                    "pool_size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(0, pool.overflow()),
+                },
+            )
+
+    def record_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_timeout(self, pool, wait_ms: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.error(
+            "Database pool checkout timed out",
+            extra={
+                "event": "db_pool_timeout",
+                "pool": self.name,
+                "wait_ms": round(wait_ms, 2),
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+            },
+        )
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+
+class InstrumentedPoolMixin:
+    """Times every checkout, including waits for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics("default", settings.DB_POOL_SLOW_CHECKOUT_MS)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; it keeps the label and
+        # counters, and the copied dispatch already carries the checkin listener
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(self, (time.perf_counter() - start) * 1000)
+            raise
+        self.metrics.record_checkout(self, (time.perf_counter() - start) * 1000)
+        return connection
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:"))
+
+def get_engine_options(url: str, pool_class=InstrumentedQueuePool) -> dict:
+    """Build create_engine keyword arguments from the pool settings"""
+    options = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    if is_memory_sqlite(url):
+        return options
+    options.update(
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+def instrument_pool(engine, name: str) -> None:
+    """
+    Label an instrumented engine pool for logs and stats and count its
+    checkins. The listener is registered on the engine, once per engine.
+    """
+    if isinstance(engine.pool, InstrumentedPoolMixin):
+        engine.pool.metrics.name = name
+        event.listen(engine, "checkin", engine.pool.metrics.record_checkin)
+
+def use_tuned_sqlite(url: str) -> bool:
+    return (
+        url.startswith("sqlite")
+        and not is_memory_sqlite(url)
+        and settings.SQLITE_PROFILE == "tuned"
+    )
+
+def get_sqlite_pragmas() -> list:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+    ]
+
+def apply_sqlite_profile(engine, writer: bool = False) -> None:
+    """
+    Apply the tuned pragmas on every new connection. The writer connection
+    also opens its transactions with BEGIN IMMEDIATE, so it takes the write
+    lock up front instead of failing to upgrade a read lock halfway through.
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        if writer:
+            # Stop pysqlite emitting its own BEGIN so ours is the only one
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in get_sqlite_pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+    if writer:
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def create_sqlite_writer(url: str):
+    """Engine holding the single SQLite writer connection; other writers queue on its pool"""
+    options = get_engine_options(url)
+    options.update(pool_size=1, max_overflow=0)
+    writer = create_engine(url, **options)
+    apply_sqlite_profile(writer, writer=True)
+    return writer
+
+class RoutingSession(Session):
+    """
+    Session that reads through the reader pool and sends writes to the
+    writer engine in `info["write_bind"]`. Once a transaction has written,
+    its remaining statements stay on the writer so they see their own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        write_bind = self.info.get("write_bind")
+        if write_bind is not None and (
+            self.info.get("writing") or self._flushing or isinstance(clause, UpdateBase)
+        ):
+            self.info["writing"] = True
+            return write_bind
+        return super().get_bind(mapper, clause=clause, **kw)
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+def create_session_factory(read_engine, write_engine=None):
+    if write_engine is None:
+        return sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    return sessionmaker(
+        class_=RoutingSession,
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine,
+        info={"write_bind": write_engine},
+    )
+
+engine = create_engine(settings.DATABASE_URL, **get_engine_options(settings.DATABASE_URL))
+instrument_pool(engine, "sync")
+
+# SQLite has one writer at a time, so the tuned profile queues writes on a dedicated connection
+write_engine = None
+if use_tuned_sqlite(settings.DATABASE_URL):
+    apply_sqlite_profile(engine)
+    write_engine = create_sqlite_writer(settings.DATABASE_URL)
+    instrument_pool(write_engine, "writer")
+
+SessionLocal = create_session_factory(engine, write_engine)
+
+# The async engine is only created in async mode so the driver stays optional
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url, **get_engine_options(async_url, InstrumentedAsyncQueuePool)
+    )
+    instrument_pool(async_engine.sync_engine, "async")
+    if use_tuned_sqlite(async_url):
+        apply_sqlite_profile(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def get_pool_stats() -> dict:
+    """Live pool metrics for every engine in this process"""
+    stats = {}
+    engines = (
+        ("sync", engine),
+        ("writer", write_engine),
+        ("async", async_engine and async_engine.sync_engine),
+    )
+    for name, target in engines:
+        pool = getattr(target, "pool", None)
+        if isinstance(pool, InstrumentedPoolMixin):
+            stats[name] = pool.metrics.stats(pool)
+    return stats
 
 Base = declarative_base()
 
@@ -21,3 +287,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async DB session
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires DATABASE_ASYNC=True")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session dependency for endpoints that support both modes
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+
+async def run_db(db, fn, *args):
+    """
+    Run a sync-style ORM callable against either session type without
+    blocking the event loop.
+    """
+    if async_engine is not None and hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
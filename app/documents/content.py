@@ -0,0 +1,60 @@
+"""
+Document bodies and files in blob storage.
+
+Content larger than STORAGE_INLINE_MAX_BYTES is written to the blob store
+and the row keeps only content_ref. Uploaded and rendered files are stored
+the same way, and file_path holds "<blob key>/<filename>".
+"""
+import mimetypes
+import os
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.config import get_settings
+from app.storage import BlobInfo, get_blob_store
+
+settings = get_settings()
+
+def store_content(data: dict) -> dict:
+    """Column values for a document write, moving large content to blob storage"""
+    content = data.get("content")
+    if content is None:
+        return data
+    data = dict(data)
+    encoded = content.encode("utf-8")
+    if len(encoded) > settings.STORAGE_INLINE_MAX_BYTES:
+        data["content"] = None
+        data["content_ref"] = get_blob_store().put(encoded).key
+    else:
+        data["content_ref"] = None
+    return data
+
+def load_content(row: dict) -> dict:
+    """A document row with its content filled in from blob storage if needed"""
+    if row.get("content_ref"):
+        row = dict(row)
+        row["content"] = get_blob_store().get(row["content_ref"]).decode("utf-8")
+    return row
+
+def file_reference(info: BlobInfo, filename: str) -> str:
+    # The name ends up in a Content-Disposition header, keep it to a bare name
+    filename = os.path.basename(filename.replace("\\", "/")).replace('"', "").strip() or "file"
+    return f"{info.key}/{filename}"
+
+def parse_file_reference(file_path: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(blob key, filename) for a stored file, or None for legacy paths"""
+    if not file_path or "/" not in file_path:
+        return None
+    key, filename = file_path.split("/", 1)
+    if len(key) != 64:
+        return None
+    return key, filename
+
+def store_file(chunks: Iterable[bytes], filename: str) -> str:
+    """Stream a file into blob storage and return its file_path reference"""
+    return file_reference(get_blob_store().put_stream(chunks), filename)
+
+def open_file(file_path: str) -> Tuple[Iterator[bytes], str, str]:
+    """Chunks, filename and media type of a stored file"""
+    key, filename = parse_file_reference(file_path)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return get_blob_store().open(key), filename, media_type
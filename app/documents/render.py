@@ -0,0 +1,106 @@
+"""
+DOCX rendering.
+
+render_docx is a plain module-level function so it can run in the
+renderer's process pool; each worker compiles a template the first time
+it renders with it. Rendered files are stored in blob storage and
+recorded in document_renders under a hash of (template, title, content).
+"""
+import hashlib
+import io
+import re
+import zipfile
+from typing import Optional
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.crud import insert_ignore, owned_by
+from app.documents.templates import DOCUMENT_PART, CompiledTemplate, template_cache
+from app.executors import BoundedExecutor, ExecutorBusy
+from app.models import Document, DocumentRender
+
+settings = get_settings()
+
+# Characters XML 1.0 does not allow; Word refuses files containing them
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+def _paragraph(text: str, style: Optional[str] = None) -> str:
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    text = escape(INVALID_XML_CHARS.sub("", text))
+    return f'<w:p>{properties}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+def content_to_xml(title: str, content: str) -> str:
+    """
+    Body XML for plain-text content: "# " and "## " lines become headings,
+    "- " / "* " lines bullets, every other non-blank line a paragraph.
+    """
+    paragraphs = [_paragraph(title, "Title")] if title else []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("## "):
+            paragraphs.append(_paragraph(line[3:], "Heading2"))
+        elif line.startswith("# "):
+            paragraphs.append(_paragraph(line[2:], "Heading1"))
+        elif line.startswith(("- ", "* ", "• ")):
+            paragraphs.append(_paragraph(line[2:], "ListBullet"))
+        else:
+            paragraphs.append(_paragraph(line))
+    return "".join(paragraphs)
+
+def render_docx(template_name: str, title: str, content: str) -> bytes:
+    template = template_cache.get(template_name)
+    document_xml = template.document_head + content_to_xml(title, content) + template.document_tail
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        for filename, data in template.parts:
+            package.writestr(filename, data)
+        package.writestr(DOCUMENT_PART, document_xml.encode("utf-8"))
+    return buffer.getvalue()
+
+def render_key(template: CompiledTemplate, title: str, content: str) -> str:
+    digest = hashlib.sha256(template.fingerprint.encode())
+    for value in (title, content):
+        encoded = value.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big") + encoded)
+    return digest.hexdigest()
+
+def docx_filename(title: Optional[str]) -> str:
+    stem = re.sub(r"[^\w\- ]+", "", title or "").strip().replace(" ", "_")
+    return f"{stem or 'document'}.docx"
+
+def get_cached_render(db: Session, key: str) -> Optional[str]:
+    """file_path of an earlier identical render, if any"""
+    return db.execute(select(DocumentRender.file_path).where(DocumentRender.render_key == key)).scalar()
+
+def save_render(db: Session, key: str, file_path: str, document_id: str, user_id: str) -> None:
+    """Record a render and make it the document's file"""
+    # Concurrent downloads may render the same file; the first record wins
+    insert_ignore(db, DocumentRender, [{"render_key": key, "file_path": file_path}])
+    db.execute(
+        update(Document)
+        .where(*owned_by(Document, document_id, user_id))
+        .values(file_path=file_path, file_url=f"{settings.API_V1_STR}/documents/{document_id}/file")
+    )
+    db.commit()
+
+class RenderBusy(ExecutorBusy):
+    """Raised when the document rendering queue is full"""
+
+class DocumentRenderer(BoundedExecutor):
+    """Renders DOCX files on a bounded worker pool, off the request path"""
+    busy_error = RenderBusy
+    thread_name_prefix = "docx-render"
+
+    async def render(self, template_name: str, title: str, content: str) -> bytes:
+        return await self.run(render_docx, template_name, title, content)
+
+document_renderer = DocumentRenderer(
+    kind=settings.DOCUMENT_RENDER_EXECUTOR,
+    workers=settings.DOCUMENT_RENDER_WORKERS,
+    max_queue=settings.DOCUMENT_RENDER_MAX_QUEUE,
+)
@@ -0,0 +1,198 @@
+"""
+Document revision history.
+
+Each revision is stored as a word-level delta against its predecessor,
+JSON encoded and zlib compressed. Every DOCUMENT_REVISION_SNAPSHOT_INTERVAL
+revisions (and whenever a delta would not be smaller) a full snapshot is
+stored instead, so reconstructing any revision replays at most
+interval - 1 deltas however long the history grows.
+"""
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.auth import generate_uuid
+from app.config import get_settings
+from app.models import DocumentRevision
+
+settings = get_settings()
+
+# Words with their trailing whitespace, so joining tokens restores the text
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+Delta = List[Union[List[int], str]]
+
+def tokenize(content: str) -> List[str]:
+    return TOKEN_PATTERN.findall(content)
+
+def make_delta(base: str, target: str) -> Delta:
+    """
+    Ops rebuilding `target` from `base`: [start, end] copies base tokens,
+    a string inserts new text.
+    """
+    base_tokens, target_tokens = tokenize(base), tokenize(target)
+    # Most edits are local: match the shared head and tail directly and only
+    # diff what lies between, which keeps SequenceMatcher's work small
+    limit = min(len(base_tokens), len(target_tokens))
+    head = 0
+    while head < limit and base_tokens[head] == target_tokens[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and base_tokens[-1 - tail] == target_tokens[-1 - tail]:
+        tail += 1
+
+    ops: Delta = []
+    if head:
+        ops.append([0, head])
+    matcher = SequenceMatcher(
+        None, base_tokens[head:len(base_tokens) - tail], target_tokens[head:len(target_tokens) - tail]
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([head + i1, head + i2])
+        elif j2 > j1:
+            ops.append("".join(target_tokens[head + j1:head + j2]))
+    if tail:
+        ops.append([len(base_tokens) - tail, len(base_tokens)])
+    return ops
+
+def apply_delta(base: str, delta: Delta) -> str:
+    base_tokens = tokenize(base)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_tokens[op[0]:op[1]])
+    return "".join(parts)
+
+def _encode(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+def _decode(data: bytes):
+    return json.loads(zlib.decompress(data))
+
+def latest_revision_number(db: Session, document_id: str) -> int:
+    number = db.execute(
+        select(func.max(DocumentRevision.number)).where(DocumentRevision.document_id == document_id)
+    ).scalar()
+    return number or 0
+
+def record_revision(db: Session, document_id: str, content: str, previous: Optional[str] = None) -> Optional[int]:
+    """
+    Append `content` as the next revision of a document. `previous` is the
+    content it replaces (None for a new document); documents created before
+    revisions existed get it recorded first. Otherwise the delta base is the
+    latest stored revision, read here rather than trusted from the caller,
+    so callers must already have written the document and hold its lock: a
+    concurrent update may have replaced the content they read. Returns the
+    new revision number, or None when the content is unchanged. Does not
+    commit.
+    """
+    number = latest_revision_number(db, document_id)
+    if previous is not None:
+        if number == 0:
+            _insert_revision(db, document_id, 1, "snapshot", _encode(previous), previous)
+            number = 1
+        else:
+            previous = get_revision(db, document_id, number)["content"]
+    if previous is not None and content == previous:
+        return None
+
+    number += 1
+    snapshot = _encode(content)
+    interval = max(1, settings.DOCUMENT_REVISION_SNAPSHOT_INTERVAL)
+    if previous is None or (number - 1) % interval == 0:
+        _insert_revision(db, document_id, number, "snapshot", snapshot, content)
+    else:
+        delta = _encode(make_delta(previous, content))
+        if len(delta) < len(snapshot):
+            _insert_revision(db, document_id, number, "delta", delta, content)
+        else:
+            _insert_revision(db, document_id, number, "snapshot", snapshot, content)
+    return number
+
+def record_first_revisions(db: Session, documents: List[Tuple[str, str]]) -> None:
+    """
+    Record the first revision of new documents, given as (document_id,
+    content) pairs, with one executemany INSERT. Does not commit.
+    """
+    if documents:
+        db.execute(insert(DocumentRevision), [
+            {
+                "id": generate_uuid(),
+                "document_id": document_id,
+                "number": 1,
+                "kind": "snapshot",
+                "data": _encode(content),
+                "content_size": len(content.encode("utf-8")),
+            }
+            for document_id, content in documents
+        ])
+
+def _insert_revision(db: Session, document_id: str, number: int, kind: str, data: bytes, content: str) -> None:
+    db.execute(insert(DocumentRevision).values(
+        id=generate_uuid(),
+        document_id=document_id,
+        number=number,
+        kind=kind,
+        data=data,
+        content_size=len(content.encode("utf-8")),
+    ))
+
+def list_revisions(db: Session, document_id: str, limit: int, before: Optional[int] = None) -> List[dict]:
+    """Revision metadata, newest first"""
+    revisions = DocumentRevision.__table__
+    stmt = (
+        select(revisions.c.number, revisions.c.kind, revisions.c.content_size, revisions.c.created_at)
+        .where(revisions.c.document_id == document_id)
+        .order_by(revisions.c.number.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        stmt = stmt.where(revisions.c.number < before)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+def get_revision(db: Session, document_id: str, number: int) -> Optional[dict]:
+    """
+    Reconstruct one revision from the nearest snapshot at or before it,
+    fetching that snapshot and the following deltas in one query.
+    """
+    revisions = DocumentRevision.__table__
+    snapshot_number = (
+        select(func.max(revisions.c.number))
+        .where(
+            revisions.c.document_id == document_id,
+            revisions.c.kind == "snapshot",
+            revisions.c.number <= number,
+        )
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(revisions.c.number, revisions.c.kind, revisions.c.data, revisions.c.content_size, revisions.c.created_at)
+        .where(
+            revisions.c.document_id == document_id,
+            revisions.c.number >= snapshot_number,
+            revisions.c.number <= number,
+        )
+        .order_by(revisions.c.number)
+    ).mappings().all()
+    if not rows or rows[-1]["number"] != number:
+        return None
+
+    content = _decode(rows[0]["data"])
+    for row in rows[1:]:
+        content = apply_delta(content, _decode(row["data"]))
+    target = rows[-1]
+    return {
+        "number": target["number"],
+        "kind": target["kind"],
+        "content_size": target["content_size"],
+        "created_at": target["created_at"],
+        "content": content,
+    }
@@ -0,0 +1,152 @@
+"""
+Compiled DOCX templates.
+
+A template is parsed once per process into its static package parts plus
+word/document.xml split at the point where rendered paragraphs go (just
+before the final section properties). Rendering then only has to build
+the body XML and write the zip, never re-parse the template.
+
+Built-in templates are created with python-docx; any `<name>.docx` in
+DOCUMENT_TEMPLATE_DIR is also available and overrides a built-in of the
+same name. Text already in a template file's body (e.g. a letterhead) is
+kept above the rendered content.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from docx import Document as DocxDocument
+from docx.shared import Cm, Pt, RGBColor
+
+from app.config import get_settings
+
+settings = get_settings()
+
+DOCUMENT_PART = "word/document.xml"
+TEMPLATE_DIR = settings.DOCUMENT_TEMPLATE_DIR or os.path.join(os.path.dirname(__file__), "templates")
+
+TEMPLATE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Bump when the rendered XML changes, so cached renders are not reused
+RENDERER_VERSION = "1"
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    name: str
+    fingerprint: str
+    parts: Tuple[Tuple[str, bytes], ...]  # every part except the main document, in zip order
+    document_head: str
+    document_tail: str
+
+def _build_classic():
+    document = DocxDocument()
+    normal = document.styles["Normal"]
+    normal.font.name = "Calibri"
+    normal.font.size = Pt(11)
+    for section in document.sections:
+        section.left_margin = section.right_margin = Cm(2.54)
+        section.top_margin = section.bottom_margin = Cm(2.54)
+    return document
+
+def _build_modern():
+    document = DocxDocument()
+    normal = document.styles["Normal"]
+    normal.font.name = "Arial"
+    normal.font.size = Pt(10.5)
+    for style_name in ("Title", "Heading 1", "Heading 2"):
+        document.styles[style_name].font.name = "Arial"
+        document.styles[style_name].font.color.rgb = RGBColor(0x1F, 0x4E, 0x79)
+    for section in document.sections:
+        section.left_margin = section.right_margin = Cm(1.9)
+        section.top_margin = section.bottom_margin = Cm(1.6)
+    return document
+
+BUILTIN_TEMPLATES = {
+    "classic": _build_classic,
+    "modern": _build_modern,
+}
+
+def compile_template(name: str, source: bytes) -> CompiledTemplate:
+    """Split a .docx into static parts and the document XML around the body insertion point"""
+    parts = []
+    document_xml = None
+    with zipfile.ZipFile(io.BytesIO(source)) as package:
+        for info in package.infolist():
+            if info.filename == DOCUMENT_PART:
+                document_xml = package.read(info).decode("utf-8")
+            else:
+                parts.append((info.filename, package.read(info)))
+    if document_xml is None:
+        raise ValueError(f"Template '{name}' has no {DOCUMENT_PART}")
+
+    split_at = document_xml.rfind("<w:sectPr")
+    if split_at == -1:
+        split_at = document_xml.rfind("</w:body>")
+    if split_at == -1:
+        raise ValueError(f"Template '{name}' has no document body")
+
+    # Hash part contents rather than the zip, whose timestamps change on every save
+    digest = hashlib.sha256(RENDERER_VERSION.encode())
+    for filename, data in sorted(parts + [(DOCUMENT_PART, document_xml.encode("utf-8"))]):
+        digest.update(filename.encode() + b"\0" + data)
+    fingerprint = digest.hexdigest()
+    return CompiledTemplate(
+        name=name,
+        fingerprint=fingerprint,
+        parts=tuple(parts),
+        document_head=document_xml[:split_at],
+        document_tail=document_xml[split_at:],
+    )
+
+class TemplateCache:
+    """
+    Compiled templates for this process. Template files are recompiled when
+    their modification time changes.
+    """
+
+    def __init__(self, template_dir: str):
+        self.template_dir = template_dir
+        self._compiled: Dict[str, Tuple[Optional[float], CompiledTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def _template_file(self, name: str) -> str:
+        return os.path.join(self.template_dir, f"{name}.docx")
+
+    def names(self) -> List[str]:
+        names = set(BUILTIN_TEMPLATES)
+        if os.path.isdir(self.template_dir):
+            names.update(f[:-len(".docx")] for f in os.listdir(self.template_dir) if f.endswith(".docx"))
+        return sorted(names)
+
+    def get(self, name: str) -> CompiledTemplate:
+        """The compiled template called `name`; KeyError if there is none"""
+        if not TEMPLATE_NAME_PATTERN.match(name):
+            raise KeyError(name)
+        path = self._template_file(name)
+        mtime = os.path.getmtime(path) if os.path.isfile(path) else None
+        with self._lock:
+            cached = self._compiled.get(name)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        if mtime is not None:
+            with open(path, "rb") as f:
+                source = f.read()
+        elif name in BUILTIN_TEMPLATES:
+            buffer = io.BytesIO()
+            BUILTIN_TEMPLATES[name]().save(buffer)
+            source = buffer.getvalue()
+        else:
+            raise KeyError(name)
+
+        template = compile_template(name, source)
+        with self._lock:
+            self._compiled[name] = (mtime, template)
+        return template
+
+template_cache = TemplateCache(TEMPLATE_DIR)
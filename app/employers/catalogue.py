@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import CatalogueVersion
+
+CATALOGUE_NAME = "employers"
+
+def get_catalogue_version(db: Session) -> int:
+    """Primary-key lookup of the current catalogue version"""
+    version = db.execute(
+        select(CatalogueVersion.version).where(CatalogueVersion.name == CATALOGUE_NAME)
+    ).scalar()
+    return version or 0
+
+def bump_catalogue_version(db: Session) -> None:
+    """Invalidate every worker's cached pages; call inside the writing transaction"""
+    db.execute(
+        update(CatalogueVersion)
+        .where(CatalogueVersion.name == CATALOGUE_NAME)
+        .values(version=CatalogueVersion.version + 1)
+    )
+
+class EmployerCatalogueCache:
+    """
+    Pre-serialized employer list pages for a single catalogue version.
+
+    Each worker keeps its own copy and drops it as soon as a request sees a
+    newer version in the database.
+    """
+
+    def __init__(self, max_pages: int = 256):
+        self.max_pages = max_pages
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._pages: "OrderedDict[tuple, Tuple[bytes, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: int, key: tuple) -> Optional[Tuple[bytes, Optional[str]]]:
+        with self._lock:
+            if version != self.version:
+                self._pages.clear()
+                self.version = version
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set(self, version: int, key: tuple, body: bytes, next_cursor: Optional[str]) -> None:
+        with self._lock:
+            if version != self.version:
+                return
+            self._pages[key] = (body, next_cursor)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "pages": len(self._pages),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+def catalogue_etag(version: int, key: tuple) -> str:
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+    return f'"employers-{version}-{digest}"'
+
+employer_catalogue = EmployerCatalogueCache()
@@ -0,0 +1,117 @@
+"""
+Full-text search over the employer catalogue.
+
+SQLite uses the employers_fts FTS5 table ranked with bm25, Postgres uses the
+employers.search_vector tsvector (GIN indexed) ranked with ts_rank. Both
+are maintained by index_employer, which the scrape path calls in the same
+transaction as the employer write. Other databases fall back to unranked
+ILIKE matching on name and description.
+"""
+import re
+from typing import List
+
+from sqlalchemy import column, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models import Employer
+
+# Column weights for bm25: employer_id, name, industry, description, values, keywords
+BM25_WEIGHTS = "0.0, 10.0, 4.0, 1.0, 3.0, 3.0"
+
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('english', coalesce(:name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(:industry, '')), 'B') ||
+    setweight(to_tsvector('english', :tags), 'B') ||
+    setweight(to_tsvector('english', coalesce(:description, '')), 'C')
+"""
+
+employers_fts = table("employers_fts", column("employer_id"))
+
+def _tags_text(tags) -> str:
+    return " ".join(tags or [])
+
+def index_employer(db: Session, employer: dict) -> None:
+    """(Re)index one employer; call inside the transaction that wrote it"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        db.execute(text("DELETE FROM employers_fts WHERE employer_id = :id"), {"id": employer["id"]})
+        db.execute(
+            text(
+                "INSERT INTO employers_fts (employer_id, name, industry, description, employer_values, keywords) "
+                "VALUES (:id, :name, :industry, :description, :values, :keywords)"
+            ),
+            {
+                "id": employer["id"],
+                "name": employer.get("name") or "",
+                "industry": employer.get("industry") or "",
+                "description": employer.get("description") or "",
+                "values": _tags_text(employer.get("values")),
+                "keywords": _tags_text(employer.get("keywords")),
+            },
+        )
+    elif dialect == "postgresql":
+        db.execute(
+            text(f"UPDATE employers SET search_vector = {POSTGRES_VECTOR} WHERE id = :id"),
+            {
+                "id": employer["id"],
+                "name": employer.get("name"),
+                "industry": employer.get("industry"),
+                "description": employer.get("description"),
+                "tags": " ".join([_tags_text(employer.get("values")), _tags_text(employer.get("keywords"))]),
+            },
+        )
+
+def to_fts5_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match, and the
+    last one may be a prefix so search-as-you-type works.
+    """
+    terms = re.findall(r"\w+", q.lower())
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def search_employers(db: Session, q: str, limit: int, offset: int) -> List[dict]:
+    """Ranked page of employers matching `q`, best match first, with a `rank` score"""
+    employers = Employer.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        match = to_fts5_query(q)
+        if not match:
+            return []
+        # Rank and page inside the FTS table, then join only the page of
+        # employers. bm25 is lower-is-better, negate it so rank is
+        # higher-is-better everywhere.
+        bm25 = literal_column(f"bm25(employers_fts, {BM25_WEIGHTS})")
+        hits = (
+            select(employers_fts.c.employer_id, (-bm25).label("rank"))
+            .where(text("employers_fts MATCH :match").bindparams(match=match))
+            .order_by(bm25, employers_fts.c.employer_id)
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        stmt = (
+            select(*employers.c, hits.c.rank)
+            .join(hits, hits.c.employer_id == employers.c.id)
+            .order_by(hits.c.rank.desc(), employers.c.id)
+        )
+        return [dict(row) for row in db.execute(stmt).mappings()]
+    elif dialect == "postgresql":
+        query = func.websearch_to_tsquery("english", q)
+        vector = literal_column("employers.search_vector")
+        rank = func.ts_rank(vector, query).label("rank")
+        stmt = select(*employers.c, rank).where(vector.op("@@")(query))
+    else:
+        # No full-text index on other databases: unranked substring matching
+        pattern = f"%{q}%"
+        rank = literal(0.0).label("rank")
+        stmt = select(*employers.c, rank).where(
+            or_(employers.c.name.ilike(pattern), employers.c.description.ilike(pattern))
+        )
+
+    stmt = stmt.order_by(rank.desc(), employers.c.id).limit(limit).offset(offset)
+    return [dict(row) for row in db.execute(stmt).mappings()]
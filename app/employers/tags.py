@@ -0,0 +1,190 @@
+"""
+Normalized tag index over employer values and keywords.
+
+The JSON columns on employers keep the shape the API returns; the tags and
+employer_tags tables are the queryable copy. sync_employer_tags keeps them
+in step and must run in the same transaction as the employer write.
+"""
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, delete, distinct, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.crud import insert_ignore
+from app.models import Employer, EmployerTag, Tag
+
+# Tag kind -> employer JSON column it is derived from
+TAG_KINDS = {"value": "values", "keyword": "keywords"}
+
+# Keeps IN lists well under SQLite's bound parameter limit
+LOOKUP_CHUNK = 500
+
+def normalize_tag(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+def employer_tag_pairs(employer: dict) -> Set[Tuple[str, str]]:
+    """(kind, name) pairs for an employer's values and keywords"""
+    pairs = set()
+    for kind, column in TAG_KINDS.items():
+        raw = employer.get(column)
+        if isinstance(raw, str):
+            raw = [raw]
+        if not isinstance(raw, (list, tuple)):
+            continue
+        for item in raw:
+            if isinstance(item, str) and normalize_tag(item):
+                pairs.add((kind, normalize_tag(item)))
+    return pairs
+
+def _chunks(items: list) -> Iterator[list]:
+    for start in range(0, len(items), LOOKUP_CHUNK):
+        yield items[start:start + LOOKUP_CHUNK]
+
+def _lookup_tags(db: Session, pairs: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    found = {}
+    for names in _chunks(sorted({name for _, name in pairs})):
+        for id, kind, name in db.execute(select(Tag.id, Tag.kind, Tag.name).where(Tag.name.in_(names))):
+            if (kind, name) in pairs:
+                found[(kind, name)] = id
+    return found
+
+def _ensure_tags(db: Session, pairs: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    """Tag ids for `pairs`, creating the missing tags"""
+    tag_ids = _lookup_tags(db, pairs)
+    missing = pairs - tag_ids.keys()
+    if missing:
+        rows = [{"kind": kind, "name": name, "employer_count": 0} for kind, name in sorted(missing)]
+        # A concurrent writer may have created the same tag; keep theirs
+        insert_ignore(db, Tag, rows)
+        tag_ids.update(_lookup_tags(db, missing))
+    return tag_ids
+
+def sync_employer_tags(db: Session, employers: List[dict]) -> None:
+    """
+    Make the tag index match the values and keywords of `employers` (dicts
+    with id, values and keywords). Only the difference is written, so
+    re-running it is cheap. Does not commit.
+    """
+    if not employers:
+        return
+    wanted = {employer["id"]: employer_tag_pairs(employer) for employer in employers}
+    tag_ids = _ensure_tags(db, set().union(*wanted.values()))
+
+    current = defaultdict(set)
+    for employer_ids in _chunks(list(wanted)):
+        for tag_id, employer_id in db.execute(
+            select(EmployerTag.tag_id, EmployerTag.employer_id).where(EmployerTag.employer_id.in_(employer_ids))
+        ):
+            current[employer_id].add(tag_id)
+
+    added, deltas = [], defaultdict(int)
+    for employer_id, pairs in wanted.items():
+        target = {tag_ids[pair] for pair in pairs}
+        for tag_id in target - current[employer_id]:
+            added.append({"tag_id": tag_id, "employer_id": employer_id})
+            deltas[tag_id] += 1
+        removed = current[employer_id] - target
+        if removed:
+            db.execute(delete(EmployerTag).where(
+                EmployerTag.employer_id == employer_id, EmployerTag.tag_id.in_(removed)
+            ))
+            for tag_id in removed:
+                deltas[tag_id] -= 1
+
+    if added:
+        db.execute(insert(EmployerTag), added)
+    changed = [{"tag_id": tag_id, "delta": delta} for tag_id, delta in deltas.items() if delta]
+    if changed:
+        tags = Tag.__table__
+        db.execute(
+            update(tags)
+            .where(tags.c.id == bindparam("tag_id"))
+            .values(employer_count=tags.c.employer_count + bindparam("delta")),
+            changed,
+        )
+
+def recount_tags(db: Session) -> None:
+    """Recompute every tag's employer_count from the index. Does not commit."""
+    db.execute(update(Tag).values(employer_count=(
+        select(func.count()).where(EmployerTag.tag_id == Tag.id).scalar_subquery()
+    )))
+
+def backfill_employer_tags(db: Session, batch_size: int = 500) -> Iterator[int]:
+    """
+    Index the JSON values and keywords of every employer, one committed batch
+    at a time, walking the table by primary key so memory stays flat and
+    the backfill can run alongside live traffic. Yields the running total.
+    """
+    last_id, total = "", 0
+    while True:
+        batch = db.execute(
+            select(Employer.id, Employer.values, Employer.keywords)
+            .where(Employer.id > last_id)
+            .order_by(Employer.id)
+            .limit(batch_size)
+        ).mappings().all()
+        if not batch:
+            break
+        sync_employer_tags(db, [dict(row) for row in batch])
+        db.commit()
+        last_id = batch[-1]["id"]
+        total += len(batch)
+        yield total
+    recount_tags(db)
+    db.commit()
+
+def list_tags(db: Session, kind: Optional[str] = None, prefix: Optional[str] = None, limit: int = 50) -> List[dict]:
+    """Tags in use with their employer counts, most common first"""
+    stmt = select(Tag.kind, Tag.name, Tag.employer_count).where(Tag.employer_count > 0)
+    if kind:
+        stmt = stmt.where(Tag.kind == kind)
+    if prefix:
+        stmt = stmt.where(Tag.name.startswith(normalize_tag(prefix), autoescape=True))
+    stmt = stmt.order_by(Tag.employer_count.desc(), Tag.name).limit(limit)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+def match_employers(
+    db: Session,
+    tags: List[str],
+    match: str = "all",
+    kind: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[int, List[dict]]:
+    """
+    Employers carrying all (match="all") or any (match="any") of `tags`,
+    most matched tags first. Returns the total number of matching employers
+    and one page of them, each with a `matched` count.
+    """
+    names = sorted({normalize_tag(tag) for tag in tags if normalize_tag(tag)})
+    if not names:
+        return 0, []
+
+    # A name can exist as both a value and a keyword, so count names, not tag ids
+    matched = func.count(distinct(Tag.name)).label("matched")
+    grouped = (
+        select(EmployerTag.employer_id, matched)
+        .join(Tag, Tag.id == EmployerTag.tag_id)
+        .where(Tag.name.in_(names))
+        .group_by(EmployerTag.employer_id)
+    )
+    if kind:
+        grouped = grouped.where(Tag.kind == kind)
+    if match == "all":
+        grouped = grouped.having(matched == len(names))
+    hits = grouped.subquery()
+
+    total = db.execute(select(func.count()).select_from(hits)).scalar()
+    if not total:
+        return 0, []
+
+    employers = Employer.__table__
+    stmt = (
+        select(*employers.c, hits.c.matched)
+        .join(hits, hits.c.employer_id == employers.c.id)
+        .order_by(hits.c.matched.desc(), employers.c.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return total, [dict(row) for row in db.execute(stmt).mappings()]
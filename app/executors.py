@@ -0,0 +1,77 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+class ExecutorBusy(Exception):
+    """Raised when a bounded executor's queue is full"""
+
+class BoundedExecutor:
+    """
+    Runs blocking or CPU-heavy calls on a dedicated, separately sized
+    executor so bursts cannot starve the threadpool used by the sync
+    endpoints.
+
+    At most `workers + max_queue` calls are admitted at once; anything past
+    that fails fast with `busy_error` instead of queueing without bound.
+    """
+    busy_error = ExecutorBusy
+    thread_name_prefix = "bounded-executor"
+
+    def __init__(self, kind: str = "thread", workers: int = 2, max_queue: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind '{kind}'")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=self.thread_name_prefix
+                )
+        return self._executor
+
+    async def run(self, fn, *args):
+        # Admission happens on the event loop, so the counter needs no lock
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise self.busy_error()
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._in_flight -= 1
+            self.completed += 1
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(self._total_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_latency_ms": round(self._max_seconds * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,81 @@
+from typing import List
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.auth import generate_uuid
+from app.experiences.snapshot import apply_profile_changes
+
+def apply_batch(db: Session, model, create_schema, user_id: str, upserts: list, deletes: List[str]) -> List[dict]:
+    """
+    Apply a batch of upserts and deletes to one user-owned table in a
+    single transaction.
+
+    Ownership of every referenced id is checked with one SELECT. Creates are
+    written with one executemany INSERT, updates with one bulk UPDATE by
+    primary key and deletes with one DELETE. Items that fail validation or
+    reference rows the user does not own are reported and skipped; the rest
+    are committed together, with the user's profile snapshot.
+    """
+    referenced = {item.id for item in upserts if item.id} | set(deletes)
+    owned = set()
+    if referenced:
+        owned = set(db.execute(
+            select(model.id).where(model.user_id == user_id, model.id.in_(referenced))
+        ).scalars())
+
+    results, creates, updates, delete_ids = [], [], [], []
+    seen = set()
+    for index, item in enumerate(upserts):
+        if item.id is None:
+            try:
+                data = create_schema(**item.dict(exclude={"id"}, exclude_unset=True)).dict()
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                results.append({"operation": "upsert", "index": index, "status": "invalid", "error": error})
+                continue
+            data["id"] = generate_uuid()
+            data["user_id"] = user_id
+            creates.append(data)
+            results.append({"operation": "upsert", "index": index, "id": data["id"], "status": "created"})
+        elif item.id in seen:
+            results.append({"operation": "upsert", "index": index, "id": item.id, "status": "invalid",
+                            "error": "Duplicate id in batch"})
+        elif item.id not in owned:
+            results.append({"operation": "upsert", "index": index, "id": item.id, "status": "not_found"})
+        else:
+            seen.add(item.id)
+            data = item.dict(exclude_unset=True)
+            if len(data) > 1:
+                updates.append(data)
+            results.append({"operation": "upsert", "index": index, "id": item.id, "status": "updated"})
+
+    for index, id in enumerate(deletes):
+        if id in seen:
+            results.append({"operation": "delete", "index": index, "id": id, "status": "invalid",
+                            "error": "Duplicate id in batch"})
+        elif id not in owned:
+            results.append({"operation": "delete", "index": index, "id": id, "status": "not_found"})
+        else:
+            seen.add(id)
+            delete_ids.append(id)
+            results.append({"operation": "delete", "index": index, "id": id, "status": "deleted"})
+
+    if creates:
+        db.execute(insert(model), creates)
+    if updates:
+        db.execute(update(model), updates)
+    if delete_ids:
+        db.execute(delete(model).where(model.user_id == user_id, model.id.in_(delete_ids)))
+
+    written = [data["id"] for data in creates] + [data["id"] for data in updates]
+    rows = []
+    if written:
+        rows = [dict(row) for row in db.execute(
+            select(model.__table__).where(model.id.in_(written))
+        ).mappings()]
+    if rows or delete_ids:
+        apply_profile_changes(db, user_id, model, rows, delete_ids)
+    db.commit()
+    return results
@@ -0,0 +1,164 @@
+"""
+Per-user profile snapshots.
+
+A snapshot holds every experience, education and achievement of a user
+already formatted for prompts, with its token estimate and term counts for
+context selection. The profile write endpoints fold their changes into it
+in the same transaction with apply_profile_changes, re-formatting only the
+rows they touched, so generation reads one row and tokenizes nothing.
+content_hash covers every item's text; a write that leaves it unchanged
+skips the UPDATE.
+"""
+import hashlib
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.ai_generation.context import estimate_tokens, term_vector
+from app.ai_generation.profile import ITEM_KINDS, PROFILE_SECTIONS, format_item, load_profile_rows
+from app.crud import insert_ignore
+from app.models import ProfileSnapshot, User
+
+# Bump when snapshot_item or format_item change; older snapshots are rebuilt on next use
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Marks a row created only to be locked; it is always rebuilt before commit
+PLACEHOLDER_FORMAT_VERSION = 0
+
+SECTION_KEYS = {model: key for key, model, _, _ in PROFILE_SECTIONS}
+
+def snapshot_item(key: str, row: dict) -> dict:
+    text = format_item(key, row)
+    terms, length = term_vector(text)
+    created_at = row.get("created_at")
+    return {
+        "kind": ITEM_KINDS[key],
+        "id": row["id"],
+        "created_at": created_at.isoformat() if created_at else "",
+        "text": text,
+        "tokens": estimate_tokens(text),
+        "terms": terms,
+        "length": length,
+    }
+
+def build_snapshot_items(db: Session, user_id: str) -> Dict[str, List[dict]]:
+    """Snapshot items by section, newest first, built from the source tables"""
+    rows = load_profile_rows(db, user_id)
+    return {key: [snapshot_item(key, row) for row in section] for key, section in rows.items()}
+
+def content_hash(items: Dict[str, List[dict]]) -> str:
+    digest = hashlib.sha256()
+    for key, _, _, _ in PROFILE_SECTIONS:
+        for item in items.get(key) or []:
+            digest.update(f"{key}\0{item['id']}\0{item['text']}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+def _snapshot_values(items: Dict[str, List[dict]]) -> dict:
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "items": items,
+        "item_count": sum(len(section) for section in items.values()),
+        "content_hash": content_hash(items),
+    }
+
+def _write_snapshot(db: Session, user_id: str, items: Dict[str, List[dict]], exists: bool) -> None:
+    values = _snapshot_values(items)
+    if exists:
+        db.execute(update(ProfileSnapshot).where(ProfileSnapshot.user_id == user_id).values(**values))
+    else:
+        insert_ignore(db, ProfileSnapshot, [{"user_id": user_id, **values}])
+
+def _lock_snapshot(db: Session, user_id: str):
+    return db.execute(
+        select(ProfileSnapshot.format_version, ProfileSnapshot.items, ProfileSnapshot.content_hash)
+        .where(ProfileSnapshot.user_id == user_id)
+        .with_for_update()
+    ).mappings().first()
+
+def apply_profile_changes(db: Session, user_id: str, model, rows: Iterable[dict] = (),
+                          deleted_ids: Iterable[str] = ()) -> None:
+    """
+    Fold written `rows` (full rows, as returned by the write) and deleted ids
+    of one profile table into the user's snapshot. The snapshot row is
+    locked for the rest of the transaction, so concurrent writers apply
+    their changes one after the other. Does not commit.
+    """
+    current = _lock_snapshot(db, user_id)
+    if current is None:
+        # FOR UPDATE locks nothing without a row, so two first writes would both
+        # build and one would lose the other's change. Create a placeholder to
+        # lock; a concurrent first write waits on it and then sees our snapshot.
+        insert_ignore(db, ProfileSnapshot, [{
+            "user_id": user_id,
+            "format_version": PLACEHOLDER_FORMAT_VERSION,
+            "items": {},
+            "item_count": 0,
+            "content_hash": "",
+        }])
+        current = _lock_snapshot(db, user_id)
+    if current["format_version"] != SNAPSHOT_FORMAT_VERSION:
+        # Placeholders, profiles from before snapshots and older formats are rebuilt
+        # whole; the build sees this transaction's writes
+        _write_snapshot(db, user_id, build_snapshot_items(db, user_id), exists=True)
+        return
+
+    key = SECTION_KEYS[model]
+    written = {row["id"]: snapshot_item(key, row) for row in rows}
+    dropped = set(deleted_ids) | set(written)
+    section = [item for item in current["items"].get(key) or [] if item["id"] not in dropped]
+    section.extend(written.values())
+    section.sort(key=lambda item: (item["created_at"], item["id"]), reverse=True)
+
+    items = {**current["items"], key: section}
+    if content_hash(items) != current["content_hash"]:
+        _write_snapshot(db, user_id, items, exists=True)
+
+def load_profile_items(db: Session, user_id: str, request: dict) -> List[dict]:
+    """
+    The snapshot items a generation request refers to: the whole profile, or
+    the selected ids. Users without a current snapshot get one built in
+    memory; their next profile write stores it.
+    """
+    row = db.execute(
+        select(ProfileSnapshot.format_version, ProfileSnapshot.items).where(ProfileSnapshot.user_id == user_id)
+    ).mappings().first()
+    if row is not None and row["format_version"] == SNAPSHOT_FORMAT_VERSION:
+        items = row["items"]
+    else:
+        items = build_snapshot_items(db, user_id)
+
+    use_all = request.get("use_all_experiences", True)
+    selected = []
+    for key, _, ids_key, _ in PROFILE_SECTIONS:
+        section = items.get(key) or []
+        if not use_all:
+            ids = set(request.get(ids_key) or [])
+            section = [item for item in section if item["id"] in ids]
+        selected.extend(section)
+    return selected
+
+def backfill_profile_snapshots(db: Session, batch_size: int = 500) -> Iterator[int]:
+    """
+    Build snapshots for users without a current one, `batch_size` users per
+    transaction. Yields the running count of users checked.
+    """
+    checked = 0
+    last_id = ""
+    while True:
+        user_ids = list(db.execute(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ).scalars())
+        if not user_ids:
+            return
+        versions = dict(db.execute(
+            select(ProfileSnapshot.user_id, ProfileSnapshot.format_version)
+            .where(ProfileSnapshot.user_id.in_(user_ids))
+        ).all())
+        for user_id in user_ids:
+            if versions.get(user_id) != SNAPSHOT_FORMAT_VERSION:
+                _write_snapshot(db, user_id, build_snapshot_items(db, user_id), exists=user_id in versions)
+        db.commit()
+        checked += len(user_ids)
+        last_id = user_ids[-1]
+        yield checked
@@ -1,22 +1,43 @@
-from fastapi import FastAPI, Request
+import hmac
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.api.v1.api import api_router
-from app.database import Base, engine
+from app.database import engine, get_pool_stats
+from app.migrations import verify_schema
+from app.auth.cache import principal_cache
+from app.auth.hashing import HasherBusy, password_hasher
+from app.employers.catalogue import employer_catalogue
+from app.documents.render import RenderBusy, document_renderer
+from app.ai_generation.cache import generation_cache
+from app.ai_generation.llm import get_llm_client, shutdown_llm_client
+from app.ai_generation.worker import generation_backend, recover_jobs
 
 # Initialize settings
 settings = get_settings()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables are managed by `python -m app.tools.manage migrate`; only check the version here
+    verify_schema(engine)
+    # Pick up jobs queued or left running before the last shutdown
+    recover_jobs()
+    yield
+    password_hasher.shutdown()
+    document_renderer.shutdown()
+    generation_backend.shutdown()
+    await shutdown_llm_client()
 
 app = FastAPI(
     title="CV Tailor",
     description="API for generating tailored CVs and cover letters",
     version="0.1.0",
     docs_url="/docs" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # CORS settings
@@ -26,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -39,7 +61,44 @@ async def root():
 async def health_check():
     return {"status": "ok"}
 
+def require_internal_token(authorization: str = Header("")) -> None:
+    """Only callers holding INTERNAL_STATS_TOKEN; everyone gets a 404 while it is unset"""
+    token = settings.INTERNAL_STATS_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+@app.get("/internal/stats", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+async def internal_stats():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "database_pools": get_pool_stats(),
+        "employer_catalogue": employer_catalogue.stats(),
+        "document_renderer": document_renderer.stats(),
+        "generation": generation_backend.stats(),
+        "generation_cache": generation_cache.stats(),
+        "llm": get_llm_client().stats(),
+    }
+
 # Error handlers
+@app.exception_handler(HasherBusy)
+async def hasher_busy_handler(request: Request, exc: HasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service is busy. Please try again shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(RenderBusy)
+async def render_busy_handler(request: Request, exc: RenderBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Document rendering is busy. Please try again shortly."},
+        headers={"Retry-After": "2"},
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     if settings.DEBUG:
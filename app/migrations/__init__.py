@@ -0,0 +1,70 @@
+import importlib
+import pkgutil
+from typing import List, Optional
+
+from sqlalchemy import MetaData, Table, Column, Integer, DateTime, select, func, insert
+from sqlalchemy.exc import DBAPIError
+
+from app.migrations import versions
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised when the database schema does not match the code's migrations"""
+
+# Bookkeeping table, one row per applied migration
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version", schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+def load_migrations() -> List:
+    """Import every migration module, ordered by VERSION"""
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+        if info.name.startswith("m")
+    ]
+    modules.sort(key=lambda module: module.VERSION)
+    numbers = [module.VERSION for module in modules]
+    if numbers != list(range(1, len(numbers) + 1)):
+        raise RuntimeError(f"Migration versions must be contiguous from 1, found {numbers}")
+    return modules
+
+def head_version() -> int:
+    return len(load_migrations())
+
+def current_version(connection) -> int:
+    """Current schema version; this is the single query the app runs at startup"""
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def migrate(engine, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to `target` (default: all), each in its own transaction"""
+    schema_metadata.create_all(bind=engine, checkfirst=True)
+    with engine.connect() as connection:
+        current = current_version(connection)
+
+    applied = []
+    for module in load_migrations():
+        if module.VERSION <= current or (target is not None and module.VERSION > target):
+            continue
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(insert(schema_version).values(version=module.VERSION))
+        applied.append(module.VERSION)
+    return applied
+
+def verify_schema(engine, expected: Optional[int] = None) -> int:
+    """Fail fast when the database is behind (or ahead of) the code"""
+    expected = head_version() if expected is None else expected
+    try:
+        with engine.connect() as connection:
+            current = current_version(connection)
+    except DBAPIError:
+        current = 0
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {current}, code expects {expected}. "
+            "Run `python -m app.tools.manage migrate`."
+        )
+    return current
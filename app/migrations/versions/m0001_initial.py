@@ -0,0 +1,101 @@
+"""Initial schema for users, profile entities, documents and employers"""
+from sqlalchemy import (
+    MetaData, Table, Column, String, Text, DateTime, Boolean, Enum, JSON, ForeignKey
+)
+from sqlalchemy.sql import func
+
+VERSION = 1
+
+# Frozen copy of the models at this version; later model changes need their own migration
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("hashed_password", String),
+    Column("first_name", String),
+    Column("last_name", String),
+    Column("phone", String, nullable=True),
+    Column("subscription_status", Enum("free", "monthly", "yearly", "one_time", name="subscription_status")),
+    Column("subscription_end_date", DateTime(timezone=True), nullable=True),
+    Column("is_active", Boolean),
+    Column("is_verified", Boolean),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+Table(
+    "experiences", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE")),
+    Column("company_name", String),
+    Column("job_title", String),
+    Column("start_date", DateTime(timezone=True)),
+    Column("end_date", DateTime(timezone=True), nullable=True),
+    Column("is_current", Boolean),
+    Column("location", String, nullable=True),
+    Column("description", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+Table(
+    "educations", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE")),
+    Column("institution", String),
+    Column("degree", String),
+    Column("field_of_study", String),
+    Column("start_date", DateTime(timezone=True)),
+    Column("end_date", DateTime(timezone=True), nullable=True),
+    Column("is_current", Boolean),
+    Column("location", String, nullable=True),
+    Column("description", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+Table(
+    "achievements", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE")),
+    Column("title", String),
+    Column("description", Text),
+    Column("date", DateTime(timezone=True), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+Table(
+    "documents", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE")),
+    Column("title", String),
+    Column("content", Text),
+    Column("document_type", Enum("cv", "cover_letter", name="document_type")),
+    Column("employer_name", String, nullable=True),
+    Column("job_title", String, nullable=True),
+    Column("file_path", String, nullable=True),
+    Column("file_url", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+Table(
+    "employers", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("name", String, unique=True, index=True),
+    Column("website", String, nullable=True),
+    Column("industry", String, nullable=True),
+    Column("description", Text, nullable=True),
+    Column("values", JSON, nullable=True),
+    Column("keywords", JSON, nullable=True),
+    Column("last_scraped", DateTime(timezone=True), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+def upgrade(connection):
+    # checkfirst adopts databases that were created by the old create_all at startup
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,16 @@
+"""
+Composite (user_id, created_at) indexes for the user-owned list queries.
+id is appended as the tie-breaker so ORDER BY created_at, id needs no sort.
+"""
+from sqlalchemy import text
+
+VERSION = 2
+
+TABLES = ["experiences", "educations", "achievements", "documents"]
+
+def upgrade(connection):
+    for table in TABLES:
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_user_id_created_at "
+            f"ON {table} (user_id, created_at, id)"
+        ))
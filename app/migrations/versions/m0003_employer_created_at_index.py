@@ -0,0 +1,9 @@
+"""(created_at, id) index for keyset pagination of the employer list"""
+from sqlalchemy import text
+
+VERSION = 3
+
+def upgrade(connection):
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_employers_created_at ON employers (created_at, id)"
+    ))
@@ -0,0 +1,16 @@
+"""Version counters used to invalidate the employer catalogue cache across workers"""
+from sqlalchemy import MetaData, Table, Column, String, Integer, insert
+
+VERSION = 4
+
+metadata = MetaData()
+
+catalogue_versions = Table(
+    "catalogue_versions", metadata,
+    Column("name", String, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, checkfirst=True)
+    connection.execute(insert(catalogue_versions).values(name="employers", version=1))
@@ -0,0 +1,40 @@
+"""
+Full-text index over employers: an FTS5 table on SQLite, a weighted
+tsvector column with a GIN index on Postgres. Existing rows are backfilled.
+"""
+from sqlalchemy import text
+
+VERSION = 5
+
+SQLITE_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS employers_fts USING fts5(
+        employer_id UNINDEXED, name, industry, description, employer_values, keywords,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO employers_fts (employer_id, name, industry, description, employer_values, keywords)
+    SELECT id, coalesce(name, ''), coalesce(industry, ''), coalesce(description, ''),
+           coalesce("values", ''), coalesce(keywords, '')
+    FROM employers
+    """,
+]
+
+POSTGRES_STATEMENTS = [
+    "ALTER TABLE employers ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_employers_search_vector ON employers USING GIN (search_vector)",
+    """
+    UPDATE employers SET search_vector =
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(industry, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce("values"::text, '') || ' ' || coalesce(keywords::text, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    """,
+]
+
+def upgrade(connection):
+    dialect = connection.dialect.name
+    statements = {"sqlite": SQLITE_STATEMENTS, "postgresql": POSTGRES_STATEMENTS}.get(dialect, [])
+    for statement in statements:
+        connection.execute(text(statement))
@@ -0,0 +1,31 @@
+"""
+Normalized employer values and keywords: a tags table and an employer_tags
+inverted index. Existing JSON data is copied by `manage backfill-tags`.
+"""
+from sqlalchemy import MetaData, Table, Column, String, Integer, ForeignKey, Index, UniqueConstraint
+
+VERSION = 6
+
+metadata = MetaData()
+
+# Only referenced for the foreign key, never created here
+Table("employers", metadata, Column("id", String, primary_key=True))
+
+tags = Table(
+    "tags", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("kind", String, nullable=False),
+    Column("name", String, nullable=False),
+    Column("employer_count", Integer, nullable=False),
+    UniqueConstraint("name", "kind", name="uq_tags_name_kind"),
+)
+
+employer_tags = Table(
+    "employer_tags", metadata,
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Column("employer_id", String, ForeignKey("employers.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_employer_tags_employer_id", "employer_id"),
+)
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, tables=[tags, employer_tags], checkfirst=True)
@@ -0,0 +1,7 @@
+"""Reference to blob storage for document content too large to keep inline"""
+from sqlalchemy import text
+
+VERSION = 7
+
+def upgrade(connection):
+    connection.execute(text("ALTER TABLE documents ADD COLUMN content_ref VARCHAR"))
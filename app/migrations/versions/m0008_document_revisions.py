@@ -0,0 +1,27 @@
+"""Revision history for document content"""
+from sqlalchemy import (
+    MetaData, Table, Column, String, Integer, DateTime, Enum, LargeBinary, ForeignKey, UniqueConstraint
+)
+from sqlalchemy.sql import func
+
+VERSION = 8
+
+metadata = MetaData()
+
+# Only referenced for the foreign key, never created here
+Table("documents", metadata, Column("id", String, primary_key=True))
+
+document_revisions = Table(
+    "document_revisions", metadata,
+    Column("id", String, primary_key=True),
+    Column("document_id", String, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False),
+    Column("number", Integer, nullable=False),
+    Column("kind", Enum("snapshot", "delta", name="document_revision_kind"), nullable=False),
+    Column("data", LargeBinary, nullable=False),
+    Column("content_size", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint("document_id", "number", name="uq_document_revisions_document_id_number"),
+)
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, tables=[document_revisions], checkfirst=True)
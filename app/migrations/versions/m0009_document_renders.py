@@ -0,0 +1,17 @@
+"""Cache of rendered document files keyed by a hash of template and content"""
+from sqlalchemy import MetaData, Table, Column, String, DateTime
+from sqlalchemy.sql import func
+
+VERSION = 9
+
+metadata = MetaData()
+
+document_renders = Table(
+    "document_renders", metadata,
+    Column("render_key", String, primary_key=True),
+    Column("file_path", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,31 @@
+"""Persisted AI generation jobs"""
+from sqlalchemy import (
+    MetaData, Table, Column, String, Text, DateTime, Enum, Integer, JSON, ForeignKey, Index
+)
+from sqlalchemy.sql import func
+
+VERSION = 10
+
+metadata = MetaData()
+
+# Only referenced for the foreign key, never created here
+Table("users", metadata, Column("id", String, primary_key=True))
+
+generation_jobs = Table(
+    "generation_jobs", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("status", Enum("queued", "running", "succeeded", "failed", name="generation_job_status"), nullable=False),
+    Column("request", JSON, nullable=False),
+    Column("document_id", String, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("attempts", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("started_at", DateTime(timezone=True), nullable=True),
+    Column("finished_at", DateTime(timezone=True), nullable=True),
+    Index("ix_generation_jobs_user_id_status", "user_id", "status"),
+    Index("ix_generation_jobs_status_created_at", "status", "created_at"),
+)
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, tables=[generation_jobs], checkfirst=True)
@@ -0,0 +1,7 @@
+"""Record which profile items each generation job put in its prompt"""
+from sqlalchemy import text
+
+VERSION = 11
+
+def upgrade(connection):
+    connection.execute(text("ALTER TABLE generation_jobs ADD COLUMN context JSON"))
@@ -0,0 +1,23 @@
+"""Materialized per-user profile snapshots for prompt assembly"""
+from sqlalchemy import MetaData, Table, Column, String, DateTime, Integer, JSON, ForeignKey
+from sqlalchemy.sql import func
+
+VERSION = 12
+
+metadata = MetaData()
+
+# Only referenced for the foreign key, never created here
+Table("users", metadata, Column("id", String, primary_key=True))
+
+profile_snapshots = Table(
+    "profile_snapshots", metadata,
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("format_version", Integer, nullable=False),
+    Column("items", JSON, nullable=False),
+    Column("item_count", Integer, nullable=False),
+    Column("content_hash", String(64), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, tables=[profile_snapshots], checkfirst=True)
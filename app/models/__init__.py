@@ -1,7 +1,8 @@
 from app.models.user import User
-from app.models.experience import Experience, Education, Achievement
-from app.models.document import Document
-from app.models.employer import Employer
+from app.models.experience import Experience, Education, Achievement, ProfileSnapshot
+from app.models.document import Document, DocumentRevision, DocumentRender
+from app.models.generation import GenerationJob
+from app.models.employer import Employer, CatalogueVersion, Tag, EmployerTag
 
 # This allows importing all models from app.models
 # For example: from app.models import User, Document
\ No newline at end of file
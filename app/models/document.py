@@ -1,17 +1,25 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Index, Integer, LargeBinary, UniqueConstraint
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 from app.database import Base
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # id breaks created_at ties so list ordering is fully index-backed
+        Index("ix_documents_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
 
     title = Column(String)
-    content = Column(Text)
+    # Unbounded and only needed when a single document is returned; query
+    # with undefer(Document.content) to load it up front
+    content = deferred(Column(Text))
+    # Blob key holding the content instead when it is too large to keep inline
+    content_ref = Column(String, nullable=True)
     document_type = Column(Enum("cv", "cover_letter", name="document_type"))
 
     employer_name = Column(String, nullable=True)
@@ -24,4 +32,32 @@ class Document(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="documents")
\ No newline at end of file
+    user = relationship("User", back_populates="documents")
+
+
+class DocumentRevision(Base):
+    """
+    One saved version of a document's content, stored as a compressed delta
+    against the previous revision or, periodically, as a full snapshot.
+    """
+    __tablename__ = "document_revisions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "number", name="uq_document_revisions_document_id_number"),
+    )
+
+    id = Column(String, primary_key=True)
+    document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    number = Column(Integer, nullable=False)
+    kind = Column(Enum("snapshot", "delta", name="document_revision_kind"), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    content_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DocumentRender(Base):
+    """Rendered file for a hash of (template, title, content), so repeat downloads skip rendering"""
+    __tablename__ = "document_renders"
+
+    render_key = Column(String, primary_key=True)
+    file_path = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
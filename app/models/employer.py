@@ -1,10 +1,13 @@
-from sqlalchemy import Column, String, Text, DateTime, JSON
+from sqlalchemy import Column, String, Text, DateTime, JSON, Index, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 
 from app.database import Base
 
 class Employer(Base):
     __tablename__ = "employers"
+    __table_args__ = (
+        Index("ix_employers_created_at", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
@@ -18,4 +21,39 @@ class Employer(Base):
     
     last_scraped = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class CatalogueVersion(Base):
+    """Version counters for process-level caches shared across workers"""
+    __tablename__ = "catalogue_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class Tag(Base):
+    """A normalized employer value or keyword"""
+    __tablename__ = "tags"
+    __table_args__ = (
+        UniqueConstraint("name", "kind", name="uq_tags_name_kind"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # "value" or "keyword"
+    name = Column(String, nullable=False)
+    employer_count = Column(Integer, nullable=False, default=0)
+
+
+class EmployerTag(Base):
+    """
+    Inverted index from tag to employers. The (tag_id, employer_id) primary
+    key serves tag lookups, the employer_id index serves re-tagging.
+    """
+    __tablename__ = "employer_tags"
+    __table_args__ = (
+        Index("ix_employer_tags_employer_id", "employer_id"),
+    )
+
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    employer_id = Column(String, ForeignKey("employers.id", ondelete="CASCADE"), primary_key=True)
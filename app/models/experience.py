@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, Index, Integer, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,10 @@ from app.database import Base
 
 class Experience(Base):
     __tablename__ = "experiences"
+    __table_args__ = (
+        # id breaks created_at ties so list ordering is fully index-backed
+        Index("ix_experiences_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
@@ -28,6 +32,10 @@ class Experience(Base):
 
 class Education(Base):
     __tablename__ = "educations"
+    __table_args__ = (
+        # id breaks created_at ties so list ordering is fully index-backed
+        Index("ix_educations_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
@@ -51,6 +59,10 @@ class Education(Base):
 
 class Achievement(Base):
     __tablename__ = "achievements"
+    __table_args__ = (
+        # id breaks created_at ties so list ordering is fully index-backed
+        Index("ix_achievements_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
@@ -63,4 +75,21 @@ class Achievement(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="achievements")
\ No newline at end of file
+    user = relationship("User", back_populates="achievements")
+
+
+class ProfileSnapshot(Base):
+    """
+    Prompt-ready copy of a user's experiences, educations and achievements:
+    each item's formatted text, token estimate and term counts. Kept current
+    by the profile write endpoints, so generation reads one row.
+    """
+    __tablename__ = "profile_snapshots"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Snapshots in an older format are rebuilt rather than patched
+    format_version = Column(Integer, nullable=False)
+    items = Column(JSON, nullable=False)
+    item_count = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Index, Integer, JSON
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+class GenerationJob(Base):
+    """A queued or finished AI document generation request"""
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        # Active-job counts per user and recovery scans after a restart
+        Index("ix_generation_jobs_user_id_status", "user_id", "status"),
+        Index("ix_generation_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    status = Column(
+        Enum("queued", "running", "succeeded", "failed", name="generation_job_status"),
+        nullable=False, default="queued"
+    )
+    request = Column(JSON, nullable=False)
+    document_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    # Profile items chosen for the prompt (see app.ai_generation.context)
+    context = Column(JSON, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
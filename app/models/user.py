@@ -27,6 +27,15 @@ class User(Base):
     
     # Relationships
     documents = relationship("Document", back_populates="user", cascade="all, delete-orphan")
-    experiences = relationship("Experience", back_populates="user", cascade="all, delete-orphan")
-    educations = relationship("Education", back_populates="user", cascade="all, delete-orphan")
-    achievements = relationship("Achievement", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    experiences = relationship(
+        "Experience", back_populates="user", cascade="all, delete-orphan",
+        order_by="[Experience.created_at.desc(), Experience.id.desc()]"
+    )
+    educations = relationship(
+        "Education", back_populates="user", cascade="all, delete-orphan",
+        order_by="[Education.created_at.desc(), Education.id.desc()]"
+    )
+    achievements = relationship(
+        "Achievement", back_populates="user", cascade="all, delete-orphan",
+        order_by="[Achievement.created_at.desc(), Achievement.id.desc()]"
+    )
\ No newline at end of file
@@ -3,7 +3,12 @@ from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse, Tok
 from app.schemas.experience import (
     ExperienceBase, ExperienceCreate, ExperienceUpdate, ExperienceResponse,
     EducationBase, EducationCreate, EducationUpdate, EducationResponse,
-    AchievementBase, AchievementCreate, AchievementUpdate, AchievementResponse
+    AchievementBase, AchievementCreate, AchievementUpdate, AchievementResponse,
+    ExperienceBatchItem, EducationBatchItem, AchievementBatchItem,
+    ExperienceBatchRequest, EducationBatchRequest, AchievementBatchRequest,
+    BatchItemResult, BatchResponse
 )
-from app.schemas.document import DocumentBase, DocumentCreate, DocumentUpdate, DocumentResponse, DocumentGenerateRequest
-from app.schemas.employer import EmployerBase, EmployerCreate, EmployerUpdate, EmployerResponse, ScrapeRequest
\ No newline at end of file
+from app.schemas.profile import ProfileUser, ProfileResponse
+from app.schemas.document import DocumentBase, DocumentCreate, DocumentUpdate, DocumentSummary, DocumentResponse, DocumentRevisionSummary, DocumentRevisionResponse, DocumentGenerateRequest, GenerationTarget, DocumentGenerateBatchRequest
+from app.schemas.employer import EmployerBase, EmployerCreate, EmployerUpdate, EmployerResponse, EmployerSearchResult, EmployerTagMatch, EmployerTagMatchPage, TagCount, ScrapeRequest
+from app.schemas.generation import GenerationContextItem, GenerationContext, GenerationJobResponse
\ No newline at end of file
@@ -17,6 +17,18 @@ class DocumentUpdate(BaseModel):
     employer_name: Optional[str] = None
     job_title: Optional[str] = None
 
+class DocumentSummary(DocumentBase):
+    """Document metadata without its content, for list views"""
+    id: str
+    user_id: str
+    file_path: Optional[str] = None
+    file_url: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 class DocumentResponse(DocumentBase):
     id: str
     user_id: str
@@ -29,6 +41,16 @@ class DocumentResponse(DocumentBase):
     class Config:
         orm_mode = True
 
+class DocumentRevisionSummary(BaseModel):
+    """A saved version of a document, without its content"""
+    number: int
+    kind: Literal["snapshot", "delta"]
+    content_size: int
+    created_at: datetime
+
+class DocumentRevisionResponse(DocumentRevisionSummary):
+    content: str
+
 class DocumentGenerateRequest(BaseModel):
     """Request model for generating a document"""
     document_type: Literal["cv", "cover_letter"]
@@ -38,4 +60,19 @@ class DocumentGenerateRequest(BaseModel):
     use_all_experiences: bool = True
     experience_ids: Optional[List[str]] = None
     education_ids: Optional[List[str]] = None
-    achievement_ids: Optional[List[str]] = None
\ No newline at end of file
+    achievement_ids: Optional[List[str]] = None
+
+class GenerationTarget(BaseModel):
+    """One position of a batch generation"""
+    employer_name: Optional[str] = None
+    job_title: Optional[str] = None
+    job_description: Optional[str] = None
+
+class DocumentGenerateBatchRequest(BaseModel):
+    """Request model for generating one document per target from the same profile selection"""
+    document_type: Literal["cv", "cover_letter"]
+    targets: List[GenerationTarget]
+    use_all_experiences: bool = True
+    experience_ids: Optional[List[str]] = None
+    education_ids: Optional[List[str]] = None
+    achievement_ids: Optional[List[str]] = None
@@ -31,6 +31,25 @@ class EmployerResponse(EmployerBase):
     class Config:
         orm_mode = True
 
+class EmployerSearchResult(EmployerResponse):
+    """Employer with its full-text relevance score (higher is better)"""
+    rank: float
+
+class EmployerTagMatch(EmployerResponse):
+    """Employer with the number of requested tags it carries"""
+    matched: int
+
+class EmployerTagMatchPage(BaseModel):
+    """One page of tag matches and the total number of matching employers"""
+    total: int
+    items: List[EmployerTagMatch]
+
+class TagCount(BaseModel):
+    """A value or keyword tag and how many employers carry it"""
+    kind: str
+    name: str
+    employer_count: int
+
 class ScrapeRequest(BaseModel):
     """Request to scrape employer data"""
     employer_url: str
\ No newline at end of file
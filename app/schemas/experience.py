@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 # Experience schemas
@@ -87,4 +87,39 @@ class AchievementResponse(AchievementBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# Batch schemas
+class ExperienceBatchItem(ExperienceUpdate):
+    """Upsert item: with an id it updates that experience, without one it creates"""
+    id: Optional[str] = None
+
+class EducationBatchItem(EducationUpdate):
+    """Upsert item: with an id it updates that education entry, without one it creates"""
+    id: Optional[str] = None
+
+class AchievementBatchItem(AchievementUpdate):
+    """Upsert item: with an id it updates that achievement, without one it creates"""
+    id: Optional[str] = None
+
+class ExperienceBatchRequest(BaseModel):
+    upserts: List[ExperienceBatchItem] = []
+    deletes: List[str] = []
+
+class EducationBatchRequest(BaseModel):
+    upserts: List[EducationBatchItem] = []
+    deletes: List[str] = []
+
+class AchievementBatchRequest(BaseModel):
+    upserts: List[AchievementBatchItem] = []
+    deletes: List[str] = []
+
+class BatchItemResult(BaseModel):
+    operation: Literal["upsert", "delete"]
+    index: int
+    id: Optional[str] = None
+    status: Literal["created", "updated", "deleted", "not_found", "invalid"]
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
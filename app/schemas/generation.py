@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import List, Optional, Literal
+from datetime import datetime
+
+class GenerationContextItem(BaseModel):
+    """A profile item included in the prompt"""
+    kind: Literal["experience", "education", "achievement"]
+    id: str
+    score: float
+    tokens: int
+
+class GenerationContext(BaseModel):
+    """Profile items chosen for the prompt, best match first; budget is None when nothing was left out"""
+    budget: Optional[int] = None
+    tokens: int
+    candidates: int
+    items: List[GenerationContextItem]
+
+class GenerationJobResponse(BaseModel):
+    """State of an AI generation job; document_id is set once it succeeds"""
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    document_type: str
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    context: Optional[GenerationContext] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
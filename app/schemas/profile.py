@@ -0,0 +1,22 @@
+from pydantic import BaseModel, EmailStr
+from typing import Optional, List
+
+from app.schemas.experience import ExperienceResponse, EducationResponse, AchievementResponse
+
+class ProfileUser(BaseModel):
+    id: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    phone: Optional[str] = None
+    subscription_status: str
+
+    class Config:
+        orm_mode = True
+
+class ProfileResponse(BaseModel):
+    """User basics plus every profile collection, for a single page load"""
+    user: ProfileUser
+    experiences: List[ExperienceResponse]
+    educations: List[EducationResponse]
+    achievements: List[AchievementResponse]
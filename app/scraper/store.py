@@ -0,0 +1,20 @@
+from sqlalchemy.orm import Session
+
+from app.models import Employer
+from app.crud import insert_returning
+from app.employers.catalogue import bump_catalogue_version
+from app.employers.search import index_employer
+from app.employers.tags import sync_employer_tags
+
+def save_scraped_employer(db: Session, employer_data: dict) -> dict:
+    """
+    Write a scraped employer and everything derived from it in one
+    transaction. Every change to the catalogue must go through here so the
+    cached employer list is invalidated.
+    """
+    employer = insert_returning(db, Employer, employer_data, commit=False)
+    index_employer(db, employer)
+    sync_employer_tags(db, [employer])
+    bump_catalogue_version(db)
+    db.commit()
+    return employer
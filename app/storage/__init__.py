@@ -0,0 +1,24 @@
+from functools import lru_cache
+
+from app.config import get_settings
+from app.storage.base import BlobInfo, BlobNotFound, BlobStore
+from app.storage.local import LocalBlobStore
+
+def create_blob_store(settings) -> BlobStore:
+    if settings.STORAGE_TYPE == "local":
+        return LocalBlobStore(settings.STORAGE_LOCAL_ROOT, compression=settings.STORAGE_COMPRESSION)
+    if settings.STORAGE_TYPE == "s3":
+        # boto3 is only imported when S3 storage is configured
+        from app.storage.s3 import S3BlobStore
+        return S3BlobStore(
+            settings.STORAGE_S3_BUCKET,
+            prefix=settings.STORAGE_S3_PREFIX,
+            compression=settings.STORAGE_COMPRESSION,
+            endpoint_url=settings.STORAGE_S3_ENDPOINT_URL or None,
+            region_name=settings.STORAGE_S3_REGION or None,
+        )
+    raise ValueError(f"Unknown STORAGE_TYPE '{settings.STORAGE_TYPE}'")
+
+@lru_cache()
+def get_blob_store() -> BlobStore:
+    return create_blob_store(get_settings())
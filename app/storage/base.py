@@ -0,0 +1,97 @@
+import hashlib
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator
+
+from app.storage.compression import decompress_stream, get_compressor
+
+CHUNK_SIZE = 1024 * 1024
+# Compressed uploads are spooled to disk beyond this size while being hashed
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+class BlobNotFound(Exception):
+    """No blob is stored under the requested key"""
+
+@dataclass(frozen=True)
+class BlobInfo:
+    key: str
+    size: int  # uncompressed bytes
+    stored_size: int  # compressed bytes
+    created: bool  # False when identical content was already stored
+
+class BlobStore:
+    """
+    Content-addressed, compressed blob storage.
+
+    Blobs are keyed by the SHA-256 of their uncompressed content, so storing
+    the same bytes twice (from any user) keeps one copy. Backends only move
+    opaque compressed objects: they implement _exists, _write, _read and
+    _delete on object paths.
+    """
+
+    def __init__(self, compression: str = "gzip"):
+        get_compressor(compression)  # fail at startup, not on first write
+        self.compression = compression
+
+    @staticmethod
+    def path(key: str) -> str:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid blob key '{key}'")
+        return f"{key[:2]}/{key[2:4]}/{key}"
+
+    def put(self, data: bytes) -> BlobInfo:
+        return self.put_stream([data])
+
+    def put_stream(self, chunks: Iterable[bytes]) -> BlobInfo:
+        """
+        Store a stream of chunks. Content is hashed and compressed in one
+        pass into a spool file, then uploaded only if the key is new.
+        """
+        digest = hashlib.sha256()
+        compressor = get_compressor(self.compression)
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                spool.write(compressor.compress(chunk))
+            spool.write(compressor.flush())
+            stored_size = spool.tell()
+
+            key = digest.hexdigest()
+            path = self.path(key)
+            if self._exists(path):
+                return BlobInfo(key=key, size=size, stored_size=stored_size, created=False)
+            spool.seek(0)
+            self._write(path, spool)
+        return BlobInfo(key=key, size=size, stored_size=stored_size, created=True)
+
+    def open(self, key: str) -> Iterator[bytes]:
+        """Uncompressed content as chunks; raises BlobNotFound before the first chunk"""
+        return decompress_stream(self._read(self.path(key)))
+
+    def get(self, key: str) -> bytes:
+        return b"".join(self.open(key))
+
+    def exists(self, key: str) -> bool:
+        return self._exists(self.path(key))
+
+    def delete(self, key: str) -> None:
+        """Remove a blob. Callers must know no other row references it."""
+        self._delete(self.path(key))
+
+    def _exists(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def _write(self, path: str, fileobj: BinaryIO) -> None:
+        raise NotImplementedError
+
+    def _read(self, path: str) -> Iterator[bytes]:
+        """Open the object eagerly (raising BlobNotFound) and return its chunks"""
+        raise NotImplementedError
+
+    def _delete(self, path: str) -> None:
+        raise NotImplementedError
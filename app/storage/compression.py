@@ -0,0 +1,52 @@
+"""
+Streaming blob compression. gzip is always available; zstd is used when
+the optional zstandard package is installed. Readers detect the codec from
+the magic bytes, so blobs written with either codec stay readable.
+"""
+import zlib
+from itertools import chain
+from typing import Iterable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip covers every deployment
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def get_compressor(codec: str):
+    """A fresh compressobj-style object (compress() / flush()) for `codec`"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("STORAGE_COMPRESSION=zstd requires the zstandard package")
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    if codec == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    raise ValueError(f"Unknown storage compression '{codec}'")
+
+def decompress_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decompress a stream of stored chunks, whichever codec wrote them"""
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= len(ZSTD_MAGIC):
+            break
+
+    if head.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("Reading zstd blobs requires the zstandard package")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    elif head.startswith(GZIP_MAGIC):
+        decompressor = zlib.decompressobj(31)
+    else:
+        raise ValueError("Unrecognised blob encoding")
+
+    for chunk in chain([head], chunks):
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Iterator
+
+from app.storage.base import CHUNK_SIZE, BlobNotFound, BlobStore
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory, fanned out by key prefix"""
+
+    def __init__(self, root: str, compression: str = "gzip"):
+        super().__init__(compression)
+        self.root = root
+
+    def _full_path(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    def _exists(self, path: str) -> bool:
+        return os.path.exists(self._full_path(path))
+
+    def _write(self, path: str, fileobj: BinaryIO) -> None:
+        full_path = self._full_path(path)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write beside the target and rename, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _read(self, path: str) -> Iterator[bytes]:
+        try:
+            f = open(self._full_path(path), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(path)
+
+        def chunks():
+            with f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield chunk
+        return chunks()
+
+    def _delete(self, path: str) -> None:
+        try:
+            os.remove(self._full_path(path))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,52 @@
+from typing import BinaryIO, Iterator, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+from app.storage.base import CHUNK_SIZE, BlobNotFound, BlobStore
+
+MISSING_CODES = ("404", "NoSuchKey", "NotFound")
+
+class S3BlobStore(BlobStore):
+    """
+    Blobs as objects in an S3-compatible bucket. Large uploads go through
+    upload_fileobj, which switches to a multipart upload and never holds the
+    whole blob in memory.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", compression: str = "gzip", client=None,
+                 endpoint_url: Optional[str] = None, region_name: Optional[str] = None):
+        super().__init__(compression)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.client = client or boto3.client("s3", endpoint_url=endpoint_url, region_name=region_name)
+
+    def _object_key(self, path: str) -> str:
+        return self.prefix + path
+
+    def _exists(self, path: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(path))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in MISSING_CODES:
+                return False
+            raise
+        return True
+
+    def _write(self, path: str, fileobj: BinaryIO) -> None:
+        self.client.upload_fileobj(
+            fileobj, self.bucket, self._object_key(path),
+            ExtraArgs={"ContentType": "application/octet-stream"},
+        )
+
+    def _read(self, path: str) -> Iterator[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(path))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in MISSING_CODES:
+                raise BlobNotFound(path)
+            raise
+        return response["Body"].iter_chunks(CHUNK_SIZE)
+
+    def _delete(self, path: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(path))
@@ -0,0 +1,94 @@
+"""
+Measure prompt size with and without relevance-ranked context packing on
+synthetic profiles of increasing length, plus the time spent scoring and
+how many deliberately relevant items survive the cut. "format ms" is the
+formatting and tokenizing the profile snapshot saves each generation.
+
+Usage: python -m app.tools.bench_context_packing [--sizes 20,100,500,2000] [--budget 1500] [--repeat 20]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from app.ai_generation.context import estimate_tokens, query_weights, select_context
+from app.ai_generation.generator import build_prompt
+from app.experiences.snapshot import snapshot_item
+
+FILLER = (
+    "managed weekly rosters served customers handled cash reconciled inventory trained new staff "
+    "organised events answered phones updated spreadsheets cleaned equipment restocked shelves "
+    "coordinated deliveries greeted visitors processed returns supported the team during peak periods"
+).split()
+RELEVANT = (
+    "Built Python data pipelines on Spark and Kafka, modelled warehouse tables in SQL and "
+    "automated analytics reporting for the sustainability programme"
+)
+
+REQUEST = {
+    "document_type": "cover_letter",
+    "employer_name": "Acme Energy",
+    "job_title": "Graduate Data Engineer",
+    "job_description": (
+        "Join our data platform team building streaming pipelines with Python, Spark and Kafka. "
+        "You will model data in SQL, automate analytics and support our sustainability goals."
+    ),
+    "use_all_experiences": True,
+}
+EMPLOYER = {"values": ["sustainability", "integrity"], "keywords": ["data engineering", "kafka", "cloud"]}
+
+def synthetic_profile(size: int, rng: random.Random) -> tuple:
+    """Profile rows by section, `size` in all, roughly 5% of them relevant to REQUEST"""
+    profile = {"experiences": [], "educations": [], "achievements": []}
+    relevant = set()
+    for i in range(size):
+        description = " ".join(rng.choices(FILLER, k=rng.randint(25, 60)))
+        if rng.random() < 0.05:
+            description += ". " + RELEVANT
+            relevant.add(f"item{i}")
+        kind = rng.choices(["experiences", "educations", "achievements"], weights=[6, 1, 3])[0]
+        start = datetime(2000 + rng.randint(0, 23), rng.randint(1, 12), 1)
+        if kind == "experiences":
+            row = {"company_name": f"Company {i}", "job_title": "Assistant", "start_date": start,
+                   "end_date": None, "is_current": False, "location": "Sydney"}
+        elif kind == "educations":
+            row = {"institution": f"Institute {i}", "degree": "Certificate", "field_of_study": "Business",
+                   "start_date": start, "end_date": None, "is_current": False, "location": None}
+        else:
+            row = {"title": f"Award {i}", "date": start}
+        profile[kind].append({"id": f"item{i}", "created_at": start, **row, "description": description})
+    return profile, relevant
+
+def snapshot_items(profile: dict) -> list:
+    return [snapshot_item(key, row) for key, rows in profile.items() for row in rows]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="20,100,500,2000")
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    weights = query_weights(REQUEST, EMPLOYER)
+    print(f"{'items':>6} {'all tokens':>11} {'packed':>7} {'saved':>6} {'format ms':>10} {'select ms':>10} {'relevant kept':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        profile, relevant = synthetic_profile(size, rng)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            items = snapshot_items(profile)
+        format_ms = (time.perf_counter() - start) * 1000 / args.repeat
+        full_tokens = estimate_tokens(build_prompt(REQUEST, items))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            packed, report = select_context(items, weights, args.budget)
+        select_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+        packed_tokens = estimate_tokens(build_prompt(REQUEST, packed))
+        kept = relevant & {item["id"] for item in report["items"]}
+        print(
+            f"{size:>6} {full_tokens:>11} {packed_tokens:>7} {1 - packed_tokens / full_tokens:>6.0%} "
+            f"{format_ms:>10.2f} {select_ms:>10.2f} {len(kept):>6}/{len(relevant):<7}"
+        )
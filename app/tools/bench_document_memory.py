@@ -0,0 +1,74 @@
+"""
+Compare memory and time of listing one user's documents with content loaded
+eagerly against the deferred-content and summary-projection paths.
+
+Usage: python -m app.tools.bench_document_memory [--documents 500] [--content-kb 20]
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, undefer
+
+from app.api.v1.pagination import PageParams, keyset_page, schema_fields
+from app.migrations import migrate
+from app.models import User, Document
+from app.schemas import DocumentResponse, DocumentSummary
+from app.auth import generate_uuid
+
+def seed(engine, documents: int, content_kb: int) -> str:
+    user_id = generate_uuid()
+    content = ("Lorem ipsum dolor sit amet. " * 40)[:1024] * content_kb
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": user_id, "email": "bench@example.com", "first_name": "Bench", "last_name": "User"}])
+        connection.execute(insert(Document), [
+            {"id": generate_uuid(), "user_id": user_id, "title": f"CV {i}", "content": content, "document_type": "cv"}
+            for i in range(documents)
+        ])
+    return user_id
+
+def eager_list(db: Session, user_id: str) -> bytes:
+    """The old list path: full ORM rows with content, serialized with content"""
+    documents = db.query(Document).options(undefer(Document.content)).filter(Document.user_id == user_id).all()
+    return json.dumps(jsonable_encoder([DocumentResponse.model_validate(d, from_attributes=True) for d in documents])).encode()
+
+def deferred_list(db: Session, user_id: str) -> bytes:
+    """ORM rows with content deferred, serialized as summaries"""
+    documents = db.query(Document).filter(Document.user_id == user_id).all()
+    return json.dumps(jsonable_encoder([DocumentSummary.model_validate(d, from_attributes=True) for d in documents])).encode()
+
+def summary_page(db: Session, user_id: str) -> bytes:
+    """What GET /documents does now: a column projection of the summary fields"""
+    page = PageParams(limit=100000, cursor=None, fields=None)
+    documents, _ = keyset_page(db, Document, Document.user_id == user_id, page=page, fields=schema_fields(DocumentSummary))
+    return json.dumps(jsonable_encoder(documents)).encode()
+
+def measure(engine, fn, user_id: str) -> dict:
+    gc.collect()
+    with Session(engine) as db:
+        tracemalloc.start()
+        start = time.perf_counter()
+        body = fn(db, user_id)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"peak_kb": peak // 1024, "ms": round(elapsed * 1000, 1), "response_kb": len(body) // 1024}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--content-kb", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    migrate(engine)
+    user_id = seed(engine, args.documents, args.content_kb)
+
+    for name, fn in (("eager", eager_list), ("deferred", deferred_list), ("summary", summary_page)):
+        print(name, measure(engine, fn, user_id))
@@ -0,0 +1,86 @@
+"""
+Time employer full-text search against a LIKE scan on a seeded SQLite
+catalogue.
+
+Usage: python -m app.tools.bench_employer_search [--employers 50000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.migrations import migrate
+from app.models import Employer
+from app.employers.search import search_employers
+from app.auth import generate_uuid
+
+# A handful of very common terms plus a long tail, roughly like real copy
+COMMON = (
+    "analytics banking cloud consulting data design energy engineering finance "
+    "government health infrastructure innovation insurance integrity law logistics "
+    "marketing mining retail research security software sustainability teamwork "
+    "technology telecommunications transport diversity inclusion customer service"
+).split()
+WORDS = COMMON + [f"term{i}" for i in range(20000)]
+
+BATCH_SIZE = 5000
+
+def seed(engine, count: int) -> None:
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(0, count, BATCH_SIZE):
+            rows = []
+            for i in range(start, min(start + BATCH_SIZE, count)):
+                rows.append({
+                    "id": generate_uuid(),
+                    "name": f"{rng.choice(COMMON).title()} {rng.choice(WORDS).title()} {i}",
+                    "industry": rng.choice(COMMON).title(),
+                    "description": " ".join(rng.choices(COMMON, k=10) + rng.choices(WORDS, k=30)),
+                    "values": rng.sample(COMMON, 3),
+                    "keywords": rng.sample(WORDS, 5),
+                })
+            connection.execute(insert(Employer), rows)
+            connection.execute(
+                text(
+                    "INSERT INTO employers_fts (employer_id, name, industry, description, employer_values, keywords) "
+                    "VALUES (:id, :name, :industry, :description, :values, :keywords)"
+                ),
+                [{**row, "values": " ".join(row["values"]), "keywords": " ".join(row["keywords"])} for row in rows],
+            )
+
+def like_search(db: Session, q: str, limit: int) -> list:
+    """What clients effectively did before: substring matching with no index"""
+    pattern = f"%{q}%"
+    return db.execute(
+        select(Employer.__table__)
+        .where(or_(Employer.name.ilike(pattern), Employer.description.ilike(pattern)))
+        .limit(limit)
+    ).all()
+
+def time_it(fn, queries: list) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return round((time.perf_counter() - start) * 1000 / len(queries), 3)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--employers", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    migrate(engine)
+    start = time.perf_counter()
+    seed(engine, args.employers)
+    print(f"Seeded {args.employers} employers in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(7)
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    with Session(engine) as db:
+        print(f"fts ms/query:  {time_it(lambda q: search_employers(db, q, limit=20, offset=0), queries)}")
+        print(f"like ms/query: {time_it(lambda q: like_search(db, q.split()[0], limit=20), queries)}")
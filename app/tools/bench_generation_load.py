@@ -0,0 +1,181 @@
+"""
+Load-test the generation client offline.
+
+--target fake drives LLMClient with the in-process fake provider, showing
+how the concurrency limits, retries and circuit breaker behave under load
+and injected failures. --target http runs the Anthropic provider against a
+local imitation of the Messages API, and compares the shared keep-alive
+client with opening a new client for every call.
+
+Usage: python -m app.tools.bench_generation_load [--target fake|http] [--requests 500] [--concurrency 100] [--users 20] [--failure-rate 0.05]
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+
+import httpx
+
+from app.ai_generation.llm import LLMClient
+from app.ai_generation.providers import AnthropicProvider, FakeProvider, HttpClients, ProviderError
+from app.ai_generation.resilience import CircuitBreaker
+
+class CountingProvider:
+    """Wraps a provider to record the peak number of calls in flight"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.identity = provider.identity
+        self.in_flight = 0
+        self.peak = 0
+
+    async def stream(self, prompt: str, max_tokens: int):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            async for text in self.provider.stream(prompt, max_tokens):
+                yield text
+        finally:
+            self.in_flight -= 1
+
+class ClientPerCallProvider(AnthropicProvider):
+    """The naive alternative: a fresh HTTP client, and connection, per call"""
+
+    async def stream(self, prompt: str, max_tokens: int):
+        async with httpx.AsyncClient(**self.http.options) as client:
+            async for text in self.stream_with(client, prompt, max_tokens):
+                yield text
+
+def start_fake_api(args) -> tuple:
+    """Serve a minimal streaming Messages API on a free port; returns (base URL, connection counter)"""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import Response, StreamingResponse
+    from starlette.routing import Route
+
+    connections = set()
+    rng = random.Random(args.seed)
+
+    async def messages(request):
+        connections.add(tuple(request.scope["client"]))
+        body = await request.json()
+        if rng.random() < args.failure_rate:
+            await asyncio.sleep(args.first_token_delay)
+            return Response('{"type":"error","error":{"type":"overloaded_error"}}', status_code=529)
+
+        async def events():
+            await asyncio.sleep(args.first_token_delay)
+            for i in range(min(args.words, body["max_tokens"])):
+                delta = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": f"word{i} "}}
+                yield f"event: content_block_delta\ndata: {json.dumps(delta)}\n\n"
+                if args.token_delay:
+                    await asyncio.sleep(args.token_delay)
+            yield 'event: message_stop\ndata: {"type":"message_stop"}\n\n'
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    with closing(socket.socket()) as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    app = Starlette(routes=[Route("/v1/messages", messages, methods=["POST"])])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", connections
+
+def build_client(args, provider) -> LLMClient:
+    http = provider.http if isinstance(provider, AnthropicProvider) else HttpClients()
+    return LLMClient(
+        provider=CountingProvider(provider),
+        http=http,
+        max_concurrency=args.max_concurrency,
+        per_user_concurrency=args.per_user,
+        max_attempts=args.attempts,
+        backoff_base=0.05,
+        backoff_max=1.0,
+        budget_seconds=args.budget,
+        breaker=CircuitBreaker(failure_threshold=args.circuit_threshold, reset_seconds=1.0),
+    )
+
+async def run_load(client: LLMClient, args) -> dict:
+    latencies = []
+    errors = Counter()
+    callers = asyncio.Semaphore(args.concurrency)
+
+    async def call(i: int) -> None:
+        async with callers:
+            start = time.perf_counter()
+            try:
+                await client.complete(f"Write a CV for applicant {i % 50}", 256, user_id=f"user{i % args.users}")
+            except ProviderError as e:
+                errors[type(e).__name__] += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    stats = client.stats()
+    return {
+        "ok": len(latencies),
+        "errors": dict(errors),
+        "throughput_per_s": round(args.requests / elapsed, 1),
+        "latency_ms": {
+            "p50": round(quantiles[49] * 1000, 1) if latencies else None,
+            "p95": round(quantiles[94] * 1000, 1) if latencies else None,
+            "p99": round(quantiles[98] * 1000, 1) if latencies else None,
+        },
+        "peak_in_flight": client.provider.peak,
+        "retries": stats["retries"],
+        "circuit_opened": stats["circuit"]["opened"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", choices=["fake", "http"], default="fake")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100, help="callers issuing requests at once")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--max-concurrency", type=int, default=16, help="AI_MAX_CONCURRENCY")
+    parser.add_argument("--per-user", type=int, default=2, help="AI_MAX_CONCURRENCY_PER_USER")
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=60.0)
+    parser.add_argument("--circuit-threshold", type=int, default=5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--words", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.target == "fake":
+        provider = FakeProvider(
+            token_delay=args.token_delay,
+            response_words=args.words,
+            first_token_delay=args.first_token_delay,
+            failure_rate=args.failure_rate,
+            seed=args.seed,
+        )
+        print(json.dumps(asyncio.run(run_load(build_client(args, provider), args)), indent=2))
+    else:
+        base_url, connections = start_fake_api(args)
+        for label, provider_class in (("shared client", AnthropicProvider), ("client per call", ClientPerCallProvider)):
+            connections.clear()
+            http = HttpClients(
+                timeout=httpx.Timeout(30, connect=5),
+                limits=httpx.Limits(max_connections=args.max_concurrency, max_keepalive_connections=args.max_concurrency),
+            )
+            provider = provider_class(api_key="bench", model="bench", http=http, base_url=base_url)
+            result = asyncio.run(run_load(build_client(args, provider), args))
+            result["connections_opened"] = len(connections)
+            print(label, json.dumps(result, indent=2))
@@ -0,0 +1,103 @@
+"""
+Measure the per-user list queries with and without the (user_id, created_at)
+indexes on a seeded SQLite database.
+
+Usage: python -m app.tools.bench_list_queries [--users 100000] [--per-user 3] [--queries 200]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from app.migrations import migrate
+from app.migrations.versions.m0002_user_created_at_indexes import TABLES
+from app.models import User, Experience, Education, Achievement, Document
+from app.auth import generate_uuid
+
+BATCH_SIZE = 10000
+
+def seed(engine, users: int, per_user: int) -> list:
+    """Insert users plus `per_user` rows in each owned table, in executemany batches"""
+    user_ids = []
+    base = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for start in range(0, users, BATCH_SIZE):
+            batch = [generate_uuid() for _ in range(min(BATCH_SIZE, users - start))]
+            user_ids.extend(batch)
+            connection.execute(insert(User), [
+                {"id": user_id, "email": f"{user_id}@example.com", "first_name": "Bench", "last_name": "User"}
+                for user_id in batch
+            ])
+            rows = [(user_id, base + timedelta(minutes=start + i)) for user_id in batch for i in range(per_user)]
+            connection.execute(insert(Experience), [
+                {"id": generate_uuid(), "user_id": u, "company_name": "Company", "job_title": "Engineer",
+                 "start_date": base, "created_at": created} for u, created in rows
+            ])
+            connection.execute(insert(Education), [
+                {"id": generate_uuid(), "user_id": u, "institution": "University", "degree": "BSc",
+                 "field_of_study": "Computing", "start_date": base, "created_at": created} for u, created in rows
+            ])
+            connection.execute(insert(Achievement), [
+                {"id": generate_uuid(), "user_id": u, "title": "Award", "description": "Won",
+                 "created_at": created} for u, created in rows
+            ])
+            connection.execute(insert(Document), [
+                {"id": generate_uuid(), "user_id": u, "title": "CV", "content": "Lorem ipsum " * 20,
+                 "document_type": "cv", "created_at": created} for u, created in rows
+            ])
+    return user_ids
+
+def time_queries(engine, user_ids: list, queries: int) -> dict:
+    """Average milliseconds per list query, using the same ORM queries as the endpoints"""
+    sample = random.sample(user_ids, min(queries, len(user_ids)))
+    results = {}
+    with Session(engine) as db:
+        for model in (Experience, Education, Achievement, Document):
+            start = time.perf_counter()
+            for user_id in sample:
+                (
+                    db.query(model)
+                    .filter(model.user_id == user_id)
+                    .order_by(model.created_at.desc(), model.id.desc())
+                    .all()
+                )
+            results[model.__tablename__] = round((time.perf_counter() - start) * 1000 / len(sample), 3)
+    return results
+
+def query_plan(engine, table: str) -> str:
+    with engine.connect() as connection:
+        rows = connection.execute(text(
+            f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE user_id = 'x' "
+            "ORDER BY created_at DESC, id DESC"
+        )).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--per-user", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine)
+
+    start = time.perf_counter()
+    user_ids = seed(engine, args.users, args.per_user)
+    print(f"Seeded {args.users} users in {time.perf_counter() - start:.1f}s")
+
+    print(f"indexed plan:  {query_plan(engine, 'experiences')}")
+    print(f"indexed ms/query:  {time_queries(engine, user_ids, args.queries)}")
+
+    with engine.begin() as connection:
+        for table in TABLES:
+            connection.execute(text(f"DROP INDEX ix_{table}_user_id_created_at"))
+    engine.dispose()
+    print(f"scan plan:     {query_plan(engine, 'experiences')}")
+    print(f"scan ms/query:     {time_queries(engine, user_ids, args.queries)}")
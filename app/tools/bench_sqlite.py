@@ -0,0 +1,115 @@
+"""
+Compare the default SQLite setup with the tuned engine profile under
+concurrent writes.
+
+Usage: python -m app.tools.bench_sqlite [--threads 16] [--ops 200]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app.database import (
+    Base,
+    apply_sqlite_profile,
+    create_session_factory,
+    create_sqlite_writer,
+    get_engine_options,
+)
+from app.models import User, Experience, Document
+from app.auth import generate_uuid
+
+def build_session_factory(url: str, profile: str):
+    if profile == "default":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        return create_session_factory(engine), [engine]
+    engine = create_engine(url, **get_engine_options(url))
+    apply_sqlite_profile(engine)
+    writer = create_sqlite_writer(url)
+    return create_session_factory(engine, writer), [engine, writer]
+
+def worker(session_factory, user_id: str, document_id: str, ops: int, results: dict, lock):
+    ok = locked = 0
+    for i in range(ops):
+        db = session_factory()
+        try:
+            # Mirrors create_experience followed by update_document
+            db.add(Experience(
+                id=generate_uuid(),
+                user_id=user_id,
+                company_name=f"Company {i}",
+                job_title="Engineer",
+                start_date=datetime(2020, 1, 1),
+            ))
+            db.commit()
+            document = db.query(Document).filter(Document.id == document_id).first()
+            document.content = f"revision {i}"
+            db.commit()
+            # And a dashboard read
+            db.query(Experience).filter(Experience.user_id == user_id).count()
+            ok += 1
+        except OperationalError as e:
+            db.rollback()
+            if "locked" not in str(e):
+                raise
+            locked += 1
+        finally:
+            db.close()
+    with lock:
+        results["ok"] += ok
+        results["locked"] += locked
+
+def run(profile: str, threads: int, ops: int) -> dict:
+    directory = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    session_factory, engines = build_session_factory(url, profile)
+    Base.metadata.create_all(bind=engines[0])
+
+    db = session_factory()
+    user_ids, document_ids = [], []
+    for _ in range(threads):
+        user = User(id=generate_uuid(), email=f"{generate_uuid()}@example.com", first_name="Bench", last_name="User")
+        document = Document(id=generate_uuid(), user_id=user.id, title="CV", content="", document_type="cv")
+        db.add_all([user, document])
+        user_ids.append(user.id)
+        document_ids.append(document.id)
+    db.commit()
+    db.close()
+
+    results = {"ok": 0, "locked": 0}
+    lock = threading.Lock()
+    pool = [
+        threading.Thread(target=worker, args=(session_factory, user_ids[i], document_ids[i], ops, results, lock))
+        for i in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    for engine in engines:
+        engine.dispose()
+    results["seconds"] = round(elapsed, 2)
+    results["ops_per_second"] = round(results["ok"] / elapsed, 1)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    # Queued writers are expected here, so keep slow-checkout warnings quiet
+    logging.getLogger("app.database").setLevel(logging.ERROR)
+
+    for profile in ("default", "tuned"):
+        result = run(profile, args.threads, args.ops)
+        print(f"{profile:>8}: {result}")
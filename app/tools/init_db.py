@@ -1,14 +1,15 @@
-from app.database import Base, engine
-from app.models import User, Experience, Education, Achievement, Document, Employer
+from app.database import engine
+from app.migrations import migrate
+from app.models import User, Experience, Education, Achievement, Document
+from app.scraper.store import save_scraped_employer
 from app.auth import get_password_hash, generate_uuid
 from datetime import datetime, timedelta
 
 def init_db():
     """
-    Initialize the database with tables and sample data for testing.
+    Initialize the database by applying all schema migrations.
     """
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    migrate(engine)
     
     print("Database tables created!")
 
@@ -100,34 +101,31 @@ def create_sample_data(db_session):
     )
     db_session.add(document)
     
-    # Create sample employers
-    employer1_id = generate_uuid()
-    employer1 = Employer(
-        id=employer1_id,
-        name="Google Australia",
-        website="https://www.google.com.au",
-        industry="Technology",
-        description="Google is a multinational technology company.",
-        values=["innovation", "diversity", "inclusion"],
-        keywords=["technology", "search", "ads", "software"]
-    )
-    db_session.add(employer1)
-    
-    employer2_id = generate_uuid()
-    employer2 = Employer(
-        id=employer2_id,
-        name="Commonwealth Bank",
-        website="https://www.commbank.com.au",
-        industry="Banking & Finance",
-        description="Commonwealth Bank is one of Australia's leading financial institutions.",
-        values=["integrity", "accountability", "service"],
-        keywords=["banking", "finance", "technology", "customer service"]
-    )
-    db_session.add(employer2)
-    
     # Commit all changes
     db_session.commit()
     
+    # Create sample employers through the scraper store, so they are indexed
+    # for search and tags and cached employer lists are invalidated
+    save_scraped_employer(db_session, {
+        "id": generate_uuid(),
+        "name": "Google Australia",
+        "website": "https://www.google.com.au",
+        "industry": "Technology",
+        "description": "Google is a multinational technology company.",
+        "values": ["innovation", "diversity", "inclusion"],
+        "keywords": ["technology", "search", "ads", "software"]
+    })
+    
+    save_scraped_employer(db_session, {
+        "id": generate_uuid(),
+        "name": "Commonwealth Bank",
+        "website": "https://www.commbank.com.au",
+        "industry": "Banking & Finance",
+        "description": "Commonwealth Bank is one of Australia's leading financial institutions.",
+        "values": ["integrity", "accountability", "service"],
+        "keywords": ["banking", "finance", "technology", "customer service"]
+    })
+    
     print("Sample data created!")
     print(f"Sample user: email=test@example.com, password=password123")
 
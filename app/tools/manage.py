@@ -0,0 +1,98 @@
+"""
+Management commands for the CV Tailor backend.
+
+Usage:
+    python -m app.tools.manage migrate [--to VERSION]
+    python -m app.tools.manage seed
+    python -m app.tools.manage check
+    python -m app.tools.manage backfill-tags [--batch-size N]
+    python -m app.tools.manage backfill-profile-snapshots [--batch-size N]
+"""
+import argparse
+import sys
+
+from app.database import engine, SessionLocal
+from app.migrations import SchemaOutOfDate, migrate, verify_schema, head_version
+from app.tools.init_db import create_sample_data
+from app.employers.tags import backfill_employer_tags
+from app.experiences.snapshot import backfill_profile_snapshots
+
+def cmd_migrate(args) -> int:
+    applied = migrate(engine, target=args.to)
+    if applied:
+        print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    else:
+        print("Database schema is up to date")
+    return 0
+
+def cmd_seed(args) -> int:
+    verify_schema(engine)
+    db = SessionLocal()
+    try:
+        create_sample_data(db)
+    finally:
+        db.close()
+    return 0
+
+def cmd_check(args) -> int:
+    try:
+        version = verify_schema(engine)
+    except SchemaOutOfDate as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"Database schema is at version {version} (head {head_version()})")
+    return 0
+
+def cmd_backfill_tags(args) -> int:
+    verify_schema(engine)
+    db = SessionLocal()
+    try:
+        total = 0
+        for total in backfill_employer_tags(db, batch_size=args.batch_size):
+            print(f"Indexed tags for {total} employers", end="\r", flush=True)
+        print(f"Indexed tags for {total} employers")
+    finally:
+        db.close()
+    return 0
+
+def cmd_backfill_profile_snapshots(args) -> int:
+    verify_schema(engine)
+    db = SessionLocal()
+    try:
+        total = 0
+        for total in backfill_profile_snapshots(db, batch_size=args.batch_size):
+            print(f"Checked profile snapshots of {total} users", end="\r", flush=True)
+        print(f"Checked profile snapshots of {total} users")
+    finally:
+        db.close()
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.manage")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subcommands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.add_argument("--to", type=int, default=None, help="Stop at this version")
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    seed_parser = subcommands.add_parser("seed", help="Create sample data for testing")
+    seed_parser.set_defaults(func=cmd_seed)
+
+    check_parser = subcommands.add_parser("check", help="Exit non-zero if migrations are pending")
+    check_parser.set_defaults(func=cmd_check)
+
+    backfill_parser = subcommands.add_parser("backfill-tags", help="Copy employer values and keywords into the tag index")
+    backfill_parser.add_argument("--batch-size", type=int, default=500, help="Employers per committed batch")
+    backfill_parser.set_defaults(func=cmd_backfill_tags)
+
+    snapshots_parser = subcommands.add_parser(
+        "backfill-profile-snapshots", help="Build profile snapshots for users without a current one"
+    )
+    snapshots_parser.add_argument("--batch-size", type=int, default=500, help="Users per committed batch")
+    snapshots_parser.set_defaults(func=cmd_backfill_profile_snapshots)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
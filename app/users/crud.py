@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.models import User
+from app.crud import insert_returning, update_returning
+
+# Sync-style helpers, run through app.database.run_db from async endpoints
+def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
+    """Get a user by primary key"""
+    return db.query(User).filter(User.id == user_id).first()
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    """Get a user by email address"""
+    return db.query(User).filter(User.email == email).first()
+
+def create_user(db: Session, data: dict) -> dict:
+    """Insert a user with a single INSERT ... RETURNING"""
+    return insert_returning(db, User, data)
+
+def update_user(db: Session, user_id: str, data: dict) -> Optional[dict]:
+    """
+    Update a user with a single UPDATE ... RETURNING. Core updates skip the
+    ORM events, so callers must invalidate the principal cache themselves.
+    """
+    return update_returning(db, User, data, User.id == user_id)
@@ -0,0 +1,87 @@
+"""
+Shared fixtures.
+
+The app reads its settings when first imported, so the environment is
+pointed at a throwaway SQLite database and blob store before anything from
+`app` is imported.
+"""
+import os
+import re
+import tempfile
+import uuid
+
+_workdir = tempfile.mkdtemp(prefix="cv-tailor-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["DATABASE_ASYNC"] = "False"
+os.environ["STORAGE_TYPE"] = "local"
+os.environ["STORAGE_LOCAL_ROOT"] = os.path.join(_workdir, "storage")
+os.environ["GENERATION_CACHE_DIR"] = ""
+os.environ["AI_PROVIDER"] = "fake"
+os.environ["AI_FAKE_TOKEN_DELAY_SECONDS"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DML_PATTERN = re.compile(r'^\s*(INSERT|UPDATE|DELETE)\b(?:\s+OR\s+\w+)?(?:\s+INTO|\s+FROM)?\s+"?(\w+)"?', re.IGNORECASE)
+
+class StatementLog:
+    """SQL statements sent to any engine while recording"""
+
+    def __init__(self):
+        self.statements = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @staticmethod
+    def dml_of(statement: str):
+        """(verb, table) of an INSERT, UPDATE or DELETE, else None"""
+        match = DML_PATTERN.match(statement)
+        return (match.group(1).upper(), match.group(2)) if match else None
+
+    def dml(self) -> list:
+        """(verb, table) of each INSERT, UPDATE and DELETE, in order"""
+        return [write for write in map(self.dml_of, self.statements) if write]
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+@pytest.fixture(scope="session")
+def app():
+    from app.tools.manage import main
+    main(["migrate"])
+    from app.main import app
+    return app
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+def register(client, email: str) -> dict:
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "first_name": "Test", "last_name": "User", "password": "password"},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def auth_headers(client) -> dict:
+    """Bearer headers for a freshly registered user"""
+    email = f"{uuid.uuid4().hex}@example.com"
+    register(client, email)
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": "password"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def statements():
+    log = StatementLog()
+    event.listen(Engine, "before_cursor_execute", log.record)
+    try:
+        yield log
+    finally:
+        event.remove(Engine, "before_cursor_execute", log.record)
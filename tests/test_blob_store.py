@@ -0,0 +1,182 @@
+"""
+Contract suite for the blob store backends. Every test runs against
+LocalBlobStore and against S3BlobStore on a real boto3 client whose calls
+are answered by an in-memory bucket.
+"""
+import hashlib
+import io
+import os
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.response import StreamingBody
+
+from app.storage.base import CHUNK_SIZE, BlobNotFound
+from app.storage.compression import GZIP_MAGIC, ZSTD_MAGIC
+from app.storage.local import LocalBlobStore
+from app.storage.s3 import S3BlobStore
+
+BUCKET = "blobs-test"
+
+class InMemoryS3:
+    """
+    Answers S3 object calls from a dict, through the same before-call hook
+    botocore's Stubber uses, but keeping state so the suite can run
+    unchanged. Requests are still validated and serialized by botocore, and
+    uploads go through s3transfer.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        self.client.meta.events.register("before-parameter-build.s3.*", self._capture)
+        self.client.meta.events.register("before-call.s3.*", self._respond)
+
+    @staticmethod
+    def _capture(params, context, **kwargs):
+        context["api_params"] = dict(params)
+
+    @staticmethod
+    def _response(status: int, parsed: dict):
+        parsed["ResponseMetadata"] = {"HTTPStatusCode": status}
+        return AWSResponse(f"https://{BUCKET}.s3.amazonaws.com", status, {}, None), parsed
+
+    def _missing(self, code: str):
+        return self._response(404, {"Error": {"Code": code, "Message": "Not Found"}})
+
+    def _respond(self, model, context, **kwargs):
+        params = context["api_params"]
+        key = (params["Bucket"], params["Key"])
+        if model.name == "PutObject":
+            body = params["Body"]
+            self.objects[key] = body if isinstance(body, bytes) else body.read()
+            return self._response(200, {"ETag": '"etag"'})
+        if model.name == "HeadObject":
+            if key not in self.objects:
+                return self._missing("404")
+            return self._response(200, {"ContentLength": len(self.objects[key])})
+        if model.name == "GetObject":
+            if key not in self.objects:
+                return self._missing("NoSuchKey")
+            data = self.objects[key]
+            return self._response(200, {"Body": StreamingBody(io.BytesIO(data), len(data))})
+        if model.name == "DeleteObject":
+            self.objects.pop(key, None)
+            return self._response(204, {})
+        raise AssertionError(f"Unexpected S3 call {model.name}")
+
+class LocalBackend:
+    def __init__(self, root: str):
+        self.root = root
+
+    def store(self, compression: str = "gzip"):
+        return LocalBlobStore(self.root, compression=compression)
+
+    def stored_objects(self) -> list:
+        return [
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(self.root)
+            for name in names
+        ]
+
+    def raw(self, key: str) -> bytes:
+        with open(os.path.join(self.root, *LocalBlobStore.path(key).split("/")), "rb") as f:
+            return f.read()
+
+class S3Backend:
+    def __init__(self):
+        self.s3 = InMemoryS3()
+
+    def store(self, compression: str = "gzip"):
+        return S3BlobStore(BUCKET, prefix="blobs", compression=compression, client=self.s3.client)
+
+    def stored_objects(self) -> list:
+        return list(self.s3.objects)
+
+    def raw(self, key: str) -> bytes:
+        return self.s3.objects[(BUCKET, "blobs/" + S3BlobStore.path(key))]
+
+@pytest.fixture(params=["local", "s3"])
+def backend(request, tmp_path):
+    return LocalBackend(str(tmp_path)) if request.param == "local" else S3Backend()
+
+@pytest.fixture(params=["gzip", "zstd"])
+def codec(request):
+    if request.param == "zstd":
+        pytest.importorskip("zstandard")
+    return request.param
+
+def test_put_get_round_trip(backend):
+    store = backend.store()
+    data = b"Curriculum vitae\n" * 100
+
+    info = store.put(data)
+
+    assert info.key == hashlib.sha256(data).hexdigest()
+    assert info.size == len(data)
+    assert info.created
+    assert 0 < info.stored_size < len(data)
+    assert store.get(info.key) == data
+
+def test_identical_content_is_stored_once(backend):
+    store = backend.store()
+
+    first = store.put(b"same bytes")
+    second = store.put_stream([b"same ", b"bytes"])
+
+    assert first.key == second.key
+    assert first.created and not second.created
+    assert len(backend.stored_objects()) == 1
+
+def test_codecs_round_trip_and_are_detected_on_read(backend, codec):
+    store = backend.store(codec)
+    data = os.urandom(1000) + b"x" * 5000
+
+    info = store.put(data)
+
+    magic = ZSTD_MAGIC if codec == "zstd" else GZIP_MAGIC
+    assert backend.raw(info.key).startswith(magic)
+    assert store.get(info.key) == data
+    # Readers detect the codec, so a store configured otherwise still reads it
+    assert backend.store("gzip").get(info.key) == data
+
+def test_open_streams_large_blobs_in_chunks(backend):
+    store = backend.store()
+    data = os.urandom(3 * CHUNK_SIZE)
+    info = store.put_stream(data[i:i + CHUNK_SIZE // 2] for i in range(0, len(data), CHUNK_SIZE // 2))
+
+    chunks = list(store.open(info.key))
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == data
+
+def test_missing_key(backend):
+    store = backend.store()
+    key = hashlib.sha256(b"never stored").hexdigest()
+
+    assert not store.exists(key)
+    # open raises before the first chunk is requested
+    with pytest.raises(BlobNotFound):
+        store.open(key)
+    with pytest.raises(BlobNotFound):
+        store.get(key)
+
+def test_exists_and_delete(backend):
+    store = backend.store()
+    info = store.put(b"short lived")
+    assert store.exists(info.key)
+
+    store.delete(info.key)
+
+    assert not store.exists(info.key)
+    assert backend.stored_objects() == []
+    # Deleting again is a no-op
+    store.delete(info.key)
+
+def test_invalid_keys_are_rejected(backend):
+    store = backend.store()
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
@@ -0,0 +1,114 @@
+"""
+Round-trip counts of the create, update and delete endpoints.
+
+Each write must reach its table as exactly one INSERT/UPDATE/DELETE (with
+RETURNING), with no refresh SELECT or lookup before delete. Writes that
+maintain a companion table in the same transaction (profile snapshots,
+document revisions) may add one statement there, and nothing else.
+"""
+import uuid
+
+import pytest
+
+from tests.conftest import register
+
+PROFILE_SECTIONS = [
+    (
+        "experiences",
+        {"company_name": "Acme", "job_title": "Engineer", "start_date": "2020-01-01T00:00:00"},
+        {"job_title": "Senior Engineer"},
+    ),
+    (
+        "educations",
+        {"institution": "Uni", "degree": "BSc", "field_of_study": "CS", "start_date": "2015-01-01T00:00:00"},
+        {"degree": "MSc"},
+    ),
+    (
+        "achievements",
+        {"title": "Award", "description": "Won it"},
+        {"title": "Bigger award"},
+    ),
+]
+
+def assert_single_write(statements, verb: str, table: str, companions=()) -> None:
+    writes = statements.dml()
+    assert [write for write in writes if write[1] == table] == [(verb, table)], writes
+    others = [write[1] for write in writes if write[1] != table]
+    assert len(others) == len(set(others)) and set(others) <= set(companions), writes
+    # RETURNING already produced the row; nothing reads it back
+    written = next(i for i, statement in enumerate(statements.statements) if statements.dml_of(statement) == (verb, table))
+    rereads = [
+        statement for statement in statements.statements[written + 1:]
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {table}" in statement
+    ]
+    assert not rereads, rereads
+
+@pytest.mark.parametrize("section, create, update", PROFILE_SECTIONS, ids=[s[0] for s in PROFILE_SECTIONS])
+def test_profile_item_writes_are_single_statements(client, auth_headers, statements, section, create, update):
+    path = f"/api/v1/profile/{section}"
+    # The user's first profile write builds their snapshot from every table; measure later ones
+    assert client.post(path, headers=auth_headers, json=create).status_code == 200
+
+    statements.clear()
+    response = client.post(path, headers=auth_headers, json=create)
+    assert response.status_code == 200, response.text
+    item_id = response.json()["id"]
+    assert_single_write(statements, "INSERT", section, companions=["profile_snapshots"])
+
+    statements.clear()
+    response = client.put(f"{path}/{item_id}", headers=auth_headers, json=update)
+    assert response.status_code == 200, response.text
+    assert_single_write(statements, "UPDATE", section, companions=["profile_snapshots"])
+
+    statements.clear()
+    response = client.delete(f"{path}/{item_id}", headers=auth_headers)
+    assert response.status_code == 204
+    assert_single_write(statements, "DELETE", section, companions=["profile_snapshots"])
+
+def test_document_writes_are_single_statements(client, auth_headers, statements):
+    statements.clear()
+    response = client.post(
+        "/api/v1/documents/", headers=auth_headers,
+        json={"title": "CV", "content": "First draft", "document_type": "cv"},
+    )
+    assert response.status_code == 200, response.text
+    document_id = response.json()["id"]
+    assert_single_write(statements, "INSERT", "documents", companions=["document_revisions"])
+
+    statements.clear()
+    response = client.put(f"/api/v1/documents/{document_id}", headers=auth_headers, json={"title": "Renamed"})
+    assert response.status_code == 200, response.text
+    assert_single_write(statements, "UPDATE", "documents")
+
+    statements.clear()
+    response = client.put(f"/api/v1/documents/{document_id}", headers=auth_headers, json={"content": "Second draft"})
+    assert response.status_code == 200, response.text
+    assert_single_write(statements, "UPDATE", "documents", companions=["document_revisions"])
+
+    statements.clear()
+    response = client.delete(f"/api/v1/documents/{document_id}", headers=auth_headers)
+    assert response.status_code == 204
+    assert_single_write(statements, "DELETE", "documents", companions=["document_revisions"])
+
+def test_user_writes_are_single_statements(client, statements):
+    # There is no endpoint deleting users, so only create and update are covered
+    email = f"{uuid.uuid4().hex}@example.com"
+    statements.clear()
+    register(client, email)
+    assert_single_write(statements, "INSERT", "users")
+
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    statements.clear()
+    response = client.put("/api/v1/users/me", headers=headers, json={"first_name": "Renamed"})
+    assert response.status_code == 200, response.text
+    assert response.json()["first_name"] == "Renamed"
+    assert_single_write(statements, "UPDATE", "users")
+
+def test_missing_rows_are_not_looked_up_before_writing(client, auth_headers, statements):
+    statements.clear()
+    response = client.delete(f"/api/v1/profile/experiences/{uuid.uuid4()}", headers=auth_headers)
+    assert response.status_code == 404
+    assert statements.dml() == [("DELETE", "experiences")]
+    reads = [s for s in statements.statements if s.lstrip().upper().startswith("SELECT")]
+    assert not any("FROM experiences" in statement for statement in reads), reads
@@ -0,0 +1,52 @@
+"""
+Revision history under concurrent content updates: every stored revision
+must rebuild to content some update actually wrote, and the latest to the
+document's current content.
+"""
+import threading
+
+from app.api.v1.endpoints import documents
+from app.crud import update_returning
+
+ORIGINAL = "alpha beta gamma delta epsilon zeta eta theta iota kappa"
+EDITS = [
+    "alpha beta GAMMA delta epsilon zeta eta theta iota kappa",
+    "alpha beta gamma delta epsilon ZETA eta theta iota kappa",
+]
+
+def test_interleaved_updates_keep_every_revision_exact(client, auth_headers, monkeypatch):
+    response = client.post(
+        "/api/v1/documents/", headers=auth_headers,
+        json={"title": "CV", "content": ORIGINAL, "document_type": "cv"},
+    )
+    document_id = response.json()["id"]
+
+    # Both updates read the current content before either writes
+    both_read = threading.Barrier(len(EDITS))
+
+    def update_after_both_read(*args, **kwargs):
+        both_read.wait()
+        return update_returning(*args, **kwargs)
+
+    monkeypatch.setattr(documents, "update_returning", update_after_both_read)
+    statuses = []
+
+    def update(content: str) -> None:
+        response = client.put(f"/api/v1/documents/{document_id}", headers=auth_headers, json={"content": content})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=update, args=(content,)) for content in EDITS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200, 200]
+
+    current = client.get(f"/api/v1/documents/{document_id}", headers=auth_headers).json()["content"]
+    revisions = [
+        client.get(f"/api/v1/documents/{document_id}/revisions/{number}", headers=auth_headers).json()["content"]
+        for number in (1, 2, 3)
+    ]
+    assert revisions[0] == ORIGINAL
+    assert sorted(revisions[1:]) == sorted(EDITS)
+    assert revisions[2] == current
@@ -0,0 +1,42 @@
+import threading
+
+from app.ai_generation.jobs import JobLimitReached, create_job
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import GenerationJob
+
+def submit(user_id: str, barrier: threading.Barrier, outcomes: list) -> None:
+    db = SessionLocal()
+    try:
+        barrier.wait()
+        create_job(db, user_id, {"document_type": "cv"})
+        db.commit()
+        outcomes.append("queued")
+    except JobLimitReached:
+        db.rollback()
+        outcomes.append("limited")
+    finally:
+        db.close()
+
+def test_concurrent_submits_stay_under_the_active_job_cap(client, auth_headers):
+    user_id = client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+    cap = get_settings().GENERATION_MAX_ACTIVE_JOBS_PER_USER
+    submitters = cap + 4
+    barrier = threading.Barrier(submitters)
+    outcomes = []
+    threads = [
+        threading.Thread(target=submit, args=(user_id, barrier, outcomes))
+        for _ in range(submitters)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = SessionLocal()
+    try:
+        queued = db.query(GenerationJob).filter(GenerationJob.user_id == user_id).count()
+    finally:
+        db.close()
+    assert outcomes.count("queued") == queued == cap
+    assert outcomes.count("limited") == submitters - cap
@@ -0,0 +1,137 @@
+"""
+Streaming generation against a slow fake provider: text is sent as the
+provider produces it, the document is saved once and only on success, and
+a client that goes away cancels the provider call.
+"""
+import asyncio
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.ai_generation import generator
+from app.ai_generation.llm import create_llm_client
+from app.ai_generation.providers import FakeProvider, ProviderError
+from app.api.v1.endpoints.generation import _generation_events
+from app.api.v1.sse import cancel_on_disconnect
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Document
+
+REQUEST = {"document_type": "cv", "employer_name": "Acme", "job_title": "Engineer"}
+
+class TrackedProvider(FakeProvider):
+    """FakeProvider that records how far each stream got and whether it was closed"""
+
+    def __init__(self, fail_after=None, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_after = fail_after
+        self.sent = 0
+        self.finished = False
+        self.closed = False
+        self.first_token = asyncio.Event()
+
+    async def stream(self, prompt: str, max_tokens: int):
+        try:
+            async for token in super().stream(prompt, max_tokens):
+                if self.sent == self.fail_after:
+                    raise ProviderError("Provider went away", retryable=False)
+                self.sent += 1
+                self.first_token.set()
+                yield token
+            self.finished = True
+        finally:
+            self.closed = True
+
+@pytest.fixture
+def use_provider(monkeypatch):
+    def use(provider):
+        client = create_llm_client(get_settings())
+        client.provider = provider
+        monkeypatch.setattr(generator, "get_llm_client", lambda: client)
+        return provider
+    return use
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def user_id(client, headers) -> str:
+    return client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+def document_count(user_id: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Document).filter(Document.user_id == user_id).count()
+    finally:
+        db.close()
+
+def stream(client, headers):
+    return client.post("/api/v1/documents/generate/stream?cache=bypass", json=REQUEST, headers=headers)
+
+def test_tokens_stream_before_done_and_one_document_is_saved(client, auth_headers, use_provider):
+    use_provider(TrackedProvider(token_delay=0.001, response_words=20))
+    response = stream(client, auth_headers)
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == ["context"] + ["token"] * 20 + ["done"]
+    assert events[-1][1]["cached"] is False
+    assert document_count(user_id(client, auth_headers)) == 1
+
+def test_tokens_are_sent_while_the_provider_is_still_generating(client, auth_headers, use_provider):
+    provider = use_provider(TrackedProvider(token_delay=0.01, response_words=20))
+    owner = user_id(client, auth_headers)
+
+    async def first_token_state():
+        db = SessionLocal()
+        try:
+            prepared = generator.prepare_generation(db, owner, REQUEST)
+        finally:
+            db.close()
+        events = _generation_events(owner, REQUEST, prepared, None)
+        try:
+            async for event in events:
+                if event.startswith("event: token"):
+                    return provider.sent, provider.finished
+        finally:
+            await events.aclose()
+
+    sent, finished = asyncio.run(first_token_state())
+    assert sent == 1
+    assert not finished
+
+def test_provider_error_ends_the_stream_without_saving(client, auth_headers, use_provider):
+    use_provider(TrackedProvider(fail_after=3, token_delay=0.001, response_words=20))
+    response = stream(client, auth_headers)
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == ["context"] + ["token"] * 3 + ["error"]
+    assert events[-1][1]["detail"] == "Provider went away"
+    assert document_count(user_id(client, auth_headers)) == 0
+
+def test_disconnect_cancels_the_provider_and_saves_nothing(client, auth_headers, use_provider):
+    provider = use_provider(TrackedProvider(token_delay=0.01, response_words=200))
+    owner = user_id(client, auth_headers)
+    db = SessionLocal()
+    try:
+        prepared = generator.prepare_generation(db, owner, REQUEST)
+    finally:
+        db.close()
+
+    async def receive():
+        await provider.first_token.wait()
+        return {"type": "http.disconnect"}
+
+    async def consume() -> list:
+        request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+        events = cancel_on_disconnect(request, _generation_events(owner, REQUEST, prepared, None))
+        return [event async for event in events]
+
+    sent = asyncio.run(consume())
+    assert not any(event.startswith("event: done") for event in sent)
+    assert provider.closed
+    assert not provider.finished
+    assert provider.sent < 200
+    assert document_count(owner) == 0
@@ -0,0 +1,41 @@
+"""
+The principal cache is per process. A user write made through the ORM here
+takes effect on the next request; a write this process does not see (made
+by another worker) takes effect once the cached entry expires.
+"""
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import update
+
+from app.auth import cache
+from app.database import SessionLocal
+from app.models import User
+
+def me(client, headers):
+    return client.get("/api/v1/users/me", headers=headers)
+
+def test_deactivation_in_this_process_applies_at_once(client, auth_headers):
+    user_id = me(client, auth_headers).json()["id"]
+    db = SessionLocal()
+    try:
+        db.get(User, user_id).is_active = False
+        db.commit()
+    finally:
+        db.close()
+    assert me(client, auth_headers).status_code == 403
+
+def test_deactivation_by_another_worker_applies_after_the_ttl(client, auth_headers, monkeypatch):
+    user_id = me(client, auth_headers).json()["id"]
+    db = SessionLocal()
+    try:
+        # A Core update fires no ORM events, like a write in another process
+        db.execute(update(User).where(User.id == user_id).values(is_active=False))
+        db.commit()
+    finally:
+        db.close()
+    assert me(client, auth_headers).status_code == 200
+
+    expired = time.time() + cache.principal_cache.ttl_seconds + 1
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=lambda: expired))
+    assert me(client, auth_headers).status_code == 403
@@ -0,0 +1,43 @@
+"""
+First profile writes create the snapshot through a locked placeholder row.
+SQLite runs one write transaction at a time, so this checks the placeholder
+is always rebuilt into a complete snapshot rather than the Postgres race.
+"""
+import threading
+
+from app.database import SessionLocal
+from app.experiences.snapshot import SNAPSHOT_FORMAT_VERSION
+from app.models import ProfileSnapshot
+
+EXPERIENCE = {"company_name": "Acme", "job_title": "Engineer", "start_date": "2020-01-01T00:00:00"}
+
+def test_concurrent_first_writes_all_reach_the_snapshot(client, auth_headers):
+    writers = 4
+    barrier = threading.Barrier(writers)
+    statuses = []
+
+    def create(index: int) -> None:
+        barrier.wait()
+        response = client.post(
+            "/api/v1/profile/experiences",
+            json={**EXPERIENCE, "job_title": f"Engineer {index}"},
+            headers=auth_headers,
+        )
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=create, args=(index,)) for index in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * writers
+
+    user_id = client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+    db = SessionLocal()
+    try:
+        snapshot = db.get(ProfileSnapshot, user_id)
+    finally:
+        db.close()
+    assert snapshot.format_version == SNAPSHOT_FORMAT_VERSION
+    assert snapshot.item_count == writers
+    assert len(snapshot.items["experiences"]) == writers
@@ -0,0 +1,19 @@
+from app.database import SessionLocal
+from app.tools.init_db import create_sample_data
+
+def test_seeded_employers_are_searchable_and_tagged(client, auth_headers):
+    before = client.get("/api/v1/employers/", headers=auth_headers).headers["ETag"]
+    db = SessionLocal()
+    try:
+        create_sample_data(db)
+    finally:
+        db.close()
+
+    # The catalogue version moved, so cached pages and ETags are not reused
+    assert client.get("/api/v1/employers/", headers=auth_headers).headers["ETag"] != before
+
+    found = client.get("/api/v1/employers/search", headers=auth_headers, params={"q": "Commonwealth"}).json()
+    assert [employer["name"] for employer in found] == ["Commonwealth Bank"]
+
+    tagged = client.get("/api/v1/employers/by-tags", headers=auth_headers, params={"tag": "integrity"}).json()
+    assert [employer["name"] for employer in tagged["items"]] == ["Commonwealth Bank"]